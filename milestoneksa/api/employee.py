@@ -5,7 +5,10 @@ import frappe
 from frappe import _
 from frappe.utils import getdate, flt
 
+from milestoneksa.instrumentation import instrumented
 
+
+@instrumented
 def validate_employee(doc, method=None):
 	"""
 	Main validator for Employee:
@@ -1,75 +1,440 @@
 # -*- coding: utf-8 -*-
+import hashlib
+
 import frappe
 from frappe import _
 from frappe.utils import flt, cint, getdate, add_days, get_first_day, get_last_day, now_datetime
 from datetime import datetime, timedelta
 
+from milestoneksa.instrumentation import instrumented
+
+TREND_BUCKETS = ("daily", "weekly", "monthly")
+
+DASHBOARD_SECTIONS = ("financial", "timeline", "tasks", "team", "trends")
+
+# Cached sections are also recomputed after this long, since "today" moves
+# the overdue / delay figures even when no document changes
+DASHBOARD_CACHE_TTL = 6 * 60 * 60
+
+# Realtime event carrying sections computed by build_dashboard_section
+DASHBOARD_SECTION_EVENT = "milestoneksa_dashboard_section"
+
+DASHBOARD_SECTION_FALLBACKS = {
+    "financial": dict,
+    "timeline": dict,
+    "tasks": dict,
+    "team": lambda: {"team_size": 0, "total_hours": 0, "by_activity": {}, "users": []},
+    "trends": lambda: {"task_completion": [], "cost_trend": []},
+}
+
+# Project columns read by get_financial_metrics / get_timeline_metrics / get_project_info
+PORTFOLIO_PROJECT_FIELDS = [
+    "name", "project_name", "status", "company", "customer",
+    "estimated_costing", "total_costing_amount", "total_purchase_cost", "total_expense_claim",
+    "total_sales_amount", "total_billed_amount", "total_billable_amount",
+    "gross_margin", "per_gross_margin", "percent_complete",
+    "expected_start_date", "expected_end_date", "actual_start_date", "actual_end_date",
+]
+
+# Sections each doctype feeds; used by the doc_events in hooks.py
+DASHBOARD_INVALIDATION = {
+    "Project": ("financial", "timeline", "team"),
+    "Task": ("timeline", "tasks", "trends"),
+    "Timesheet": ("financial", "team", "trends"),
+    "Purchase Invoice": ("financial", "trends"),
+    "Expense Claim": ("financial", "trends"),
+}
+
 
 @frappe.whitelist()
-def get_dashboard_data(project: str, from_date=None, to_date=None):
-    """Get comprehensive dashboard data for a project"""
+def get_dashboard_data(project: str, from_date=None, to_date=None, cost_bucket=None, refresh=0, version=None):
+    """Get comprehensive dashboard data for a project
+    
+    Each section is served from a per (project, date window) snapshot when
+    one exists; pass refresh=1 to recompute every section. Pass the
+    `version` of a previous response to get a short `{"not_modified": True}`
+    answer when none of the underlying records changed.
+    """
     if not project:
         frappe.throw(_("Project is required"))
     
-    project_doc = frappe.get_doc("Project", project)
-    
     # Parse date filters
     if from_date:
         from_date = getdate(from_date)
     if to_date:
         to_date = getdate(to_date)
     
-    # Get metrics with error handling
-    try:
-        financial = get_financial_metrics(project, project_doc)
-    except Exception as e:
-        frappe.log_error(f"Dashboard financial error: {str(e)}")
-        financial = {}
-    
-    try:
-        timeline = get_timeline_metrics(project, project_doc)
-    except Exception as e:
-        frappe.log_error(f"Dashboard timeline error: {str(e)}")
-        timeline = {}
+    window = get_dashboard_window_key(from_date, to_date, cost_bucket)
+    current_version = get_dashboard_version(project, window)
+    if version and version == current_version and not cint(refresh):
+        return {"not_modified": True, "version": current_version}
     
-    try:
-        tasks = get_task_metrics(project, from_date, to_date)
-    except Exception as e:
-        frappe.log_error(f"Dashboard tasks error: {str(e)}")
-        tasks = {}
+    project_doc = frappe.get_doc("Project", project)
     
-    try:
-        team = get_team_metrics(project, from_date, to_date)
-    except Exception as e:
-        frappe.log_error(f"Dashboard team error: {str(e)}")
-        team = {"team_size": 0, "total_hours": 0, "by_activity": {}, "users": []}
+    builders = get_dashboard_builders(project, project_doc, from_date, to_date, cost_bucket)
     
-    try:
-        trends = get_historical_trends(project, from_date, to_date)
-    except Exception as e:
-        frappe.log_error(f"Dashboard trends error: {str(e)}")
-        trends = {"task_completion": [], "cost_trend": []}
+    # Get metrics with error handling
+    sections = {}
+    cache_info = {}
+    for section in DASHBOARD_SECTIONS:
+        sections[section], cache_info[section] = get_dashboard_section(
+            project, section, window, builders[section], refresh=cint(refresh)
+        )
     
     # Calculate overall project health score
-    health_score = calculate_health_score(financial, timeline, tasks, team)
+    health_score = calculate_health_score(
+        sections["financial"], sections["timeline"], sections["tasks"], sections["team"]
+    )
     
     return {
-        "financial": financial,
-        "timeline": timeline,
-        "tasks": tasks,
-        "team": team,
-        "trends": trends,
+        "financial": sections["financial"],
+        "timeline": sections["timeline"],
+        "tasks": sections["tasks"],
+        "team": sections["team"],
+        "trends": sections["trends"],
         "health": health_score,
-        "project_info": {
-            "name": project_doc.name,
-            "project_name": project_doc.project_name,
-            "status": project_doc.status,
-            "company": project_doc.company,
-            "customer": project_doc.customer,
+        "project_info": get_project_info(project_doc),
+        "cache": cache_info,
+        "version": current_version,
+    }
+
+
+def get_dashboard_version(project: str, window: str):
+    """Cheap token that changes whenever the dashboard payload can change.
+    
+    Combines the Project's `modified` and the Project columns the payload
+    reads (ERPNext writes the sales, billed and costing totals with db_set,
+    which leaves `modified` alone), count and max(`modified`) of the
+    project's Tasks, Timesheet Details and Project Daily Cost rows (which
+    follow every Purchase Invoice / Expense Claim / Timesheet submission),
+    the date window and today's date (overdue and delay figures move daily).
+    """
+    project_columns = ", ".join(f"`{field}`" for field in ["modified"] + PORTFOLIO_PROJECT_FIELDS)
+    row = frappe.db.sql(f"""
+        SELECT
+            (SELECT CONCAT_WS('|', {project_columns}) FROM `tabProject` WHERE name = %(project)s) AS project,
+            (SELECT CONCAT(COUNT(*), '/', IFNULL(MAX(modified), ''))
+                FROM `tabTask` WHERE project = %(project)s) AS tasks,
+            (SELECT CONCAT(COUNT(*), '/', IFNULL(MAX(modified), ''))
+                FROM `tabTimesheet Detail` WHERE project = %(project)s) AS timesheets,
+            (SELECT CONCAT(COUNT(*), '/', IFNULL(MAX(modified), ''))
+                FROM `tabProject Daily Cost` WHERE project = %(project)s) AS costs
+    """, {"project": project}, as_dict=True)[0]
+    
+    key = "|".join(
+        str(part) for part in (project, window, getdate(), row.project, row.tasks, row.timesheets, row.costs)
+    )
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+@frappe.whitelist()
+def start_dashboard_load(project: str, from_date=None, to_date=None, cost_bucket=None, version=None):
+    """Return the cheap and already cached dashboard sections right away
+    
+    Every other section is computed in a background job and pushed to the
+    Project form with `frappe.publish_realtime` (event
+    DASHBOARD_SECTION_EVENT) as soon as it is ready. The returned `window`
+    identifies the date window the pushed sections belong to. `version`
+    works as in get_dashboard_data.
+    """
+    if not project:
+        frappe.throw(_("Project is required"))
+    
+    if from_date:
+        from_date = getdate(from_date)
+    if to_date:
+        to_date = getdate(to_date)
+    
+    window = get_dashboard_window_key(from_date, to_date, cost_bucket)
+    current_version = get_dashboard_version(project, window)
+    if version and version == current_version:
+        return {"not_modified": True, "version": current_version, "window": window}
+    
+    project_doc = frappe.get_doc("Project", project)
+    builders = get_dashboard_builders(project, project_doc, from_date, to_date, cost_bucket)
+    
+    # Financial only reads the Project document: always answer it inline
+    sections = {}
+    cache_info = {}
+    sections["financial"], cache_info["financial"] = get_dashboard_section(
+        project, "financial", window, builders["financial"]
+    )
+    
+    pending = []
+    for section in DASHBOARD_SECTIONS:
+        if section in sections:
+            continue
+        cached = get_cached_dashboard_section(project, section, window)
+        if cached:
+            sections[section], cache_info[section] = cached
+            continue
+        
+        pending.append(section)
+        frappe.enqueue(
+            "milestoneksa.api.project_dashboard.build_dashboard_section",
+            queue="short",
+            job_id=f"project_dashboard::{project}::{section}::{window}",
+            deduplicate=True,
+            project=project,
+            section=section,
+            from_date=from_date,
+            to_date=to_date,
+            cost_bucket=cost_bucket,
+        )
+    
+    return {
+        **sections,
+        "health": get_cached_health(project, window),
+        "project_info": get_project_info(project_doc),
+        "cache": cache_info,
+        "pending": pending,
+        "window": window,
+        "version": current_version,
+    }
+
+
+@instrumented
+def build_dashboard_section(project: str, section: str, from_date=None, to_date=None, cost_bucket=None):
+    """Background job: compute one dashboard section and push it to the Project form"""
+    project_doc = frappe.get_doc("Project", project)
+    window = get_dashboard_window_key(from_date, to_date, cost_bucket)
+    builders = get_dashboard_builders(project, project_doc, from_date, to_date, cost_bucket)
+    
+    data, info = get_dashboard_section(project, section, window, builders[section], refresh=1)
+    
+    frappe.publish_realtime(
+        DASHBOARD_SECTION_EVENT,
+        {
+            "project": project,
+            "window": window,
+            "section": section,
+            "data": data,
+            "cache": info,
+            # Sent by whichever job completes the last health input
+            "health": get_cached_health(project, window),
+        },
+        doctype="Project",
+        docname=project,
+    )
+
+
+def get_dashboard_builders(project: str, project_doc, from_date=None, to_date=None, cost_bucket=None):
+    """Section name -> callable computing it"""
+    return {
+        "financial": lambda: get_financial_metrics(project, project_doc),
+        "timeline": lambda: get_timeline_metrics(project, project_doc),
+        "tasks": lambda: get_task_metrics(project, from_date, to_date),
+        "team": lambda: get_team_metrics(project, from_date, to_date),
+        "trends": lambda: get_historical_trends(project, from_date, to_date, cost_bucket),
+    }
+
+
+def get_cached_health(project: str, window: str):
+    """Health score from cached sections, or None while any of its inputs is missing"""
+    inputs = []
+    for section in ("financial", "timeline", "tasks", "team"):
+        cached = get_cached_dashboard_section(project, section, window)
+        if not cached:
+            return None
+        inputs.append(cached[0])
+    return calculate_health_score(*inputs)
+
+
+@frappe.whitelist()
+def get_portfolio_dashboard(projects=None, filters=None, from_date=None, to_date=None):
+    """Get financial/timeline/task/team/health metrics for many projects in one call
+    
+    Pass either a list of `projects` or Project `filters` (open projects by
+    default). Each section is loaded with one grouped query for the whole
+    batch, so the number of queries does not grow with the project count.
+    """
+    if isinstance(projects, str):
+        projects = frappe.parse_json(projects)
+    if isinstance(filters, str):
+        filters = frappe.parse_json(filters)
+    
+    if from_date:
+        from_date = getdate(from_date)
+    if to_date:
+        to_date = getdate(to_date)
+    
+    if projects:
+        filters = {"name": ["in", projects]}
+    elif not filters:
+        filters = {"status": "Open"}
+    
+    project_docs = frappe.get_list(
+        "Project",
+        filters=filters,
+        fields=PORTFOLIO_PROJECT_FIELDS,
+        order_by="name asc",
+        limit_page_length=0,
+    )
+    names = [p.name for p in project_docs]
+    if not names:
+        return {"projects": [], "summary": get_portfolio_summary([])}
+    
+    milestones = group_by_project(get_milestone_rows(names))
+    task_counts = group_by_project(get_task_counts(names))
+    overdue_tasks = group_by_project(get_overdue_tasks(names))
+    hour_rows = group_by_project(get_timesheet_hours(names, from_date, to_date))
+    users = group_by_project(frappe.get_all(
+        "Project User",
+        filters={"parent": ["in", names]},
+        fields=["parent as project", "user"],
+        limit_page_length=0,
+    ))
+    
+    results = []
+    for project_doc in project_docs:
+        name = project_doc.name
+        financial = get_financial_metrics(name, project_doc)
+        timeline = get_timeline_metrics(name, project_doc, milestones.get(name, []))
+        tasks = get_task_metrics(
+            name, from_date, to_date, task_counts.get(name, []), overdue_tasks.get(name, [])
+        )
+        team = get_team_metrics(name, from_date, to_date, users.get(name, []), hour_rows.get(name, []))
+        
+        results.append({
+            "financial": financial,
+            "timeline": timeline,
+            "tasks": tasks,
+            "team": team,
+            "health": calculate_health_score(financial, timeline, tasks, team),
+            "project_info": get_project_info(project_doc),
+        })
+    
+    return {"projects": results, "summary": get_portfolio_summary(results)}
+
+
+def get_portfolio_summary(results):
+    """Health distribution of a portfolio"""
+    by_level = {"excellent": 0, "good": 0, "warning": 0, "danger": 0}
+    for row in results:
+        level = row["health"]["level"]
+        by_level[level] = by_level.get(level, 0) + 1
+    
+    scores = [row["health"]["score"] for row in results]
+    return {
+        "count": len(results),
+        "average_score": (sum(scores) / len(scores)) if scores else 0,
+        "by_level": by_level,
+    }
+
+
+def group_by_project(rows):
+    """Split rows carrying a `project` column into {project: [rows]}"""
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row.project, []).append(row)
+    return grouped
+
+
+def get_project_info(project_doc):
+    return {
+        "name": project_doc.name,
+        "project_name": project_doc.project_name,
+        "status": project_doc.status,
+        "company": project_doc.company,
+        "customer": project_doc.customer,
+    }
+
+
+def get_dashboard_window_key(from_date=None, to_date=None, cost_bucket=None):
+    """Cache field for one date window of the dashboard"""
+    return f"{from_date or ''}:{to_date or ''}:{cost_bucket or ''}"
+
+
+def get_dashboard_cache_key(project: str, section: str):
+    return f"mksa:project_dashboard:{project}:{section}"
+
+
+def get_dashboard_section(project: str, section: str, window: str, builder, refresh=0):
+    """Return (data, cache_info) for one dashboard section.
+    
+    Snapshots live in one Redis hash per (project, section), keyed by date
+    window, so invalidating a section drops it for every window at once.
+    Failed computations fall back to an empty section and are not cached.
+    """
+    if not refresh:
+        cached = get_cached_dashboard_section(project, section, window)
+        if cached:
+            return cached
+    
+    now = now_datetime()
+    try:
+        data = builder()
+    except Exception as e:
+        frappe.log_error(f"Dashboard {section} error: {str(e)}")
+        return DASHBOARD_SECTION_FALLBACKS[section](), {
+            "cached": False,
+            "computed_at": str(now),
+            "age_seconds": 0,
+            "error": True,
         }
+    
+    frappe.cache().hset(get_dashboard_cache_key(project, section), window, {"data": data, "computed_at": now})
+    return data, {"cached": False, "computed_at": str(now), "age_seconds": 0}
+
+
+def get_cached_dashboard_section(project: str, section: str, window: str):
+    """(data, cache_info) of a fresh snapshot, or None"""
+    snapshot = frappe.cache().hget(get_dashboard_cache_key(project, section), window)
+    if not snapshot:
+        return None
+    
+    age = (now_datetime() - snapshot["computed_at"]).total_seconds()
+    if age >= DASHBOARD_CACHE_TTL:
+        return None
+    
+    return snapshot["data"], {
+        "cached": True,
+        "computed_at": str(snapshot["computed_at"]),
+        "age_seconds": cint(age),
     }
 
 
+def clear_dashboard_cache(project: str, sections=None):
+    """Drop cached dashboard sections of a project (all sections by default)"""
+    if not project:
+        return
+    frappe.cache().delete_value(
+        [get_dashboard_cache_key(project, section) for section in (sections or DASHBOARD_SECTIONS)]
+    )
+
+
+def get_linked_projects(doc):
+    """Projects referenced by a document, its child rows and its previous version"""
+    if doc.doctype == "Project":
+        return {doc.name}
+    
+    projects = {doc.get("project"), doc.get("parent_project")}
+    for table in ("items", "time_logs"):
+        projects.update(row.get("project") for row in (doc.get(table) or []))
+    
+    # A Task moved to another project changes both dashboards
+    previous = doc.get_doc_before_save() if hasattr(doc, "get_doc_before_save") else None
+    if previous:
+        projects.add(previous.get("project"))
+    
+    return {p for p in projects if p}
+
+
+@instrumented
+def invalidate_dashboard_cache(doc, method=None):
+    """doc_events hook: drop the dashboard sections a document contributes to"""
+    sections = DASHBOARD_INVALIDATION.get(doc.doctype)
+    if not sections:
+        return
+    
+    try:
+        for project in get_linked_projects(doc):
+            clear_dashboard_cache(project, sections)
+    except Exception:
+        # Never block the transaction because of the dashboard cache
+        frappe.log_error(f"Dashboard cache invalidation failed for {doc.doctype} {doc.name}")
+
+
 def calculate_health_score(financial, timeline, tasks, team):
     """Calculate overall project health score (0-100)"""
     score = 0
@@ -206,8 +571,12 @@ def get_financial_metrics(project: str, project_doc):
     }
 
 
-def get_timeline_metrics(project: str, project_doc):
-    """Calculate timeline/schedule KPIs"""
+def get_timeline_metrics(project: str, project_doc, milestone_rows=None):
+    """Calculate timeline/schedule KPIs
+    
+    `milestone_rows` may be passed in when they were already loaded for a
+    batch of projects (see get_portfolio_dashboard).
+    """
     exp_start = project_doc.expected_start_date
     exp_end = project_doc.expected_end_date
     act_start = project_doc.actual_start_date
@@ -237,12 +606,8 @@ def get_timeline_metrics(project: str, project_doc):
             days_remaining = 0
     
     # Milestone status + details for dashboard card
-    milestone_rows = frappe.get_all(
-        "Task",
-        filters={"project": project, "is_milestone": 1},
-        fields=["name", "subject", "description", "status", "exp_end_date"],
-        order_by="exp_end_date asc, modified desc",
-    )
+    if milestone_rows is None:
+        milestone_rows = get_milestone_rows([project])
 
     # Treat Cancelled milestones as not part of completion KPI
     active_milestones = [m for m in milestone_rows if (m.status or "") != "Cancelled"]
@@ -288,96 +653,136 @@ def get_timeline_metrics(project: str, project_doc):
     }
 
 
-def get_task_metrics(project: str, from_date=None, to_date=None):
-    """Calculate task-related KPIs"""
-    filters = {"project": project}
-    
-    all_tasks = frappe.get_all(
+def get_milestone_rows(projects):
+    """Milestone tasks of the given projects, in dashboard display order"""
+    return frappe.get_all(
         "Task",
-        filters=filters,
-        fields=["name", "status", "priority", "exp_end_date", "is_group"]
+        filters={"project": ["in", projects], "is_milestone": 1},
+        fields=["name", "project", "subject", "description", "status", "exp_end_date"],
+        order_by="exp_end_date asc, modified desc",
+        limit_page_length=0,
     )
 
-    # Exclude group (parent) tasks from KPI calculations; they are containers
-    leaf_tasks = [t for t in all_tasks if not cint(t.is_group)]
-    
-    # Count by status
+
+def get_task_metrics(project: str, from_date=None, to_date=None, count_rows=None, overdue_rows=None):
+    """Calculate task-related KPIs
+    
+    Group (parent) tasks are containers and are excluded. `count_rows` and
+    `overdue_rows` may be passed in when they were already loaded for a
+    batch of projects.
+    """
+    if count_rows is None:
+        count_rows = get_task_counts([project])
+    if overdue_rows is None:
+        overdue_rows = get_overdue_tasks([project])
+    
+    # Count by status / priority
     status_counts = {}
-    for task in leaf_tasks:
-        status = task.status or "Open"
-        status_counts[status] = status_counts.get(status, 0) + 1
-    
-    # Count by priority
     priority_counts = {}
-    for task in leaf_tasks:
-        priority = task.priority or "Medium"
-        priority_counts[priority] = priority_counts.get(priority, 0) + 1
-    
-    # Count overdue
-    today = getdate()
-    overdue = [t for t in leaf_tasks if t.exp_end_date and getdate(t.exp_end_date) < today and t.status not in ("Completed", "Cancelled")]
-    
-    completed = len([t for t in leaf_tasks if t.status == "Completed"])
-    total = len(leaf_tasks)
+    total = 0
+    completed = 0
+    overdue = 0
+    for row in count_rows:
+        count = cint(row.count)
+        status = row.status or "Open"
+        priority = row.priority or "Medium"
+        status_counts[status] = status_counts.get(status, 0) + count
+        priority_counts[priority] = priority_counts.get(priority, 0) + count
+        
+        total += count
+        overdue += cint(row.overdue)
+        if row.status == "Completed":
+            completed += count
     
     return {
         "total": total,
         "completed": completed,
         "pending": total - completed,
         "completion_pct": (completed / total * 100) if total else 0,
-        "overdue": len(overdue),
+        "overdue": overdue,
         "by_status": status_counts,
         "by_priority": priority_counts,
-        "overdue_tasks": [{"name": t.name, "exp_end_date": t.exp_end_date, "priority": t.priority} for t in overdue[:10]]
+        "overdue_tasks": [{"name": t.name, "exp_end_date": t.exp_end_date, "priority": t.priority} for t in overdue_rows]
     }
 
 
-def get_team_metrics(project: str, from_date=None, to_date=None):
-    """Calculate team/resource metrics"""
-    # Get project users
-    users = frappe.get_all(
-        "Project User",
-        filters={"parent": project},
-        fields=["user"]
-    )
-    
-    # Get timesheet data
-    timesheet_filters = {"project": project}
+def get_task_counts(projects):
+    """Leaf task counts per (project, status, priority), with the overdue share of each group"""
+    return frappe.db.sql("""
+        SELECT
+            project,
+            status,
+            priority,
+            COUNT(*) AS count,
+            SUM(
+                exp_end_date < %(today)s
+                AND IFNULL(status, '') NOT IN ('Completed', 'Cancelled')
+            ) AS overdue
+        FROM `tabTask`
+        WHERE project IN %(projects)s
+          AND is_group = 0
+        GROUP BY project, status, priority
+    """, {"projects": tuple(projects), "today": getdate()}, as_dict=True)
+
+
+def get_overdue_tasks(projects, limit=10):
+    """First `limit` overdue leaf tasks of each project (most recently modified first)"""
+    return frappe.db.sql("""
+        SELECT name, project, exp_end_date, priority
+        FROM (
+            SELECT
+                name, project, exp_end_date, priority,
+                ROW_NUMBER() OVER (PARTITION BY project ORDER BY modified DESC) AS row_no
+            FROM `tabTask`
+            WHERE project IN %(projects)s
+              AND is_group = 0
+              AND exp_end_date < %(today)s
+              AND IFNULL(status, '') NOT IN ('Completed', 'Cancelled')
+        ) overdue
+        WHERE row_no <= %(limit)s
+        ORDER BY project, row_no
+    """, {"projects": tuple(projects), "today": getdate(), "limit": cint(limit)}, as_dict=True)
+
+
+def get_team_metrics(project: str, from_date=None, to_date=None, users=None, hour_rows=None):
+    """Calculate team/resource metrics
     
-    timesheets = frappe.get_all(
-        "Timesheet Detail",
-        filters=timesheet_filters,
-        fields=["hours", "parent", "activity_type"]
-    )
+    `users` (Project User rows) and `hour_rows` (see get_timesheet_hours)
+    may be passed in when they were already loaded for a batch of projects.
+    """
+    # Get project users
+    if users is None:
+        users = frappe.get_all(
+            "Project User",
+            filters={"parent": project},
+            fields=["user"]
+        )
+    
+    # Hours grouped by (timesheet owner, activity) in a single join; the
+    # per-user, per-activity and total figures are all folded from these rows
+    if hour_rows is None:
+        hour_rows = get_timesheet_hours([project], from_date, to_date)
     
-    # Get user info from timesheets (owner)
     timesheet_by_user = {}
-    for ts in timesheets:
-        # Get parent timesheet to find owner
-        parent_doc = frappe.get_cached_value("Timesheet", ts.parent, ["owner", "employee"], as_dict=True)
-        if parent_doc:
-            user = parent_doc.get("owner")
-            hours = flt(ts.hours)
-            
-            if user not in timesheet_by_user:
-                timesheet_by_user[user] = {
-                    "hours": 0,
-                    "activities": {}
-                }
-            
-            timesheet_by_user[user]["hours"] += hours
-            
-            activity = ts.activity_type or "Other"
-            timesheet_by_user[user]["activities"][activity] = \
-                timesheet_by_user[user]["activities"].get(activity, 0) + hours
-    
-    total_hours = sum(flt(ts.hours) for ts in timesheets)
-    
-    # Hours by activity
     activity_hours = {}
-    for ts in timesheets:
-        activity = ts.activity_type or "Other"
-        activity_hours[activity] = activity_hours.get(activity, 0) + flt(ts.hours)
+    total_hours = 0
+    for row in hour_rows:
+        user = row.user
+        hours = flt(row.hours)
+        activity = row.activity_type or "Other"
+        
+        if user not in timesheet_by_user:
+            timesheet_by_user[user] = {
+                "hours": 0,
+                "activities": {}
+            }
+        
+        timesheet_by_user[user]["hours"] += hours
+        timesheet_by_user[user]["activities"][activity] = \
+            timesheet_by_user[user]["activities"].get(activity, 0) + hours
+        
+        activity_hours[activity] = activity_hours.get(activity, 0) + hours
+        total_hours += hours
     
     # Build user breakdown
     user_breakdown = []
@@ -400,8 +805,42 @@ def get_team_metrics(project: str, from_date=None, to_date=None):
     }
 
 
-def get_historical_trends(project: str, from_date=None, to_date=None):
-    """Get historical trend data for charts"""
+def get_timesheet_hours(projects, from_date=None, to_date=None):
+    """Timesheet hours grouped by project, timesheet owner and activity.
+    
+    The date window is applied to `Timesheet Detail.from_time` inside the
+    query, so only the grouped rows ever leave the database.
+    """
+    conditions = ["tsd.project IN %(projects)s", "tsd.parenttype = 'Timesheet'"]
+    values = {"projects": tuple(projects)}
+    
+    if from_date:
+        conditions.append("tsd.from_time >= %(from_date)s")
+        values["from_date"] = getdate(from_date)
+    if to_date:
+        # from_time is a datetime: include the whole of to_date
+        conditions.append("tsd.from_time < %(to_date)s")
+        values["to_date"] = add_days(getdate(to_date), 1)
+    
+    return frappe.db.sql(f"""
+        SELECT
+            tsd.project AS project,
+            ts.owner AS user,
+            tsd.activity_type AS activity_type,
+            SUM(tsd.hours) AS hours
+        FROM `tabTimesheet Detail` tsd
+        INNER JOIN `tabTimesheet` ts ON ts.name = tsd.parent
+        WHERE {" AND ".join(conditions)}
+        GROUP BY tsd.project, ts.owner, tsd.activity_type
+    """, values, as_dict=True)
+
+
+def get_historical_trends(project: str, from_date=None, to_date=None, bucket=None):
+    """Get historical trend data for charts
+    
+    `bucket` is one of "daily", "weekly" or "monthly"; when omitted it is
+    picked from the length of the date window.
+    """
     
     # Default to last 3 months if no dates
     if not to_date:
@@ -428,64 +867,68 @@ def get_historical_trends(project: str, from_date=None, to_date=None):
             week_start = get_week_start(task.completed_on)
             weekly_completions[week_start] = weekly_completions.get(week_start, 0) + 1
     
-    # Get cost trend from BOTH Purchase Invoices AND Expense Claims
-    purchase_invoices = frappe.get_all(
-        "Purchase Invoice Item",
-        filters={
-            "project": project,
-            "docstatus": 1
-        },
-        fields=["parent", "amount"],
-    )
+    # Daily cost totals from the Project Daily Cost ledger (Purchase Invoices,
+    # Expense Claims and Timesheets), one row per day in the window
+    daily_costs = get_daily_costs(project, from_date, to_date)
     
-    # Get parent Purchase Invoice dates
-    pi_data = []
-    for item in purchase_invoices:
-        pi = frappe.db.get_value("Purchase Invoice", item.parent, ["posting_date"], as_dict=True)
-        if pi and pi.posting_date:
-            if not from_date or not to_date or (getdate(pi.posting_date) >= from_date and getdate(pi.posting_date) <= to_date):
-                pi_data.append({
-                    "date": pi.posting_date,
-                    "amount": flt(item.amount)
-                })
-    
-    # Get expense claims
-    expense_claims = frappe.get_all(
-        "Expense Claim",
-        filters={
-            "project": project,
-            "docstatus": 1
-        },
-        fields=["posting_date", "total_claimed_amount"],
-        order_by="posting_date asc"
-    )
-    
-    # Combine and sort all costs by date
-    all_costs = []
-    for pi in pi_data:
-        all_costs.append({"date": pi["date"], "amount": pi["amount"]})
-    for exp in expense_claims:
-        if not from_date or not to_date or (getdate(exp.posting_date) >= from_date and getdate(exp.posting_date) <= to_date):
-            all_costs.append({"date": exp.posting_date, "amount": flt(exp.total_claimed_amount)})
+    # Cumulative cost trend, one point per bucket
+    if not bucket:
+        bucket = get_trend_bucket(from_date, to_date)
+    elif bucket not in TREND_BUCKETS:
+        frappe.throw(_("Invalid trend bucket: {0}").format(bucket))
     
-    all_costs.sort(key=lambda x: getdate(x["date"]))
+    bucket_totals = {}
+    for cost in daily_costs:
+        key = get_bucket_start(cost.date, bucket)
+        bucket_totals[key] = bucket_totals.get(key, 0) + flt(cost.amount)
     
-    # Cumulative cost trend
     cost_trend = []
     cumulative = 0
-    for cost in all_costs:
-        cumulative += flt(cost["amount"])
+    for key in sorted(bucket_totals):
+        cumulative += bucket_totals[key]
         cost_trend.append({
-            "date": str(cost["date"]),
+            "date": str(key),
             "amount": cumulative
         })
     
     return {
         "task_completion": [{"week": str(k), "count": v} for k, v in sorted(weekly_completions.items())],
         "cost_trend": cost_trend,
+        "cost_bucket": bucket,
     }
 
 
+def get_daily_costs(project: str, from_date, to_date):
+    """Daily project costs (purchases, expense claims, timesheets) from the Project Daily Cost ledger, sorted by date"""
+    return frappe.db.sql("""
+        SELECT posting_date AS date, SUM(amount) AS amount
+        FROM `tabProject Daily Cost`
+        WHERE project = %(project)s
+          AND posting_date BETWEEN %(from_date)s AND %(to_date)s
+        GROUP BY posting_date
+        ORDER BY posting_date ASC
+    """, {"project": project, "from_date": from_date, "to_date": to_date}, as_dict=True)
+
+
+def get_trend_bucket(from_date, to_date):
+    """Pick a bucket size that keeps a trend series to a few dozen points"""
+    days = (getdate(to_date) - getdate(from_date)).days
+    if days <= 31:
+        return "daily"
+    if days <= 366:
+        return "weekly"
+    return "monthly"
+
+
+def get_bucket_start(date, bucket):
+    """Get the first day of the daily/weekly/monthly bucket holding a date"""
+    if bucket == "monthly":
+        return get_first_day(date)
+    if bucket == "weekly":
+        return get_week_start(date)
+    return getdate(date)
+
+
 def get_week_start(date):
     """Get the Monday of the week for a given date"""
     date = getdate(date)
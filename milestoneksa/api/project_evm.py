@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+Earned Value Management (PV / EV / AC, SPI / CPI / EAC) for one project or a portfolio.
+
+Every leaf task is an interval with a weight: its share of the project's
+expected hours (or of its planned days when no task has hours). The budget
+at completion (BAC) is the Project's estimated costing.
+
+- PV: a task's weight is planned linearly from exp_start_date to exp_end_date.
+- EV: completed tasks earn their weight on completed_on; tasks in progress
+  earn weight * progress spread from their actual (or planned) start to the
+  as-of date. There is no progress history, so past EV is reconstructed.
+- AC: the Project Daily Cost ledger.
+
+All tasks of all requested projects are loaded in one query as day offsets
+and accumulated into (project x day) arrays with NumPy; none of the
+arithmetic loops over tasks in Python. SPI is reported even without a budget;
+CPI and EAC need one.
+"""
+import frappe
+from frappe import _
+from frappe.utils import add_days, add_months, getdate
+
+from milestoneksa.api.project_dashboard import get_bucket_start, get_trend_bucket, TREND_BUCKETS
+from milestoneksa.instrumentation import instrumented
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+EVM_SERIES = ("pv", "ev", "ac", "spi", "cpi", "eac")
+
+
+def require_numpy():
+    if np is None:
+        frappe.throw(_("NumPy is required for Earned Value figures. Please run: bench pip install numpy"))
+
+
+def load_task_intervals(projects, as_of):
+    """(project, start, end, hours, progress, completed, completed_on, actual_start) of every leaf task.
+
+    Dates come back as day offsets from `as_of` (NULL when unset).
+    """
+    return frappe.db.sql("""
+        SELECT
+            project,
+            DATEDIFF(exp_start_date, %(as_of)s),
+            DATEDIFF(exp_end_date, %(as_of)s),
+            IFNULL(expected_time, 0),
+            IFNULL(progress, 0),
+            status = 'Completed',
+            DATEDIFF(IFNULL(completed_on, IFNULL(custom_actual_end_date, exp_end_date)), %(as_of)s),
+            DATEDIFF(IFNULL(custom_actual_start_date, exp_start_date), %(as_of)s)
+        FROM `tabTask`
+        WHERE project IN %(projects)s
+          AND is_group = 0
+          AND IFNULL(status, '') != 'Cancelled'
+          AND (exp_start_date IS NOT NULL OR exp_end_date IS NOT NULL)
+    """, {"projects": tuple(projects), "as_of": as_of})
+
+
+def load_daily_costs(projects, as_of):
+    """(project, day offset from `as_of`, amount) from the Project Daily Cost ledger"""
+    return frappe.db.sql("""
+        SELECT project, DATEDIFF(posting_date, %(as_of)s), SUM(amount)
+        FROM `tabProject Daily Cost`
+        WHERE project IN %(projects)s AND posting_date <= %(as_of)s
+        GROUP BY project, posting_date
+    """, {"projects": tuple(projects), "as_of": as_of})
+
+
+def accumulate(shape, rows, start, end, amount):
+    """Cumulative (rows x days) totals of `amount` spread evenly over start..end (inclusive)"""
+    rate = amount / (end - start + 1)
+    daily = np.zeros((shape[0], shape[1] + 1))
+    np.add.at(daily, (rows, start), rate)
+    np.add.at(daily, (rows, end + 1), -rate)
+    return np.cumsum(np.cumsum(daily, axis=1), axis=1)[:, :-1]
+
+
+def get_periods(start, end, bucket):
+    """(first day, last day) of every daily/weekly/monthly bucket covering start..end"""
+    periods = []
+    current = get_bucket_start(start, bucket)
+    while current <= end:
+        if bucket == "monthly":
+            following = add_months(current, 1)
+        elif bucket == "weekly":
+            following = add_days(current, 7)
+        else:
+            following = add_days(current, 1)
+        periods.append((current, add_days(following, -1)))
+        current = following
+    return periods
+
+
+def to_series(values, precision=2):
+    """NumPy row -> JSON list, NaN as null"""
+    return np.where(np.isnan(values), None, np.round(values, precision)).tolist()
+
+
+def get_indices(bac, pv, ev, ac):
+    """SPI, CPI and EAC arrays from PV/EV/AC (NaN where undefined)"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        spi = np.where(pv > 0, ev / pv, np.nan)
+        cpi = np.where((ac > 0) & (bac > 0), ev / ac, np.nan)
+        eac = np.where(cpi > 0, bac / cpi, np.nan)
+    return spi, cpi, eac
+
+
+@instrumented
+def compute_evm(budgets, as_of=None, bucket=None, from_date=None, to_date=None):
+    """EVM series of the projects in `budgets` ({project: BAC}) on one shared period axis
+
+    Returns {"periods": [...], "bucket": ..., "as_of": ..., "projects": {project: {...}},
+    "portfolio": {...}} with one parallel array per series (see EVM_SERIES).
+    """
+    require_numpy()
+    as_of = getdate(as_of)
+    projects = list(budgets)
+    index = {name: idx for idx, name in enumerate(projects)}
+    bac = np.array([float(budgets[name] or 0) for name in projects])
+
+    tasks = load_task_intervals(projects, as_of)
+    costs = load_daily_costs(projects, as_of)
+
+    task_rows = np.array([index[row[0]] for row in tasks], dtype=int)
+    data = np.array([row[1:] for row in tasks], dtype=float).reshape(len(tasks), 7)
+    start, end, hours, progress, completed, completed_on, actual_start = data.T
+    start = np.where(np.isnan(start), end, start)
+    end = np.maximum(np.where(np.isnan(end), start, end), start)
+    completed_on = np.where(np.isnan(completed_on), end, completed_on)
+    actual_start = np.where(np.isnan(actual_start), start, actual_start)
+
+    cost_rows = np.array([index[row[0]] for row in costs], dtype=int)
+    cost_data = np.array([row[1:] for row in costs], dtype=float).reshape(len(costs), 2)
+    cost_day, cost_amount = cost_data.T
+
+    # Day axis: offsets from `as_of`, shifted so the earliest date is 0
+    first = int(min(0, *(values.min(initial=0) for values in (start, completed_on, actual_start, cost_day))))
+    last = int(max(0, end.max(initial=0)))
+    if from_date:
+        first = min(first, (getdate(from_date) - as_of).days)
+    if to_date:
+        last = max(last, (getdate(to_date) - as_of).days)
+    shape = (len(projects), last - first + 1)
+
+    # Task weights: share of the project's hours, or of its planned days
+    duration = end - start + 1
+    project_hours = np.bincount(task_rows, weights=hours, minlength=len(projects))
+    weight = np.where(project_hours[task_rows] > 0, hours, duration)
+    totals = np.bincount(task_rows, weights=weight, minlength=len(projects))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weight = np.where(totals[task_rows] > 0, weight / totals[task_rows], 0)
+
+    pv = accumulate(shape, task_rows, (start - first).astype(int), (end - first).astype(int), weight)
+
+    # Earned: completed tasks on their completion day, the rest up to `as_of`
+    done = completed > 0
+    earned = weight * np.where(done, 1, np.clip(progress, 0, 100) / 100)
+    earn_end = np.where(done, np.minimum(completed_on, 0), 0)
+    earn_start = np.where(done, earn_end, np.minimum(actual_start, 0))
+    ev = accumulate(shape, task_rows, (earn_start - first).astype(int), (earn_end - first).astype(int), earned)
+
+    ac = np.zeros(shape)
+    np.add.at(ac, (cost_rows, (cost_day - first).astype(int)), cost_amount)
+    ac = np.cumsum(ac, axis=1)
+
+    # Sample the cumulative curves at the end of each period (or `as_of` inside the current one)
+    axis_start = add_days(as_of, first)
+    period_from = getdate(from_date) if from_date else axis_start
+    period_to = getdate(to_date) if to_date else add_days(as_of, last)
+    bucket = bucket or get_trend_bucket(period_from, period_to)
+    if bucket not in TREND_BUCKETS:
+        frappe.throw(_("Invalid trend bucket: {0}").format(bucket))
+    periods = get_periods(period_from, period_to, bucket)
+
+    period_start = np.array([(p[0] - as_of).days for p in periods], dtype=int)
+    period_end = np.array([(p[1] - as_of).days for p in periods], dtype=int)
+    future = period_start > 0
+    sample = np.clip(np.where(future, period_end, np.minimum(period_end, 0)) - first, 0, shape[1] - 1)
+
+    planned = pv[:, sample]
+    earned = np.where(future, np.nan, ev[:, sample])
+    ac = np.where(future, np.nan, ac[:, sample])
+    # Without a budget only the planned / earned shares (and so SPI) are known
+    budget = np.where(bac > 0, bac, np.nan)[:, None]
+    pv, ev = planned * budget, earned * budget
+    spi, cpi, eac = get_indices(bac[:, None], pv, ev, ac)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        spi = np.where(planned > 0, earned / planned, np.nan)
+
+    result = {}
+    for name, idx in index.items():
+        result[name] = {
+            "bac": float(bac[idx]),
+            "pv": to_series(pv[idx]),
+            "ev": to_series(ev[idx]),
+            "ac": to_series(ac[idx]),
+            "spi": to_series(spi[idx], 3),
+            "cpi": to_series(cpi[idx], 3),
+            "eac": to_series(eac[idx]),
+        }
+
+    # Portfolio totals over the projects that have a budget
+    budgeted = bac > 0
+    total_bac = bac[budgeted].sum()
+    total = [series[budgeted].sum(axis=0) for series in (pv, ev, np.where(budgeted[:, None], ac, 0))]
+    total_indices = get_indices(total_bac, *total)
+
+    return {
+        "as_of": str(as_of),
+        "bucket": bucket,
+        "periods": [str(p[1]) for p in periods],
+        "projects": result,
+        "portfolio": {
+            "bac": float(total_bac),
+            **{key: to_series(values) for key, values in zip(("pv", "ev", "ac"), total)},
+            "spi": to_series(total_indices[0], 3),
+            "cpi": to_series(total_indices[1], 3),
+            "eac": to_series(total_indices[2]),
+        },
+    }
+
+
+@frappe.whitelist()
+def get_project_evm(project: str, as_of=None, bucket=None, from_date=None, to_date=None):
+    """PV/EV/AC and SPI/CPI/EAC series of one project, one point per period"""
+    if not project:
+        frappe.throw(_("Project is required"))
+    if not frappe.has_permission("Project", doc=project):
+        frappe.throw(_("Not permitted to view project {0}").format(project), frappe.PermissionError)
+
+    budget = frappe.db.get_value("Project", project, "estimated_costing")
+    result = compute_evm({project: budget}, as_of, bucket, from_date, to_date)
+    return {**result["projects"][project], **{k: result[k] for k in ("as_of", "bucket", "periods")}}
+
+
+@frappe.whitelist()
+def get_portfolio_evm(projects=None, filters=None, as_of=None, bucket=None, from_date=None, to_date=None):
+    """EVM series of many projects (open projects by default) plus portfolio totals
+
+    Takes `projects` or Project `filters` like get_portfolio_dashboard. Every
+    project is computed in the same NumPy pass.
+    """
+    if isinstance(projects, str):
+        projects = frappe.parse_json(projects)
+    if isinstance(filters, str):
+        filters = frappe.parse_json(filters)
+
+    if projects:
+        filters = {"name": ["in", projects]}
+    elif not filters:
+        filters = {"status": "Open"}
+
+    budgets = dict(
+        frappe.get_list(
+            "Project",
+            filters=filters,
+            fields=["name", "estimated_costing"],
+            order_by="name asc",
+            limit_page_length=0,
+            as_list=True,
+        )
+    )
+    if not budgets:
+        return {"as_of": str(getdate(as_of)), "bucket": bucket, "periods": [], "projects": {}, "portfolio": {}}
+
+    return compute_evm(budgets, as_of, bucket, from_date, to_date)
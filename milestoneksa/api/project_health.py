@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+import frappe
+from frappe import _
+from frappe.utils import getdate, now_datetime
+
+from milestoneksa.api.project_dashboard import get_portfolio_dashboard
+
+
+HEALTH_COMPONENTS = ("budget", "schedule", "tasks", "team")
+
+# Project Health Snapshot column for each calculate_health_score component
+COMPONENT_FIELDS = {
+    "budget": "budget_score",
+    "schedule": "schedule_score",
+    "tasks": "task_score",
+    "team": "team_score",
+}
+
+
+def snapshot_project_health():
+    """Daily scheduler job: store today's health score of every open project"""
+    portfolio = get_portfolio_dashboard(filters={"status": "Open"})
+    if not portfolio["projects"]:
+        return
+
+    today = getdate()
+    now = now_datetime()
+    names = [row["project_info"]["name"] for row in portfolio["projects"]]
+
+    # Re-running on the same day replaces that day's points
+    frappe.db.delete("Project Health Snapshot", {"snapshot_date": today, "project": ["in", names]})
+
+    fields = ["name", "creation", "modified", "modified_by", "owner", "project", "snapshot_date", "score", "level"]
+    fields += [COMPONENT_FIELDS[c] for c in HEALTH_COMPONENTS]
+
+    values = []
+    for row in portfolio["projects"]:
+        health = row["health"]
+        values.append(
+            [
+                frappe.generate_hash(length=10),
+                now,
+                now,
+                "Administrator",
+                "Administrator",
+                row["project_info"]["name"],
+                today,
+                health["score"],
+                health["level"],
+            ]
+            + [health["components"][c] for c in HEALTH_COMPONENTS]
+        )
+
+    frappe.db.bulk_insert("Project Health Snapshot", fields, values)
+    frappe.db.commit()
+
+
+@frappe.whitelist()
+def get_health_series(projects, from_date=None, to_date=None):
+    """Return the stored health score series of one or many projects
+
+    Shape (one entry per project, parallel arrays per series):
+        {project: {"dates": [...], "score": [...], "budget": [...], ...}}
+    """
+    if isinstance(projects, str):
+        projects = frappe.parse_json(projects) if projects.startswith("[") else [projects]
+    if not projects:
+        frappe.throw(_("At least one project is required"))
+
+    for project in projects:
+        if not frappe.has_permission("Project", doc=project):
+            frappe.throw(_("Not permitted to view project {0}").format(project), frappe.PermissionError)
+
+    filters = {"project": ["in", projects]}
+    if from_date and to_date:
+        filters["snapshot_date"] = ["between", [getdate(from_date), getdate(to_date)]]
+    elif from_date:
+        filters["snapshot_date"] = [">=", getdate(from_date)]
+    elif to_date:
+        filters["snapshot_date"] = ["<=", getdate(to_date)]
+
+    rows = frappe.get_all(
+        "Project Health Snapshot",
+        filters=filters,
+        fields=["project", "snapshot_date", "score"] + [COMPONENT_FIELDS[c] for c in HEALTH_COMPONENTS],
+        order_by="project asc, snapshot_date asc",
+        limit_page_length=0,
+    )
+
+    series = {
+        project: {"dates": [], "score": [], **{c: [] for c in HEALTH_COMPONENTS}}
+        for project in projects
+    }
+    for row in rows:
+        points = series[row.project]
+        points["dates"].append(str(row.snapshot_date))
+        points["score"].append(row.score)
+        for component in HEALTH_COMPONENTS:
+            points[component].append(row.get(COMPONENT_FIELDS[component]))
+
+    return series
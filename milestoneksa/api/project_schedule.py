@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+"""
+Critical path (CPM) scheduling over a project's tasks and Task Depends On.
+
+Leaf tasks are the activities; their planned dates give a duration (inclusive
+calendar days) and a "start no earlier than" constraint. A dependency is
+finish-to-start: a task depending on X starts the day after X finishes. A
+dependency on or from a group task applies to every leaf below it.
+
+Dates are handled as integer day offsets from the earliest planned start, so
+the forward and backward passes are plain integer arithmetic over one
+topological order, O(tasks + dependencies).
+"""
+from collections import defaultdict, deque
+from datetime import timedelta
+
+import frappe
+from frappe import _
+from frappe.utils import cint, getdate
+
+from milestoneksa.api.project_tasks import get_project_tasks_version
+
+SCHEDULE_CACHE_TTL = 24 * 60 * 60
+
+
+class ScheduleGraph:
+    """Leaf tasks of a project as a topologically sorted finish-to-start network"""
+
+    def __init__(self, tasks, edges):
+        self.tasks = {t.name: t for t in tasks}
+        self.children = defaultdict(list)
+        for t in tasks:
+            if t.parent_task and t.parent_task in self.tasks:
+                self.children[t.parent_task].append(t.name)
+
+        self.names = [t.name for t in tasks]
+        self.leaves = [t.name for t in tasks if not self.children.get(t.name)]
+        starts = [getdate(t.exp_start_date) for t in tasks if t.exp_start_date]
+        self.origin = min(starts) if starts else getdate()
+
+        # Planned start offset and duration (days) per leaf; undated tasks
+        # start with the project and last one day
+        self.start = {}
+        self.duration = {}
+        for name in self.leaves:
+            t = self.tasks[name]
+            start = getdate(t.exp_start_date) if t.exp_start_date else self.origin
+            end = getdate(t.exp_end_date) if t.exp_end_date else start
+            self.start[name] = (start - self.origin).days
+            self.duration[name] = max(1, (end - start).days + 1)
+
+        self.preds = defaultdict(set)
+        self.succs = defaultdict(set)
+        leaf_cache = {}
+        for pred, succ in edges:
+            if pred not in self.tasks or succ not in self.tasks:
+                continue
+            for p in self.get_leaves(pred, leaf_cache):
+                for s in self.get_leaves(succ, leaf_cache):
+                    if p != s:
+                        self.preds[s].add(p)
+                        self.succs[p].add(s)
+
+        self.order = self.topological_order()
+
+    def get_leaves(self, name, cache):
+        """Leaf tasks at or below `name`"""
+        if name not in cache:
+            leaves, stack = [], [name]
+            while stack:
+                node = stack.pop()
+                kids = self.children.get(node)
+                if kids:
+                    stack.extend(kids)
+                else:
+                    leaves.append(node)
+            cache[name] = leaves
+        return cache[name]
+
+    def topological_order(self):
+        """Kahn's algorithm; throws with one offending loop if the network has a cycle"""
+        indegree = {name: len(self.preds[name]) for name in self.leaves}
+        queue = deque(name for name in self.leaves if not indegree[name])
+        order = []
+        while queue:
+            name = queue.popleft()
+            order.append(name)
+            for succ in self.succs[name]:
+                indegree[succ] -= 1
+                if not indegree[succ]:
+                    queue.append(succ)
+
+        if len(order) < len(self.leaves):
+            cycle = self.find_cycle({name for name, degree in indegree.items() if degree})
+            frappe.throw(
+                _("Task dependencies contain a cycle: {0}").format(" → ".join(cycle)),
+                title=_("Circular Dependency"),
+            )
+        return order
+
+    def find_cycle(self, blocked):
+        """Walk predecessors inside the unsortable set until a task repeats"""
+        node = next(iter(blocked))
+        seen = {}
+        path = []
+        while node not in seen:
+            seen[node] = len(path)
+            path.append(node)
+            node = next(p for p in self.preds[node] if p in blocked)
+        loop = path[seen[node]:] + [node]
+        return list(reversed(loop))
+
+    def forward_pass(self, start=None, duration=None):
+        """Early start / finish offsets (finish exclusive); `start`/`duration` override per task"""
+        start = {**self.start, **(start or {})}
+        duration = {**self.duration, **(duration or {})}
+        early_start, early_finish = {}, {}
+        for name in self.order:
+            es = start[name]
+            for pred in self.preds[name]:
+                es = max(es, early_finish[pred])
+            early_start[name] = es
+            early_finish[name] = es + duration[name]
+        return early_start, early_finish
+
+    def backward_pass(self, early_finish, duration=None):
+        """Late start / finish offsets against the project finish"""
+        duration = {**self.duration, **(duration or {})}
+        finish = max(early_finish.values(), default=0)
+        late_start, late_finish = {}, {}
+        for name in reversed(self.order):
+            lf = finish
+            for succ in self.succs[name]:
+                lf = min(lf, late_start[succ])
+            late_finish[name] = lf
+            late_start[name] = lf - duration[name]
+        return late_start, late_finish
+
+    def rollup(self, early_start, early_finish):
+        """Start / finish offsets of every task, groups spanning their leaves.
+
+        Relies on `names` being in lft order: reversed, every child comes
+        before its parent.
+        """
+        start, finish = dict(early_start), dict(early_finish)
+        for name in reversed(self.names):
+            kids = self.children.get(name)
+            if kids:
+                start[name] = min((start[k] for k in kids if k in start), default=None)
+                finish[name] = max((finish[k] for k in kids if k in finish), default=None)
+                if start[name] is None:
+                    del start[name], finish[name]
+        return start, finish
+
+    def to_date(self, offset):
+        return self.origin + timedelta(days=offset)
+
+
+def load_schedule_graph(project):
+    """One query for the tasks, one for their dependencies"""
+    tasks = frappe.get_all(
+        "Task",
+        filters={"project": project},
+        fields=["name", "subject", "parent_task", "exp_start_date", "exp_end_date"],
+        order_by="lft asc",
+        limit_page_length=0,
+    )
+    edges = frappe.db.sql(
+        """
+        SELECT dep.task, dep.parent
+        FROM `tabTask Depends On` dep
+        INNER JOIN `tabTask` t ON t.name = dep.parent
+        WHERE dep.parenttype = 'Task' AND t.project = %(project)s
+        """,
+        {"project": project},
+    )
+    return ScheduleGraph(tasks, edges)
+
+
+def compute_critical_path(graph):
+    early_start, early_finish = graph.forward_pass()
+    late_start, late_finish = graph.backward_pass(early_finish)
+
+    tasks = {}
+    for name in graph.order:
+        total_float = late_start[name] - early_start[name]
+        tasks[name] = {
+            "early_start": str(graph.to_date(early_start[name])),
+            "early_finish": str(graph.to_date(early_finish[name] - 1)),
+            "late_start": str(graph.to_date(late_start[name])),
+            "late_finish": str(graph.to_date(late_finish[name] - 1)),
+            "duration": graph.duration[name],
+            "total_float": total_float,
+            "critical": total_float <= 0,
+        }
+
+    finish = max(early_finish.values(), default=0)
+    return {
+        "project_start": str(graph.origin),
+        "project_finish": str(graph.to_date(finish - 1)) if early_finish else None,
+        "critical_path": sorted(
+            (name for name, row in tasks.items() if row["critical"]),
+            key=lambda name: (early_start[name], early_finish[name]),
+        ),
+        "tasks": tasks,
+    }
+
+
+@frappe.whitelist()
+def get_critical_path(project: str, refresh: int = 0):
+    """Return early/late dates, total float and the critical path of a project.
+
+    The result is cached per project version (see get_project_tasks_version),
+    so it is only recomputed after tasks or dependencies change.
+    """
+    if not project:
+        frappe.throw(_("Project is required"))
+    if not frappe.has_permission("Project", doc=project):
+        frappe.throw(_("Not permitted to view project {0}").format(project), frappe.PermissionError)
+
+    version = get_project_tasks_version(project)
+    cache_key = f"mksa:project_schedule:{project}:{version}"
+    if not cint(refresh):
+        cached = frappe.cache().get_value(cache_key)
+        if cached:
+            return cached
+
+    result = compute_critical_path(load_schedule_graph(project))
+    result["version"] = version
+    frappe.cache().set_value(cache_key, result, expires_in_sec=SCHEDULE_CACHE_TTL)
+    return result
+
+
+def get_shift_overrides(graph, changes):
+    """Start / duration overrides for the leaves affected by `changes`.
+
+    Each change names a `task` and either `shift_days` (moves the task, or
+    every leaf below a group), `exp_start_date`, `exp_end_date` or
+    `duration` (days).
+    """
+    start, duration = {}, {}
+    leaf_cache = {}
+    for change in changes:
+        name = change.get("task")
+        if name not in graph.tasks:
+            frappe.throw(_("Task {0} is not part of this project").format(name))
+
+        if change.get("shift_days") is not None:
+            for leaf in graph.get_leaves(name, leaf_cache):
+                start[leaf] = start.get(leaf, graph.start[leaf]) + cint(change["shift_days"])
+            continue
+
+        if graph.children.get(name):
+            frappe.throw(_("Group task {0} can only be shifted").format(name))
+
+        if change.get("exp_start_date"):
+            start[name] = (getdate(change["exp_start_date"]) - graph.origin).days
+        if change.get("duration") is not None:
+            duration[name] = max(1, cint(change["duration"]))
+        elif change.get("exp_end_date"):
+            duration[name] = max(1, (getdate(change["exp_end_date"]) - graph.origin).days - start.get(name, graph.start[name]) + 1)
+
+    return start, duration
+
+
+@frappe.whitelist()
+def simulate_schedule_shift(project: str, changes=None):
+    """What-if: reschedule the project in memory with `changes` applied (nothing is written).
+
+    Compares the forward pass with and without the changes, rolls both up to
+    the group tasks and returns every task whose dates move, plus the old
+    and new project finish.
+    """
+    if not project:
+        frappe.throw(_("Project is required"))
+    if isinstance(changes, str):
+        changes = frappe.parse_json(changes)
+    if not changes:
+        frappe.throw(_("At least one change is required"))
+    if not frappe.has_permission("Project", doc=project):
+        frappe.throw(_("Not permitted to view project {0}").format(project), frappe.PermissionError)
+
+    graph = load_schedule_graph(project)
+    start_override, duration_override = get_shift_overrides(graph, changes)
+
+    before_start, before_finish = graph.rollup(*graph.forward_pass())
+    after_start, after_finish = graph.rollup(*graph.forward_pass(start_override, duration_override))
+
+    impacted = []
+    for name in graph.names:
+        if name not in before_start:
+            continue
+        if before_start[name] == after_start[name] and before_finish[name] == after_finish[name]:
+            continue
+        task = graph.tasks[name]
+        impacted.append(
+            {
+                "task": name,
+                "subject": task.subject,
+                "is_group": 1 if graph.children.get(name) else 0,
+                "start_before": str(graph.to_date(before_start[name])),
+                "start_after": str(graph.to_date(after_start[name])),
+                "finish_before": str(graph.to_date(before_finish[name] - 1)),
+                "finish_after": str(graph.to_date(after_finish[name] - 1)),
+                "shift_days": after_finish[name] - before_finish[name],
+            }
+        )
+
+    finish_before = max(before_finish.values(), default=0)
+    finish_after = max(after_finish.values(), default=0)
+    return {
+        "project_finish": {
+            "before": str(graph.to_date(finish_before - 1)),
+            "after": str(graph.to_date(finish_after - 1)),
+            "shift_days": finish_after - finish_before,
+        },
+        "impacted": impacted,
+    }
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Project Status Report: a PDF of the dashboard (get_dashboard_data), the
+project's milestones and its overdue tasks.
+
+PDFs are rendered by background jobs and stored as private Files attached
+to the Project, named after the dashboard data version (see
+get_dashboard_version). A download is served from the stored File as long
+as that version is current; a nightly job pre-renders every open project.
+"""
+import frappe
+from frappe import _
+from frappe.utils import getdate, now_datetime
+
+from milestoneksa.api.project_dashboard import (
+    get_dashboard_data,
+    get_dashboard_version,
+    get_dashboard_window_key,
+    get_milestone_rows,
+)
+
+STATUS_REPORT_EVENT = "milestoneksa_status_report"
+
+STATUS_REPORT_TEMPLATE = "milestoneksa/templates/print_formats/project_status_report.html"
+
+STATUS_REPORT_OVERDUE_LIMIT = 50
+
+
+def get_report_version(project):
+    """Data version of the all-time dashboard, which the report shows"""
+    return get_dashboard_version(project, get_dashboard_window_key())
+
+
+def get_report_file_prefix(project):
+    return f"project-status-{frappe.scrub(project)}-"
+
+
+def get_report_file_name(project, version):
+    return f"{get_report_file_prefix(project)}{version[:12]}.pdf"
+
+
+def get_stored_report(project, version):
+    """file_url of the PDF already rendered for this data version, if any"""
+    return frappe.db.get_value(
+        "File",
+        {
+            "attached_to_doctype": "Project",
+            "attached_to_name": project,
+            "file_name": get_report_file_name(project, version),
+        },
+        "file_url",
+    )
+
+
+def get_overdue_task_rows(project, limit=STATUS_REPORT_OVERDUE_LIMIT):
+    """Overdue leaf tasks, most overdue first"""
+    return frappe.db.sql("""
+        SELECT name, subject, exp_end_date, priority, status, DATEDIFF(%(today)s, exp_end_date) AS days_overdue
+        FROM `tabTask`
+        WHERE project = %(project)s
+          AND is_group = 0
+          AND exp_end_date < %(today)s
+          AND IFNULL(status, '') NOT IN ('Completed', 'Cancelled')
+        ORDER BY exp_end_date ASC, name ASC
+        LIMIT %(limit)s
+    """, {"project": project, "today": getdate(), "limit": limit}, as_dict=True)
+
+
+def render_report_html(project):
+    data = get_dashboard_data(project)
+    return frappe.render_template(
+        STATUS_REPORT_TEMPLATE,
+        {
+            "data": data,
+            "milestones": get_milestone_rows([project]),
+            "overdue_tasks": get_overdue_task_rows(project),
+            "overdue_total": data["tasks"].get("overdue", 0),
+            "generated_on": now_datetime(),
+            "currency": frappe.get_cached_value("Company", data["project_info"]["company"], "default_currency")
+            if data["project_info"]["company"]
+            else frappe.defaults.get_default("currency"),
+        },
+    )
+
+
+def render_project_status_report(project, user=None):
+    """Background job: render and store the PDF for the current data version, then notify `user`"""
+    from frappe.utils.pdf import get_pdf
+
+    version = get_report_version(project)
+    file_url = get_stored_report(project, version)
+    if not file_url:
+        pdf = get_pdf(render_report_html(project), options={"page-size": "A4", "margin-top": "12mm", "margin-bottom": "12mm"})
+
+        file_doc = frappe.get_doc(
+            {
+                "doctype": "File",
+                "file_name": get_report_file_name(project, version),
+                "attached_to_doctype": "Project",
+                "attached_to_name": project,
+                "is_private": 1,
+                "content": pdf,
+            }
+        )
+        file_doc.flags.ignore_permissions = True
+        file_doc.insert()
+        file_url = file_doc.file_url
+
+        # Reports of older data versions are never served again
+        for name in frappe.get_all(
+            "File",
+            filters={
+                "attached_to_doctype": "Project",
+                "attached_to_name": project,
+                "file_name": ["like", f"{get_report_file_prefix(project)}%"],
+                "name": ["!=", file_doc.name],
+            },
+            pluck="name",
+        ):
+            frappe.delete_doc("File", name, ignore_permissions=True)
+        frappe.db.commit()
+
+    if user:
+        frappe.publish_realtime(
+            STATUS_REPORT_EVENT, {"project": project, "file_url": file_url, "version": version}, user=user
+        )
+
+
+def enqueue_status_report(project, user=None):
+    frappe.enqueue(
+        "milestoneksa.api.project_status_report.render_project_status_report",
+        queue="long",
+        job_id=f"project_status_report::{project}::{user or ''}",
+        deduplicate=True,
+        project=project,
+        user=user,
+    )
+
+
+@frappe.whitelist()
+def get_project_status_report(project: str):
+    """Return {"file_url"} of the stored PDF for the current data, or queue its rendering.
+
+    When queued ({"queued": True}) the requesting user receives
+    STATUS_REPORT_EVENT with the file_url once the PDF is ready.
+    """
+    if not project:
+        frappe.throw(_("Project is required"))
+    if not frappe.has_permission("Project", doc=project):
+        frappe.throw(_("Not permitted to view project {0}").format(project), frappe.PermissionError)
+
+    version = get_report_version(project)
+    file_url = get_stored_report(project, version)
+    if file_url:
+        return {"file_url": file_url, "version": version}
+
+    enqueue_status_report(project, frappe.session.user)
+    return {"queued": True, "version": version}
+
+
+def prerender_project_status_reports():
+    """Daily scheduler job: queue the report of every open project whose data changed"""
+    for project in frappe.get_all("Project", filters={"status": "Open"}, pluck="name"):
+        if not get_stored_report(project, get_report_version(project)):
+            enqueue_status_report(project)
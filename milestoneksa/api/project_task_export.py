@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Export a project's task tree (WBS order) to XLSX or CSV.
+
+Rows flow through generators: tasks are read in keyset-paged chunks,
+serialized with project_tasks._serialize_task and written straight to the
+output file (csv.writer, or an openpyxl write-only workbook), so memory
+stays flat whatever the task count. Small projects download inline; larger
+ones are built by a background job into a private File attached to the
+Project and announced over realtime.
+"""
+import csv
+import mimetypes
+import os
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, now_datetime
+from werkzeug.wrappers import Response
+from werkzeug.wsgi import wrap_file
+
+from milestoneksa.api.project_tasks import TASK_FIELDS, _get_currency_for_project, _serialize_task
+
+TASK_EXPORT_EVENT = "milestoneksa_task_export"
+
+EXPORT_FORMATS = ("xlsx", "csv")
+
+# Projects with more tasks than this are exported by a background job
+EXPORT_INLINE_LIMIT = 5000
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (heading, value of a serialized task row)
+EXPORT_COLUMNS = (
+    ("WBS", lambda t: t.custom_wbs),
+    ("Task", lambda t: t.name),
+    ("Subject", lambda t: t.subject),
+    ("Status", lambda t: t.status),
+    ("Priority", lambda t: t.priority),
+    ("Parent Task", lambda t: t.parent_task),
+    ("Is Group", lambda t: cint(t.is_group)),
+    ("Planned Start", lambda t: t.exp_start_date),
+    ("Planned End", lambda t: t.exp_end_date),
+    ("Planned Duration (Days)", lambda t: t.duration_days),
+    ("Actual Start", lambda t: t.custom_actual_start_date or t.act_start_date),
+    ("Actual End", lambda t: t.custom_actual_end_date or t.act_end_date),
+    ("Actual Duration (Days)", lambda t: t.actual_duration_days),
+    ("Planned Hours", lambda t: t.planned_hours),
+    ("Actual Hours", lambda t: t.actual_hours),
+    ("Costing Amount", lambda t: t.total_costing_amount),
+)
+
+
+def iter_project_tasks(project):
+    """Serialized tasks of a project in WBS order, read EXPORT_CHUNK_SIZE rows at a time.
+
+    Rows without a stored WBS code (written outside the Task hooks) follow
+    the numbered ones, by name; the export never writes to the tasks.
+    """
+    fields = ", ".join(f"`{field}`" for field in TASK_FIELDS)
+    for numbered in (True, False):
+        if numbered:
+            condition = "custom_wbs_sort IS NOT NULL AND (custom_wbs_sort, name) > (%(sort)s, %(name)s)"
+            order_by = "custom_wbs_sort ASC, name ASC"
+        else:
+            condition = "custom_wbs_sort IS NULL AND name > %(name)s"
+            order_by = "name ASC"
+
+        last = ("", "")
+        while True:
+            rows = frappe.db.sql(f"""
+                SELECT {fields}
+                FROM `tabTask`
+                WHERE project = %(project)s
+                  AND {condition}
+                ORDER BY {order_by}
+                LIMIT %(limit)s
+            """, {"project": project, "sort": last[0], "name": last[1], "limit": EXPORT_CHUNK_SIZE}, as_dict=True)
+
+            for row in rows:
+                yield _serialize_task(row)
+            if len(rows) < EXPORT_CHUNK_SIZE:
+                break
+            last = (rows[-1].custom_wbs_sort, rows[-1].name)
+
+
+def iter_export_rows(project):
+    """Heading row, then one list of cell values per task"""
+    currency = _get_currency_for_project(project)
+    yield [
+        _(heading) + (f" ({currency})" if heading == "Costing Amount" and currency else "")
+        for heading, _value in EXPORT_COLUMNS
+    ]
+    for task in iter_project_tasks(project):
+        yield [value(task) for _heading, value in EXPORT_COLUMNS]
+
+
+def write_csv(rows, path):
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        for row in rows:
+            writer.writerow(row)
+
+
+def write_xlsx(rows, path, sheet_title):
+    from openpyxl import Workbook
+
+    # Write-only: rows are flushed to disk as they are appended
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title[:31])
+    sheet.freeze_panes = "C2"
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+def write_export(project, file_format, path):
+    rows = iter_export_rows(project)
+    if file_format == "csv":
+        write_csv(rows, path)
+    else:
+        write_xlsx(rows, path, _("Tasks"))
+
+
+def get_export_file_name(project, file_format):
+    return f"{frappe.scrub(project)}-tasks-{now_datetime().strftime('%Y%m%d-%H%M%S')}.{file_format}"
+
+
+def validate_export(project, file_format):
+    if not project:
+        frappe.throw(_("Project is required"))
+    if file_format not in EXPORT_FORMATS:
+        frappe.throw(_("Invalid export format: {0}").format(file_format))
+    if not frappe.has_permission("Project", doc=project):
+        frappe.throw(_("Not permitted to view project {0}").format(project), frappe.PermissionError)
+    if not frappe.has_permission("Task", "export"):
+        frappe.throw(_("Not permitted to export Tasks"), frappe.PermissionError)
+
+
+@frappe.whitelist()
+def start_project_task_export(project: str, file_format: str = "xlsx"):
+    """Decide how the export is delivered.
+
+    Returns {"inline": True} when the file can be downloaded right away with
+    download_project_tasks, otherwise queues build_project_task_export and
+    returns {"queued": True}; the File is then announced with TASK_EXPORT_EVENT.
+    """
+    validate_export(project, file_format)
+
+    if frappe.db.count("Task", {"project": project}) <= EXPORT_INLINE_LIMIT:
+        return {"inline": True}
+
+    frappe.enqueue(
+        "milestoneksa.api.project_task_export.build_project_task_export",
+        queue="long",
+        job_id=f"project_task_export::{project}::{file_format}::{frappe.session.user}",
+        deduplicate=True,
+        project=project,
+        file_format=file_format,
+        user=frappe.session.user,
+    )
+    return {"queued": True}
+
+
+@frappe.whitelist()
+def download_project_tasks(project: str, file_format: str = "xlsx"):
+    """Stream the export of a small project as a file download.
+
+    The file is written to disk and unlinked once opened; the response reads
+    it from the open handle, so the export is never held in memory.
+    """
+    validate_export(project, file_format)
+
+    file_name = get_export_file_name(project, file_format)
+    path = os.path.join(frappe.get_site_path("private", "files"), f"tmp-{frappe.generate_hash(length=10)}-{file_name}")
+    try:
+        write_export(project, file_format, path)
+        f = open(path, "rb")
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+    # frappe.handler passes a returned Response through unchanged
+    response = Response(wrap_file(frappe.local.request.environ, f), direct_passthrough=True)
+    response.mimetype = mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+    response.content_length = os.fstat(f.fileno()).st_size
+    response.headers.add("Content-Disposition", "attachment", filename=file_name)
+    return response
+
+
+def build_project_task_export(project, file_format, user):
+    """Background job: write the export into a private File attached to the Project"""
+    file_name = get_export_file_name(project, file_format)
+    path = frappe.get_site_path("private", "files", file_name)
+    write_export(project, file_format, path)
+
+    # The file is already on disk; the File document only points at it
+    file_doc = frappe.get_doc(
+        {
+            "doctype": "File",
+            "file_name": file_name,
+            "file_url": f"/private/files/{file_name}",
+            "is_private": 1,
+            "attached_to_doctype": "Project",
+            "attached_to_name": project,
+            "file_size": os.path.getsize(path),
+        }
+    )
+    file_doc.flags.ignore_permissions = True
+    file_doc.insert()
+    frappe.db.commit()
+
+    frappe.publish_realtime(
+        TASK_EXPORT_EVENT,
+        {"project": project, "file_url": file_doc.file_url, "file_name": file_name, "file_size": flt(file_doc.file_size)},
+        user=user,
+    )
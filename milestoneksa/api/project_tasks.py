@@ -1,10 +1,50 @@
+import hashlib
 import json
 from collections import defaultdict
 from typing import Dict, Iterable, List, Optional, Tuple
 
 import frappe
 from frappe import _
-from frappe.utils import cint, cstr, date_diff, flt, getdate
+from frappe.utils import add_to_date, cint, cstr, date_diff, flt, get_datetime, getdate, now_datetime
+
+from milestoneksa.api.project_dashboard import DASHBOARD_INVALIDATION, clear_dashboard_cache
+from milestoneksa.api.task_rollup import (
+    ROLLUP_FIELDS,
+    compute_rollup,
+    get_ancestors,
+    get_rollup_tasks,
+    rollup_project,
+    rollup_tasks,
+    write_rollup,
+)
+from milestoneksa.api.task_wbs import renumber_children
+
+# Fields of a task row as sent to the Project task tab
+TASK_FIELDS = [
+    "name",
+    "subject",
+    "status",
+    "priority",
+    "parent_task",
+    "is_group",
+    "exp_start_date",
+    "exp_end_date",
+    "expected_time",
+    "act_start_date",
+    "act_end_date",
+    "actual_time",
+    "total_costing_amount",
+    "description",
+    "lft",
+    "custom_actual_start_date",
+    "custom_actual_end_date",
+    "custom_wbs",
+    "custom_wbs_sort",
+]
+
+# Delta queries re-read this many seconds before the cursor, so rows written by
+# transactions that committed after the previous read are not missed
+TASK_CHANGES_OVERLAP = 60
 
 
 def _date_diff_inclusive(start: Optional[str], end: Optional[str]) -> Optional[int]:
@@ -56,6 +96,7 @@ def _serialize_task(row: frappe._dict) -> frappe._dict:
     row.planned_hours = flt(row.expected_time)
     row.actual_hours = flt(row.actual_time)
     row.total_costing_amount = flt(row.total_costing_amount)
+    row.wbs = row.custom_wbs
     return row
 
 
@@ -69,41 +110,59 @@ def _get_task_meta_options() -> Tuple[List[str], List[str]]:
     return status_options, priority_options
 
 
+def get_project_tasks_version(project: str) -> str:
+    """Cheap token that changes whenever the get_project_tasks payload can change.
+
+    Built from the Project's `modified` plus count and max(`modified`) of its
+    Tasks, so inserts, edits and deletes all produce a new token.
+    """
+    row = frappe.db.sql(
+        """
+        SELECT
+            (SELECT modified FROM `tabProject` WHERE name = %(project)s) AS project_modified,
+            COUNT(*) AS task_count,
+            MAX(modified) AS task_modified
+        FROM `tabTask`
+        WHERE project = %(project)s
+        """,
+        {"project": project},
+        as_dict=True,
+    )[0]
+    key = f"{project}|{row.project_modified}|{row.task_count}|{row.task_modified}"
+    return hashlib.md5(key.encode()).hexdigest()
+
+
 @frappe.whitelist()
-def get_project_tasks(project: str):
+def get_project_tasks(project: str, version: Optional[str] = None):
+    """Return the project's task tree.
+
+    Pass the `version` from a previous response to get a short
+    `{"not_modified": True}` answer when nothing changed since.
+    """
     if not project:
         frappe.throw(_("Project is required"))
 
-    fields = [
-        "name",
-        "subject",
-        "status",
-        "priority",
-        "parent_task",
-        "is_group",
-        "exp_start_date",
-        "exp_end_date",
-        "expected_time",
-        "act_start_date",
-        "act_end_date",
-        "actual_time",
-        "total_costing_amount",
-        "description",
-        "lft",
-        "custom_actual_start_date",
-        "custom_actual_end_date",
-    ]
+    current_version = get_project_tasks_version(project)
+    if version and version == current_version:
+        return {"not_modified": True, "version": current_version}
+
+    cursor = now_datetime()
 
+    # Stored WBS codes give the tree order straight from the (project, custom_wbs_sort) index
     records = frappe.db.get_list(
         "Task",
         filters={"project": project},
-        fields=fields,
-        order_by="lft asc",
+        fields=TASK_FIELDS,
+        order_by="custom_wbs_sort asc",
         as_list=False,
     )
 
     tasks = [_serialize_task(frappe._dict(row)) for row in records]
-    ordered = _treeify(tasks)
+    if all(task.wbs for task in tasks):
+        ordered = tasks
+    else:
+        # Not numbered yet (e.g. rows written outside the Task hooks)
+        ordered = _treeify(tasks)
     currency = _get_currency_for_project(project)
     status_options, priority_options = _get_task_meta_options()
 
@@ -112,6 +171,199 @@ def get_project_tasks(project: str):
         "currency": currency,
         "status_options": status_options,
         "priority_options": priority_options,
+        "version": current_version,
+        "cursor": str(cursor),
+    }
+
+
+# Row layout of get_gantt_rows; `descendants` is set on collapsed groups only
+GANTT_COLUMNS = ["id", "wbs", "subject", "start", "end", "progress", "status", "parent", "is_group", "deps", "descendants"]
+GANTT_PAGE_LENGTH = 500
+
+
+@frappe.whitelist()
+def get_gantt_rows(
+    project: str,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    expanded=None,
+    offset: int = 0,
+    limit: int = GANTT_PAGE_LENGTH,
+):
+    """Compact Gantt rows for a date window and a set of expanded groups.
+
+    Rows come in WBS order as arrays laid out like GANTT_COLUMNS. Children
+    of a group are only listed when the group and all of its ancestors are
+    in `expanded`; a collapsed group is one summary row carrying its
+    descendant count. Rows outside [from_date, to_date] are left out. Page
+    through with `offset` until `next_offset` is null.
+
+    Folding and the date window are applied in the query, so only the
+    requested page is read.
+    """
+    if not project:
+        frappe.throw(_("Project is required"))
+    if not frappe.has_permission("Project", doc=project):
+        frappe.throw(_("Not permitted to view project {0}").format(project), frappe.PermissionError)
+    if isinstance(expanded, str):
+        expanded = frappe.parse_json(expanded)
+    offset, limit = max(0, cint(offset)), min(max(1, cint(limit)), 5 * GANTT_PAGE_LENGTH)
+
+    conditions = ["t.project = %(project)s"]
+    values = {"project": project, "open": tuple(_get_open_groups(project, expanded)) or ("",)}
+    # Top-level rows (no parent in this project) and children of open groups
+    conditions.append("(p.name IS NULL OR IFNULL(p.project, '') != %(project)s OR t.parent_task IN %(open)s)")
+    if from_date or to_date:
+        conditions.append("t.exp_start_date IS NOT NULL AND t.exp_end_date IS NOT NULL")
+    if from_date:
+        conditions.append("t.exp_end_date >= %(from_date)s")
+        values["from_date"] = getdate(from_date)
+    if to_date:
+        conditions.append("t.exp_start_date <= %(to_date)s")
+        values["to_date"] = getdate(to_date)
+    where = " AND ".join(conditions)
+
+    total = frappe.db.sql(
+        f"""
+        SELECT COUNT(*)
+        FROM `tabTask` t
+        LEFT JOIN `tabTask` p ON p.name = t.parent_task
+        WHERE {where}
+        """,
+        values,
+    )[0][0]
+
+    page = frappe.db.sql(
+        f"""
+        SELECT t.name, t.custom_wbs AS wbs, t.subject, t.status, t.parent_task, t.is_group,
+            t.exp_start_date, t.exp_end_date, t.progress,
+            IF(t.name IN %(open)s, 0, (t.rgt - t.lft - 1) DIV 2) AS descendants
+        FROM `tabTask` t
+        LEFT JOIN `tabTask` p ON p.name = t.parent_task
+        WHERE {where}
+        ORDER BY t.custom_wbs_sort, t.lft
+        LIMIT %(limit)s OFFSET %(offset)s
+        """,
+        {**values, "limit": limit, "offset": offset},
+        as_dict=True,
+    )
+
+    deps = defaultdict(list)
+    if page:
+        for row in frappe.db.sql(
+            """
+            SELECT parent, task
+            FROM `tabTask Depends On`
+            WHERE parenttype = 'Task' AND parent IN %(names)s
+            ORDER BY idx
+            """,
+            {"names": tuple(t.name for t in page)},
+            as_dict=True,
+        ):
+            deps[row.parent].append(row.task)
+
+    rows = [
+        [
+            t.name,
+            t.wbs,
+            t.subject,
+            str(t.exp_start_date) if t.exp_start_date else None,
+            str(t.exp_end_date) if t.exp_end_date else None,
+            flt(t.progress),
+            t.status,
+            t.parent_task,
+            cint(t.is_group),
+            deps.get(t.name) or None,
+            cint(t.descendants) or None,
+        ]
+        for t in page
+    ]
+
+    return {
+        "columns": GANTT_COLUMNS,
+        "rows": rows,
+        "total": total,
+        "next_offset": offset + limit if offset + limit < total else None,
+    }
+
+
+def _get_open_groups(project: str, expanded) -> set:
+    """The `expanded` groups whose ancestors in `project` are all expanded too"""
+    expanded = set(expanded or [])
+    if not expanded:
+        return set()
+
+    parent_of = dict(
+        frappe.db.sql(
+            "SELECT name, parent_task FROM `tabTask` WHERE project = %(project)s AND name IN %(names)s",
+            {"project": project, "names": tuple(expanded)},
+        )
+    )
+    # Parents outside `expanded` close their branch when they are in the project
+    outside = {parent for parent in parent_of.values() if parent and parent not in parent_of}
+    closed = set(
+        frappe.db.sql(
+            "SELECT name FROM `tabTask` WHERE project = %(project)s AND name IN %(names)s",
+            {"project": project, "names": tuple(outside) or ("",)},
+            pluck=True,
+        )
+    )
+
+    open_groups = set()
+    for name in parent_of:
+        chain, node = [], name
+        while node in parent_of and node not in open_groups:
+            chain.append(node)
+            node = parent_of[node]
+        if node in open_groups or node not in closed:
+            open_groups.update(chain)
+    return open_groups
+
+
+@frappe.whitelist()
+def get_project_task_changes(project: str, since: str):
+    """Return the tasks changed since `since` (the `cursor` of an earlier response).
+
+    `changed` holds inserted or modified tasks, `deleted` the names of tasks
+    deleted since (from Deleted Document). `task_count` lets the client detect
+    drift it cannot patch (e.g. a task moved to another project) and reload.
+    """
+    if not project:
+        frappe.throw(_("Project is required"))
+    if not since:
+        frappe.throw(_("Cursor is required"))
+    if not frappe.has_permission("Project", doc=project):
+        frappe.throw(_("Not permitted to view project {0}").format(project), frappe.PermissionError)
+
+    cursor = now_datetime()
+    window_start = add_to_date(get_datetime(since), seconds=-TASK_CHANGES_OVERLAP)
+
+    records = frappe.db.get_list(
+        "Task",
+        filters={"project": project, "modified": [">=", window_start]},
+        fields=TASK_FIELDS,
+        order_by="lft asc",
+        as_list=False,
+    )
+
+    deleted = frappe.db.sql(
+        """
+        SELECT DISTINCT deleted_name
+        FROM `tabDeleted Document`
+        WHERE deleted_doctype = 'Task'
+            AND creation >= %(window_start)s
+            AND JSON_UNQUOTE(JSON_EXTRACT(data, '$.project')) = %(project)s
+        """,
+        {"project": project, "window_start": window_start},
+        pluck=True,
+    )
+
+    return {
+        "changed": [_serialize_task(frappe._dict(row)) for row in records],
+        "deleted": deleted,
+        "task_count": frappe.db.count("Task", {"project": project}),
+        "version": get_project_tasks_version(project),
+        "cursor": str(cursor),
     }
 
 
@@ -151,6 +403,46 @@ def create_project_task(project: str, task=None):
     return doc.name
 
 
+EDITABLE_TASK_FIELDS = {
+    "subject",
+    "is_group",
+    "status",
+    "priority",
+    "exp_start_date",
+    "exp_end_date",
+    "planned_hours",
+    "expected_time",
+    "parent_task",
+    "description",
+    "custom_actual_start_date",
+    "custom_actual_end_date",
+}
+
+# Changes to these go through Task.save() (nested set, status rules, date
+# validations, completed_on and rescheduling of dependent tasks); the rest can
+# be written directly by bulk_update_project_tasks
+SAVE_TASK_FIELDS = {"is_group", "status", "parent_task", "exp_start_date", "exp_end_date"}
+
+
+def _normalize_task_updates(updates) -> dict:
+    """Editable fields of an updates dict, with client aliases and empty values normalised"""
+    values = {}
+    for key, value in updates.items():
+        if key not in EDITABLE_TASK_FIELDS:
+            continue
+
+        if key in ("planned_hours", "expected_time"):
+            key = "expected_time"
+            value = flt(value)
+        elif key == "is_group":
+            value = cint(value)
+        elif key in ("exp_start_date", "exp_end_date", "custom_actual_start_date", "custom_actual_end_date"):
+            value = getdate(value) if value else None
+
+        values[key] = value
+    return values
+
+
 @frappe.whitelist()
 def update_project_task(task_name: str, updates=None):
     """Update a task with the given updates dict"""
@@ -162,51 +454,165 @@ def update_project_task(task_name: str, updates=None):
     if isinstance(updates, str):
         updates = frappe.parse_json(updates)
 
-    allowed_fields = {
-        "subject",
-        "is_group",
-        "status",
-        "priority",
-        "exp_start_date",
-        "exp_end_date",
-        "planned_hours",
-        "expected_time",
-        "parent_task",
-        "description",
-        "custom_actual_start_date",
-        "custom_actual_end_date",
-    }
-
     doc = frappe.get_doc("Task", task_name)
     dirty = False
 
-    for key, value in updates.items():
-        if key not in allowed_fields:
-            continue
-
-        if key in ("planned_hours", "expected_time"):
-            key = "expected_time"
-            value = flt(value)
-        elif key == "is_group":
-            value = cint(value)
-        elif key in ("exp_start_date", "exp_end_date", "custom_actual_start_date", "custom_actual_end_date") and not value:
-            value = None
-
+    for key, value in _normalize_task_updates(updates).items():
         if doc.get(key) != value:
             doc.set(key, value)
             dirty = True
 
     if dirty:
+        # Ancestors are rolled up by the queue_ancestor_rollup Task hook
         doc.save()
         frappe.db.commit()
-        
-        # Recalculate parent metrics if this task has a parent
-        if doc.parent_task:
-            recalculate_parent_task(doc.parent_task)
 
     return doc.name
 
 
+@frappe.whitelist()
+def bulk_update_project_tasks(project: str, updates=None, version: Optional[str] = None):
+    """Apply many task edits in one transaction.
+
+    `updates` is a list of `{"name": <task>, <field>: <value>, ...}`. Every row
+    is validated before anything is written. Structural and schedule changes
+    (status, parent, group, planned dates) are saved per document; all other
+    field changes are written with a single bulk update that still stamps
+    `modified` and records a Version. Parents are then rolled up in one pass.
+    Returns the new state of the edited tasks and of the parents that changed,
+    in the shape of get_project_task_changes. `cursor` is only returned when
+    the caller's `version` was current, i.e. it has seen every earlier change.
+    """
+    if not project:
+        frappe.throw(_("Project is required"))
+    if isinstance(updates, str):
+        updates = frappe.parse_json(updates)
+    if not updates:
+        frappe.throw(_("Updates are required"))
+    if not frappe.has_permission("Project", doc=project, ptype="write"):
+        frappe.throw(_("Not permitted to edit project {0}").format(project), frappe.PermissionError)
+
+    # Later rows for the same task win, like sequential single updates would
+    changes = {}
+    for row in updates:
+        name = row.get("name")
+        if not name:
+            frappe.throw(_("Every update needs a task name"))
+        changes.setdefault(name, {}).update(_normalize_task_updates(row))
+
+    current = {
+        row.name: row
+        for row in frappe.get_all(
+            "Task",
+            filters={"project": project},
+            fields=["name", *sorted(EDITABLE_TASK_FIELDS - {"planned_hours"})],
+            limit_page_length=0,
+        )
+    }
+
+    _, priority_options = _get_task_meta_options()
+    errors = []
+    for name, values in changes.items():
+        task = current.get(name)
+        if not task:
+            errors.append(_("Task {0} does not belong to project {1}").format(name, project))
+            continue
+        frappe.has_permission("Task", "write", doc=name, throw=True)
+        merged = {**task, **values}
+        if not cstr(merged.get("subject")).strip():
+            errors.append(_("{0}: subject is required").format(name))
+        if merged.get("priority") and merged["priority"] not in priority_options:
+            errors.append(_("{0}: {1} is not a valid priority").format(name, merged["priority"]))
+        if merged.get("parent_task") and merged["parent_task"] not in current:
+            errors.append(_("{0}: parent task {1} is not in this project").format(name, merged["parent_task"]))
+        for start, end in (("exp_start_date", "exp_end_date"), ("custom_actual_start_date", "custom_actual_end_date")):
+            if merged.get(start) and merged.get(end) and getdate(merged[start]) > getdate(merged[end]):
+                errors.append(_("{0}: start date is after end date").format(name))
+    if errors:
+        frappe.throw("<br>".join(errors), title=_("Invalid task updates"))
+
+    # Only a caller that was up to date may skip ahead to the post-write cursor
+    cursor = now_datetime() if version and version == get_project_tasks_version(project) else None
+
+    bulk_values = {}
+    for name, values in changes.items():
+        task = current[name]
+        dirty = {key: value for key, value in values.items() if task.get(key) != value}
+        if not dirty:
+            continue
+
+        if SAVE_TASK_FIELDS & set(dirty):
+            doc = frappe.get_doc("Task", name)
+            doc.update(dirty)
+            # The rollup below covers this edit; no background rollup job
+            doc.flags.skip_ancestor_rollup = True
+            doc.save()
+        else:
+            bulk_values[name] = dirty
+
+    if bulk_values:
+        _bulk_update_tasks(current, bulk_values)
+
+    # New and previous parents of every edited task, and their ancestors
+    tasks = get_rollup_tasks(project)
+    parents = {t.parent_task for t in tasks if t.name in changes}
+    parents |= {current[name].parent_task for name in changes}
+    rolled = rollup_tasks(tasks, get_ancestors(tasks, parents))
+    write_rollup(project, rolled)
+    clear_dashboard_cache(project, DASHBOARD_INVALIDATION["Task"])
+    frappe.db.commit()
+
+    records = frappe.db.get_list(
+        "Task",
+        filters={"project": project, "name": ["in", list({*changes, *rolled})]},
+        fields=TASK_FIELDS,
+        order_by="lft asc",
+        as_list=False,
+    )
+
+    return {
+        "changed": [_serialize_task(frappe._dict(row)) for row in records],
+        "deleted": [],
+        "task_count": len(current),
+        "version": get_project_tasks_version(project),
+        "cursor": cursor,
+    }
+
+
+def _bulk_update_tasks(current: Dict[str, frappe._dict], bulk_values: Dict[str, dict]):
+    """Write plain field edits directly, keeping `modified` and the Version trail that save() would"""
+    now = now_datetime()
+    user = frappe.session.user
+
+    frappe.db.bulk_update(
+        "Task",
+        {name: {**values, "modified": now, "modified_by": user} for name, values in bulk_values.items()},
+        chunk_size=500,
+    )
+    frappe.db.bulk_insert(
+        "Version",
+        ["name", "creation", "modified", "owner", "modified_by", "ref_doctype", "docname", "data"],
+        [
+            [
+                frappe.generate_hash(length=10),
+                now,
+                now,
+                user,
+                user,
+                "Task",
+                name,
+                frappe.as_json({
+                    "changed": [[key, current[name].get(key), value] for key, value in values.items()],
+                    "added": [],
+                    "removed": [],
+                    "row_changed": [],
+                }),
+            ]
+            for name, values in bulk_values.items()
+        ],
+    )
+
+
 @frappe.whitelist()
 def recalculate_parent_task(parent_task_name: str):
     """Recalculate parent task metrics based on children tasks"""
@@ -219,43 +625,15 @@ def recalculate_parent_task(parent_task_name: str):
     children = frappe.get_all(
         "Task",
         filters={"parent_task": parent_task_name},
-        fields=[
-            "exp_start_date", "exp_end_date", "expected_time", "actual_time", "status",
-            "custom_actual_start_date", "custom_actual_end_date"
-        ]
+        fields=list(ROLLUP_FIELDS),
     )
     
     if not children:
         return
     
-    # Calculate aggregated PLANNED metrics
-    start_dates = [c.exp_start_date for c in children if c.exp_start_date]
-    end_dates = [c.exp_end_date for c in children if c.exp_end_date]
-    
-    parent.exp_start_date = min(start_dates) if start_dates else None
-    parent.exp_end_date = max(end_dates) if end_dates else None
-    parent.expected_time = sum(flt(c.expected_time) for c in children)
-    
-    # Calculate aggregated ACTUAL metrics
-    actual_start_dates = [c.custom_actual_start_date for c in children if c.custom_actual_start_date]
-    actual_end_dates = [c.custom_actual_end_date for c in children if c.custom_actual_end_date]
-    
-    parent.custom_actual_start_date = min(actual_start_dates) if actual_start_dates else None
-    parent.custom_actual_end_date = max(actual_end_dates) if actual_end_dates else None
-    
-    # Sum actual hours from children (only if they have actual time logged)
-    # Note: actual_time comes from Timesheet, we keep that as is
-    # But if you want to aggregate, you can uncomment:
-    # total_actual = sum(flt(c.actual_time) for c in children if c.actual_time)
-    # if total_actual > 0:
-    #     parent.actual_time = total_actual
-    
-    # Check if all children are completed
-    all_completed = all(c.status == "Completed" for c in children if c.status)
-    if all_completed and len(children) > 0:
-        parent.status = "Completed"
-    elif any(c.status == "Working" for c in children):
-        parent.status = "Working"
+    # Planned/actual dates, planned hours and status from the children.
+    # actual_time comes from Timesheet, so it is left as is
+    parent.update(compute_rollup(children))
     
     parent.save()
     frappe.db.commit()
@@ -273,41 +651,233 @@ def recalculate_all_project_parents(project: str):
     if not project:
         frappe.throw(_("Project is required"))
     
-    # Get all parent tasks (tasks that have children)
-    all_tasks = frappe.get_all(
-        "Task",
-        filters={"project": project},
-        fields=["name", "parent_task"],
-        order_by="lft desc"  # Process deepest children first
-    )
-    
-    parent_task_names = set()
-    for task in all_tasks:
-        if task.parent_task:
-            parent_task_names.add(task.parent_task)
-    
-    updated_count = 0
-    for parent_name in parent_task_names:
-        try:
-            recalculate_parent_task(parent_name)
-            updated_count += 1
-        except Exception as e:
-            frappe.log_error(f"Failed to recalculate parent {parent_name}: {str(e)}")
+    # One load, one bottom-up pass, one bulk write of the parents that changed
+    result = rollup_project(project)
     
     return {
-        "updated_count": updated_count,
-        "total_parents": len(parent_task_names)
+        "updated_count": len(result["updated"]),
+        "total_parents": result["total_parents"]
     }
 
 
+DELETE_CHUNK_SIZE = 500
+
+
+def _get_connected_tasks(roots: List[str]) -> Tuple[set, Dict[str, frappe._dict]]:
+    """Roots plus, transitively, their descendants and the tasks depending on them.
+
+    Descendants are read through the nested set (lft/rgt), so whole subtrees
+    are returned whatever their project. Only the dependency edge is scoped
+    to the roots' projects. Each round of the closure costs two queries.
+    """
+    by_name: Dict[str, frappe._dict] = {}
+    projects = None
+    frontier = set(roots)
+
+    while frontier:
+        # The frontier tasks and everything under them
+        added = []
+        for task in frappe.db.sql(
+            """
+            SELECT t.name, t.parent_task, t.project, t.lft, t.rgt
+            FROM `tabTask` r
+            INNER JOIN `tabTask` t ON t.lft BETWEEN r.lft AND r.rgt
+            WHERE r.name IN %(names)s
+            """,
+            {"names": tuple(frontier)},
+            as_dict=True,
+        ):
+            if task.name not in by_name:
+                by_name[task.name] = task
+                added.append(task.name)
+
+        if projects is None:
+            projects = tuple({cstr(by_name[name].project) for name in roots if name in by_name})
+        if not added or not projects:
+            break
+
+        # Tasks of the roots' projects that depend on one of the new tasks
+        frontier = set(
+            frappe.db.sql(
+                """
+                SELECT DISTINCT dep.parent
+                FROM `tabTask Depends On` dep
+                INNER JOIN `tabTask` t ON t.name = dep.parent
+                WHERE dep.parenttype = 'Task'
+                    AND dep.task IN %(names)s
+                    AND IFNULL(t.project, '') IN %(projects)s
+                """,
+                {"names": tuple(added), "projects": projects},
+                pluck=True,
+            )
+        ) - set(by_name)
+
+    return set(by_name), by_name
+
+
+# Deleted ranges closed per UPDATE statement by _close_nested_set_gaps
+NESTED_SET_GAPS_PER_UPDATE = 100
+
+
+def _close_nested_set_gaps(intervals: Iterable[Tuple[int, int]]):
+    """Shift the remaining tasks' lft/rgt down over the deleted (lft, rgt) intervals.
+
+    Does what NestedSet.on_trash does per document, for many subtrees at once.
+    Adjacent intervals are merged, and ranges are closed from the right so
+    the positions of the ranges still to close do not move.
+    """
+    ranges = []
+    for lft, rgt in sorted(intervals):
+        if ranges and lft == ranges[-1][1] + 1:
+            ranges[-1][1] = rgt
+        else:
+            ranges.append([lft, rgt])
+    ranges.reverse()
+
+    for start in range(0, len(ranges), NESTED_SET_GAPS_PER_UPDATE):
+        batch = ranges[start:start + NESTED_SET_GAPS_PER_UPDATE]
+
+        def shift(column):
+            return " + ".join(f"IF({column} > {rgt}, {rgt - lft + 1}, 0)" for lft, rgt in batch)
+
+        frappe.db.sql(
+            f"""
+            UPDATE `tabTask`
+            SET lft = lft - ({shift("lft")}), rgt = rgt - ({shift("rgt")})
+            WHERE rgt > {batch[-1][1]}
+            """
+        )
+
+
+def _update_depends_on_text(names: Iterable[str]):
+    """Rebuild Task.depends_on_tasks from the remaining Task Depends On rows, like Task.validate"""
+    names = tuple(names)
+    if not names:
+        return
+
+    depends_on = {name: [] for name in names}
+    for parent, task in frappe.db.sql(
+        """
+        SELECT parent, task
+        FROM `tabTask Depends On`
+        WHERE parenttype = 'Task' AND parent IN %(names)s
+        ORDER BY parent, idx
+        """,
+        {"names": names},
+    ):
+        if task and task not in depends_on[parent]:
+            depends_on[parent].append(task)
+
+    frappe.db.bulk_update(
+        "Task",
+        {name: {"depends_on_tasks": "".join(f"{task}," for task in tasks)} for name, tasks in depends_on.items()},
+        chunk_size=500,
+    )
+
+
+def _bulk_delete_tasks(names: List[str]):
+    """Delete tasks with set-based statements, chunk by chunk.
+
+    `names` must hold whole subtrees (every child of a deleted task is
+    deleted too). Leaves a Deleted Document per task (read by
+    get_project_task_changes and usable for restore) and removes the tasks'
+    Task Depends On rows, the dependency rows pointing at them, and their
+    ToDos and comments. Afterwards the nested set is closed over the removed
+    subtrees, parents left without children are no longer groups, and the
+    remaining tasks that depended on a deleted one get their
+    depends_on_tasks text rebuilt.
+    """
+    now = now_datetime()
+    user = frappe.session.user
+    deleted = set(names)
+    intervals = []
+    parents = set()
+    dependents = set()
+
+    for start in range(0, len(names), DELETE_CHUNK_SIZE):
+        chunk = names[start:start + DELETE_CHUNK_SIZE]
+
+        rows = frappe.db.sql("SELECT * FROM `tabTask` WHERE name IN %(names)s", {"names": tuple(chunk)}, as_dict=True)
+        for row in rows:
+            if row.parent_task not in deleted:
+                # Top of a deleted subtree
+                parents.add(row.parent_task)
+                if cint(row.lft) and cint(row.rgt):
+                    intervals.append((cint(row.lft), cint(row.rgt)))
+
+        dependents.update(
+            frappe.db.sql(
+                """
+                SELECT DISTINCT parent
+                FROM `tabTask Depends On`
+                WHERE parenttype = 'Task' AND task IN %(names)s
+                """,
+                {"names": tuple(chunk)},
+                pluck=True,
+            )
+        )
+
+        depends_on = defaultdict(list)
+        for dep in frappe.db.sql(
+            "SELECT * FROM `tabTask Depends On` WHERE parenttype = 'Task' AND parent IN %(names)s",
+            {"names": tuple(chunk)},
+            as_dict=True,
+        ):
+            depends_on[dep.parent].append({**dep, "doctype": "Task Depends On"})
+
+        frappe.db.bulk_insert(
+            "Deleted Document",
+            ["name", "creation", "modified", "owner", "modified_by", "deleted_doctype", "deleted_name", "data"],
+            [
+                [
+                    frappe.generate_hash(length=10),
+                    now,
+                    now,
+                    user,
+                    user,
+                    "Task",
+                    row.name,
+                    frappe.as_json({**row, "doctype": "Task", "depends_on": depends_on[row.name]}),
+                ]
+                for row in rows
+            ],
+        )
+
+        frappe.db.delete("Task Depends On", {"parenttype": "Task", "parent": ["in", chunk]})
+        frappe.db.delete("Task Depends On", {"parenttype": "Task", "task": ["in", chunk]})
+        frappe.db.delete("ToDo", {"reference_type": "Task", "reference_name": ["in", chunk]})
+        frappe.db.delete("Comment", {"reference_doctype": "Task", "reference_name": ["in", chunk]})
+        frappe.db.delete("Task", {"name": ["in", chunk]})
+
+    _close_nested_set_gaps(intervals)
+
+    parents.discard(None)
+    parents.discard("")
+    if parents:
+        with_children = set(
+            frappe.get_all("Task", filters={"parent_task": ["in", list(parents)]}, pluck="parent_task", distinct=True)
+        )
+        childless = [name for name in parents if name not in with_children]
+        if childless:
+            frappe.db.set_value("Task", {"name": ["in", childless], "is_group": 1}, "is_group", 0)
+
+    _update_depends_on_text(dependents - deleted)
+
+
 @frappe.whitelist()
 def delete_project_tasks(task_names, force: int = 1, delete_connected: int = 1):
     """
     Delete tasks (forced) + optionally delete all connected tasks.
 
-    Connected tasks includes:
-    - All descendants in the task tree (via lft/rgt nested set)
-    - Tasks that depend on any of the tasks (Task Depends On reverse links)
+    Connected tasks includes (transitively):
+    - All descendants in the task tree, whatever their project
+    - Tasks of the same projects that depend on any of the tasks (Task Depends On reverse links)
+
+    Without delete_connected only the given tasks are deleted; a task that
+    still has children is left in place and reported in `errors`.
+
+    Forced deletes are done in bulk (see _bulk_delete_tasks); otherwise every
+    task goes through frappe.delete_doc with its link checks.
     """
 
     if not task_names:
@@ -327,67 +897,75 @@ def delete_project_tasks(task_names, force: int = 1, delete_connected: int = 1):
     if not roots:
         frappe.throw(_("Task names are required"))
 
-    def _expand_descendants(names: set[str]) -> set[str]:
-        """Return names + all descendants (nested set)."""
-        # Get lft/rgt for current set
-        rows = frappe.get_all("Task", filters={"name": ["in", list(names)]}, fields=["name", "lft", "rgt"])
-        if not rows:
-            return set()
-
-        descendants: set[str] = set()
-        for r in rows:
-            if r.lft is None or r.rgt is None:
-                continue
-            # All nodes inside the interval are descendants including self
-            interval = frappe.get_all(
-                "Task",
-                filters={"lft": [">=", r.lft], "rgt": ["<=", r.rgt]},
-                fields=["name"],
-                limit_page_length=0,
-            )
-            descendants.update(d.name for d in interval if d.name)
-        return descendants
-
-    def _expand_reverse_dependencies(names: set[str]) -> set[str]:
-        """Tasks that depend on given tasks (reverse of Task.depends_on)."""
-        # tabTask Depends On: parent = the Task which has the dependency row; task = referenced Task
-        if not names:
-            return set()
-        parents = frappe.get_all(
-            "Task Depends On",
-            filters={"task": ["in", list(names)]},
-            fields=["parent"],
-            limit_page_length=0,
-        )
-        return set(p.parent for p in parents if p.parent)
-
-    to_delete: set[str] = set(roots)
-
+    # Tasks that keep a child cannot be deleted on their own (NestedSet.on_trash
+    # refuses them); the forced bulk path reports them like the per-document one
+    blocked: set = set()
     if delete_connected:
-        # Expand until stable: descendants + reverse dependencies (+ their descendants)
-        prev_size = -1
-        while prev_size != len(to_delete):
-            prev_size = len(to_delete)
-            # descendants
-            to_delete |= _expand_descendants(to_delete)
-            # reverse dependency parents
-            dep_parents = _expand_reverse_dependencies(to_delete)
-            if dep_parents:
-                to_delete |= dep_parents
-                to_delete |= _expand_descendants(dep_parents)
-
-    # Sort by lft desc to delete children first (avoid nested set issues)
-    lft_rows = frappe.get_all("Task", filters={"name": ["in", list(to_delete)]}, fields=["name", "lft"], limit_page_length=0)
-    lft_map = {r.name: (r.lft or 0) for r in lft_rows}
-    ordered = sorted(list(to_delete), key=lambda n: (lft_map.get(n, 0), n), reverse=True)
+        to_delete, tasks = _get_connected_tasks(roots)
+    else:
+        tasks = {
+            t.name: t
+            for t in frappe.get_all("Task", filters={"name": ["in", roots]}, fields=["name", "parent_task", "project", "lft"])
+        }
+        to_delete = set(tasks)
+        if force:
+            children = defaultdict(set)
+            for child, parent in frappe.get_all(
+                "Task", filters={"parent_task": ["in", list(to_delete)]}, fields=["name", "parent_task"], as_list=True
+            ):
+                children[parent].add(child)
+            # A task whose only children are deleted with it can go; repeat until stable
+            while True:
+                kept = {name for name in to_delete if children[name] - to_delete}
+                if not kept:
+                    break
+                blocked |= kept
+                to_delete -= kept
+
+    # Deepest first, so no task is removed before its children
+    ordered = sorted(to_delete, key=lambda n: (tasks[n].lft or 0, n), reverse=True)
+    projects = {tasks[n].project for n in ordered if tasks[n].project}
+
+    if force:
+        # Forced deletes skip link checks anyway, so skip the per-document path too
+        for name in ordered:
+            frappe.has_permission("Task", "delete", doc=name, throw=True)
+        _bulk_delete_tasks(ordered)
+
+        # Renumber the branches that lost tasks (after_delete does this per document)
+        for project, parent in {(tasks[n].project, tasks[n].parent_task) for n in ordered}:
+            if parent not in to_delete:
+                renumber_children(project, parent)
+
+        # Roll up the surviving parents and refresh what Task.on_trash would have
+        for project in projects:
+            remaining = get_rollup_tasks(project)
+            write_rollup(project, rollup_tasks(remaining, get_ancestors(remaining, {tasks[n].parent_task for n in ordered})))
+            clear_dashboard_cache(project, DASHBOARD_INVALIDATION["Task"])
+            frappe.get_doc("Project", project).update_project()
+
+        errors = []
+        for name in sorted(blocked):
+            msg = f"Failed to delete task {name}: " + _("Cannot delete a task that has child tasks")
+            errors.append(msg)
+            frappe.log_error(msg, "Delete Task Error")
+
+        frappe.db.commit()
+        return {
+            "requested": roots,
+            "delete_connected": bool(delete_connected),
+            "force": True,
+            "deleted_count": len(ordered),
+            "deleted_tasks": ordered,
+            "errors": errors,
+        }
 
     deleted: list[str] = []
     errors: list[str] = []
 
     for name in ordered:
         try:
-            # Force delete bypasses link checks; user explicitly requested "forced"
-            frappe.delete_doc("Task", name, force=force, ignore_permissions=True)
+            frappe.delete_doc("Task", name, ignore_permissions=True)
             deleted.append(name)
         except frappe.DoesNotExistError:
             # Ignore if already deleted by cascade
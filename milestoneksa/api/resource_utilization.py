@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Planned vs actual hours per person and week, across projects.
+
+Planned hours are the leaf tasks' expected_time, split evenly between the
+users in `_assign` and spread evenly over exp_start_date..exp_end_date.
+Actual hours are submitted Timesheet Details. People are keyed by User (an
+Employee's user_id); timesheets of employees without a user stay keyed by
+the Employee.
+
+The assignment list is unnested with JSON_TABLE and timesheets are summed
+per (person, week) in SQL; the day spreading and weekly binning happen in
+NumPy arrays, so nothing loops over tasks in Python.
+"""
+import frappe
+from frappe import _
+from frappe.utils import add_days, flt, getdate
+
+from milestoneksa.api.project_dashboard import get_week_start
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+DEFAULT_WEEKLY_CAPACITY = 40
+
+
+def require_numpy():
+    if np is None:
+        frappe.throw(_("NumPy is required for the utilization heatmap. Please run: bench pip install numpy"))
+
+
+def get_permitted_projects(projects=None):
+    """The given projects (all by default) that the session user can read"""
+    filters = {"name": ["in", projects]} if projects else None
+    return frappe.get_list("Project", filters=filters, pluck="name", limit_page_length=0)
+
+
+def get_planned_rows(start, end, projects):
+    """(user, first day, last day, hours per assignee) of tasks overlapping start..end; days are offsets from `start`"""
+    return frappe.db.sql("""
+        SELECT
+            assignee.user,
+            DATEDIFF(IFNULL(t.exp_start_date, t.exp_end_date), %(start)s),
+            DATEDIFF(IFNULL(t.exp_end_date, t.exp_start_date), %(start)s),
+            t.expected_time / JSON_LENGTH(t._assign)
+        FROM `tabTask` t,
+            JSON_TABLE(t._assign, '$[*]' COLUMNS (user VARCHAR(140) PATH '$')) assignee
+        WHERE t.is_group = 0
+          AND t.expected_time > 0
+          AND IFNULL(t.status, '') != 'Cancelled'
+          AND t._assign LIKE '[%%]' AND JSON_LENGTH(t._assign) > 0
+          AND IFNULL(t.exp_start_date, t.exp_end_date) <= %(end)s
+          AND IFNULL(t.exp_end_date, t.exp_start_date) >= %(start)s
+          AND t.project IN %(projects)s
+    """, {"start": start, "end": end, "projects": tuple(projects)})
+
+
+def get_actual_rows(start, end, projects):
+    """(user or employee, week index, hours) of submitted timesheets between start and end"""
+    return frappe.db.sql("""
+        SELECT
+            COALESCE(emp.user_id, ts.employee, ts.owner) AS person,
+            FLOOR(DATEDIFF(DATE(tsd.from_time), %(start)s) / 7) AS week,
+            SUM(tsd.hours)
+        FROM `tabTimesheet Detail` tsd
+        INNER JOIN `tabTimesheet` ts ON ts.name = tsd.parent
+        LEFT JOIN `tabEmployee` emp ON emp.name = ts.employee
+        WHERE ts.docstatus = 1
+          AND tsd.parenttype = 'Timesheet'
+          AND DATE(tsd.from_time) BETWEEN %(start)s AND %(end)s
+          AND tsd.project IN %(projects)s
+        GROUP BY person, week
+    """, {"start": start, "end": end, "projects": tuple(projects)})
+
+
+def get_people(keys):
+    """{user or employee: (employee, display name)} for the matrix rows"""
+    employees = frappe.get_all(
+        "Employee",
+        filters={"user_id": ["in", keys]},
+        fields=["user_id", "name", "employee_name"],
+        limit_page_length=0,
+    )
+    employees += frappe.get_all(
+        "Employee",
+        filters={"name": ["in", keys]},
+        fields=["name as user_id", "name", "employee_name"],
+        limit_page_length=0,
+    )
+    people = {row.user_id: (row.name, row.employee_name) for row in employees}
+
+    missing = [key for key in keys if key not in people]
+    if missing:
+        for user in frappe.get_all(
+            "User", filters={"name": ["in", missing]}, fields=["name", "full_name"], limit_page_length=0
+        ):
+            people[user.name] = (None, user.full_name)
+    return people
+
+
+def bin_planned(rows, index, days):
+    """(people x days) planned hours, each task's share spread evenly over its days"""
+    planned = np.zeros((len(index), days + 1))
+    if not rows:
+        return planned[:, :-1]
+
+    person = np.array([index[row[0]] for row in rows], dtype=int)
+    first, last, hours = np.array([row[1:] for row in rows], dtype=float).T
+    last = np.maximum(last, first)
+    rate = hours / (last - first + 1)
+    # Only the part of the task inside the window is counted
+    np.add.at(planned, (person, np.clip(first, 0, days).astype(int)), rate)
+    np.add.at(planned, (person, np.clip(last + 1, 0, days).astype(int)), -rate)
+    return np.cumsum(planned, axis=1)[:, :-1]
+
+
+@frappe.whitelist()
+def get_utilization_heatmap(from_date=None, to_date=None, projects=None, capacity=DEFAULT_WEEKLY_CAPACITY):
+    """Planned and actual hours per person and week (Monday to Sunday).
+
+    Compact payload: `weeks` (Mondays) and `people` (keys, employees, names)
+    are the axes; `planned` and `actual` are rows of hours, one row per
+    person and one column per week, in the same order. Defaults to the 52
+    weeks up to the current one. Only projects the user can read (all of
+    them when `projects` is not given) are counted.
+    """
+    require_numpy()
+    if not (frappe.has_permission("Task", "read") and frappe.has_permission("Timesheet", "read")):
+        frappe.throw(_("Not permitted to view resource utilization"), frappe.PermissionError)
+    if isinstance(projects, str):
+        projects = frappe.parse_json(projects) if projects.startswith("[") else [projects]
+
+    to_date = getdate(to_date)
+    start = get_week_start(from_date or add_days(to_date, -51 * 7))
+    weeks = ((to_date - start).days // 7) + 1
+    if weeks < 1:
+        frappe.throw(_("To Date cannot be before From Date"))
+    if weeks > 160:
+        frappe.throw(_("Please select a range of at most 160 weeks"))
+    end = add_days(start, weeks * 7 - 1)
+
+    capacity = flt(capacity) or DEFAULT_WEEKLY_CAPACITY
+    # The queries below are raw SQL: apply the Project permissions up front
+    projects = get_permitted_projects(projects)
+    planned_rows = get_planned_rows(start, end, projects) if projects else []
+    actual_rows = get_actual_rows(start, end, projects) if projects else []
+
+    keys = sorted({row[0] for row in planned_rows} | {row[0] for row in actual_rows})
+    index = {key: idx for idx, key in enumerate(keys)}
+    people = get_people(keys) if keys else {}
+
+    planned = bin_planned(planned_rows, index, weeks * 7).reshape(len(keys), weeks, 7).sum(axis=2)
+
+    actual = np.zeros((len(keys), weeks))
+    if actual_rows:
+        person = np.array([index[row[0]] for row in actual_rows], dtype=int)
+        week, hours = np.array([row[1:] for row in actual_rows], dtype=float).T
+        np.add.at(actual, (person, week.astype(int)), hours)
+
+    return {
+        "weeks": [str(add_days(start, 7 * w)) for w in range(weeks)],
+        "people": keys,
+        "employees": [people.get(key, (None, None))[0] for key in keys],
+        "names": [people.get(key, (None, None))[1] or key for key in keys],
+        "planned": np.round(planned, 1).tolist(),
+        "actual": np.round(actual, 1).tolist(),
+        "capacity": capacity,
+        "totals": {
+            "planned": np.round(planned.sum(axis=1), 1).tolist(),
+            "actual": np.round(actual.sum(axis=1), 1).tolist(),
+            "over_capacity_weeks": (np.maximum(planned, actual) > capacity).sum(axis=1).tolist(),
+        },
+    }
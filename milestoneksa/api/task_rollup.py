@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+Roll child task values up into their group (parent) tasks.
+
+The rules match `project_tasks.recalculate_parent_task`: planned and actual
+dates are the min/max of the children, expected hours are summed, and the
+status becomes Completed when every child is completed or Working when any
+child is working. The whole project is loaded once and evaluated bottom-up,
+so a parent is always computed from already rolled-up children.
+
+Task edits do not roll up synchronously: once the edit commits,
+`queue_ancestor_rollup` marks the edited task's parent dirty and enqueues a
+job unless one is already queued for the project, so a burst of edits (e.g.
+dragging rows in the Gantt) rewrites each ancestor once.
+"""
+from collections import defaultdict
+
+import frappe
+from frappe.utils import flt
+
+from milestoneksa.instrumentation import instrumented
+
+TASK_ROLLUP_EVENT = "milestoneksa_task_rollup"
+
+ROLLUP_FIELDS = (
+    "exp_start_date",
+    "exp_end_date",
+    "expected_time",
+    "custom_actual_start_date",
+    "custom_actual_end_date",
+    "status",
+)
+
+
+def compute_rollup(children):
+    """Rolled-up values of a parent from its (already rolled-up) children"""
+    start_dates = [c.exp_start_date for c in children if c.exp_start_date]
+    end_dates = [c.exp_end_date for c in children if c.exp_end_date]
+    actual_start_dates = [c.custom_actual_start_date for c in children if c.custom_actual_start_date]
+    actual_end_dates = [c.custom_actual_end_date for c in children if c.custom_actual_end_date]
+
+    values = {
+        "exp_start_date": min(start_dates) if start_dates else None,
+        "exp_end_date": max(end_dates) if end_dates else None,
+        "expected_time": sum(flt(c.expected_time) for c in children),
+        "custom_actual_start_date": min(actual_start_dates) if actual_start_dates else None,
+        "custom_actual_end_date": max(actual_end_dates) if actual_end_dates else None,
+    }
+
+    # Status only moves when the children agree; otherwise the parent keeps its own
+    if children and all(c.status == "Completed" for c in children if c.status):
+        values["status"] = "Completed"
+    elif any(c.status == "Working" for c in children):
+        values["status"] = "Working"
+
+    return values
+
+
+def get_rollup_tasks(project):
+    return frappe.get_all(
+        "Task",
+        filters={"project": project},
+        fields=["name", "parent_task", *ROLLUP_FIELDS],
+        limit_page_length=0,
+    )
+
+
+def get_post_order(children, roots):
+    """Parents in post-order (every parent after all of its descendant parents)"""
+    order = []
+    stack = [(name, False) for name in roots]
+    while stack:
+        name, expanded = stack.pop()
+        if expanded:
+            order.append(name)
+            continue
+        stack.append((name, True))
+        stack.extend((child.name, False) for child in children.get(name, ()) if child.name in children)
+    return order
+
+
+def rollup_tasks(tasks, parents=None):
+    """Evaluate the rollup over `tasks` in one post-order pass.
+
+    `parents` limits the recomputed nodes (e.g. to the ancestors of edited
+    tasks); by default every task with children is recomputed. Returns
+    {name: {field: value}} holding only the values that actually changed.
+    """
+    by_name = {task.name: task for task in tasks}
+    children = defaultdict(list)
+    for task in tasks:
+        if task.parent_task:
+            children[task.parent_task].append(task)
+
+    # Top-most parents within the project (their own parent, if any, lives elsewhere)
+    roots = [name for name in children if name in by_name and by_name[name].parent_task not in by_name]
+    changes = {}
+    for name in get_post_order(children, roots):
+        if parents is not None and name not in parents:
+            continue
+
+        task = by_name[name]
+        diff = {}
+        for field, value in compute_rollup(children[name]).items():
+            current = task.get(field)
+            if field == "expected_time":
+                if flt(current, 6) == flt(value, 6):
+                    continue
+            elif current == value:
+                continue
+            diff[field] = value
+
+        if diff:
+            # Later parents read the rolled-up values of this one
+            task.update(diff)
+            changes[name] = diff
+
+    return changes
+
+
+def write_rollup(project, changes):
+    """Write the changed parents in one bulk update, then refresh what depends on them"""
+    if not changes:
+        return
+
+    frappe.db.bulk_update("Task", changes, chunk_size=500)
+
+    # save() is bypassed, so refresh the Project percent complete and the
+    # dashboard like Task.on_update would
+    if any("status" in diff for diff in changes.values()):
+        frappe.get_doc("Project", project).update_project()
+
+    from milestoneksa.api.project_dashboard import DASHBOARD_INVALIDATION, clear_dashboard_cache
+
+    clear_dashboard_cache(project, DASHBOARD_INVALIDATION["Task"])
+
+
+def rollup_project(project, parents=None):
+    """Load the project's tasks once, roll up bottom-up and persist the changed parents"""
+    tasks = get_rollup_tasks(project)
+    changes = rollup_tasks(tasks, parents)
+    write_rollup(project, changes)
+    frappe.db.commit()
+
+    return {
+        "updated": sorted(changes),
+        "total_parents": len({task.parent_task for task in tasks if task.parent_task}),
+    }
+
+
+# A queued flag left behind by a job that never started expires after this long
+ROLLUP_QUEUED_TTL = 10 * 60
+
+
+def get_dirty_key(project):
+    return f"mksa:task_rollup:dirty:{project}"
+
+
+def get_queued_key(project):
+    return f"mksa:task_rollup:queued:{project}"
+
+
+def get_ancestors(tasks, names):
+    """`names` plus all their ancestors within `tasks`"""
+    parent_of = {task.name: task.parent_task for task in tasks}
+    ancestors = set()
+    for name in names:
+        while name and name in parent_of and name not in ancestors:
+            ancestors.add(name)
+            name = parent_of[name]
+    return ancestors
+
+
+@instrumented
+def queue_ancestor_rollup(doc, method=None):
+    """doc_events hook (Task on_update / on_trash): roll the edited task's ancestors up in the background"""
+    if not doc.project or doc.flags.skip_ancestor_rollup:
+        return
+
+    parents = {doc.parent_task}
+    if method != "on_trash":
+        previous = doc.get_doc_before_save()
+        if previous and not any(doc.has_value_changed(f) for f in ("parent_task", *ROLLUP_FIELDS)):
+            return
+        # A task moved under another parent also changes its old branch
+        if previous:
+            parents.add(previous.parent_task)
+
+    parents.discard(None)
+    parents.discard("")
+    if not parents:
+        return
+
+    # Only committed edits are visible to the job, so mark them dirty afterwards
+    project = doc.project
+    frappe.db.after_commit.add(lambda: mark_dirty(project, parents))
+
+
+def mark_dirty(project, parents):
+    """Add `parents` to the project's dirty set and make sure a job will drain it.
+
+    The queued flag is cleared by the job before it reads the set: an edit
+    that finds the flag set was added to the set before that read, and an
+    edit made after it enqueues a job of its own.
+    """
+    cache = frappe.cache()
+    cache.sadd(get_dirty_key(project), *parents)
+    if cache.set(cache.make_key(get_queued_key(project)), 1, nx=True, ex=ROLLUP_QUEUED_TTL):
+        frappe.enqueue(
+            "milestoneksa.api.task_rollup.process_dirty_rollups",
+            queue="short",
+            project=project,
+        )
+
+
+@instrumented
+def process_dirty_rollups(project):
+    """Background job: roll up every dirty parent and its ancestors chain, once.
+
+    Edits arriving while the job runs land in the dirty set, so the set is
+    drained until it stays empty.
+    """
+    cache = frappe.cache()
+    cache.delete_value(get_queued_key(project))
+    key = get_dirty_key(project)
+    updated = set()
+
+    while True:
+        dirty = {frappe.safe_decode(name) for name in cache.smembers(key) or ()}
+        if not dirty:
+            break
+        cache.srem(key, *dirty)
+
+        tasks = get_rollup_tasks(project)
+        changes = rollup_tasks(tasks, get_ancestors(tasks, dirty))
+        write_rollup(project, changes)
+        frappe.db.commit()
+        updated.update(changes)
+
+    if updated:
+        frappe.publish_realtime(
+            TASK_ROLLUP_EVENT,
+            {"project": project, "updated": sorted(updated)},
+            doctype="Project",
+            docname=project,
+        )
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Persisted WBS numbers (1, 1.2, 1.2.3) on Task.
+
+`custom_wbs` is the display code, `custom_wbs_depth` the level (1 for
+project roots) and `custom_wbs_sort` a zero-padded copy that sorts in WBS
+order, so lists and reports can order and filter by WBS with an index.
+
+Siblings are numbered in nested set (lft) order, the order _treeify uses.
+Inserts only number the new task (it is always appended as the last child);
+moves and deletes renumber the children of the parent they affect, and only
+rows whose code actually changes are written. Renumbered rows get a new
+`modified`, so the task tab's delta feed (get_project_task_changes) sends
+them with their new codes.
+"""
+import frappe
+from frappe import _
+from frappe.utils import cint
+
+from milestoneksa.instrumentation import instrumented
+
+WBS_SORT_WIDTH = 5
+
+# custom_wbs_sort is a Data column (varchar 140) and every level takes
+# WBS_SORT_WIDTH digits plus a dot, so deeper trees cannot be stored
+MAX_WBS_DEPTH = (140 + 1) // (WBS_SORT_WIDTH + 1)
+
+
+def get_sort_key(code):
+    parts = code.split(".")
+    if len(parts) > MAX_WBS_DEPTH:
+        frappe.throw(
+            _("Tasks can be nested at most {0} levels deep; WBS {1} is {2} levels deep").format(
+                MAX_WBS_DEPTH, code, len(parts)
+            ),
+            title=_("WBS Too Deep"),
+        )
+    return ".".join(part.zfill(WBS_SORT_WIDTH) for part in parts)
+
+
+def get_parent_wbs(parent_task):
+    """(code, depth, lft, rgt) of a parent task, or None for project roots"""
+    if not parent_task:
+        return None
+    return frappe.db.get_value("Task", parent_task, ["custom_wbs", "custom_wbs_depth", "lft", "rgt"])
+
+
+def compute_wbs(tasks, prefix=None, depth=0):
+    """WBS codes of `tasks` (name, parent_task, lft; one subtree or a whole project).
+
+    Tasks whose parent is not in `tasks` are numbered as top-level rows under
+    `prefix`. Iterative, so tree depth is not bounded by the recursion limit.
+    """
+    names = {t.name for t in tasks}
+    children = {}
+    top = []
+    for t in sorted(tasks, key=lambda t: t.lft or 0):
+        if t.parent_task in names:
+            children.setdefault(t.parent_task, []).append(t.name)
+        else:
+            top.append(t.name)
+
+    codes = {}
+    stack = [(prefix, depth, top)]
+    while stack:
+        parent_code, level, siblings = stack.pop()
+        for idx, name in enumerate(siblings, start=1):
+            code = f"{parent_code}.{idx}" if parent_code else str(idx)
+            codes[name] = (code, level + 1)
+            if name in children:
+                stack.append((code, level + 1, children[name]))
+    return codes
+
+
+def write_wbs(tasks, codes, update_modified=True):
+    """Bulk-write the codes that differ from the stored ones"""
+    current = {t.name: (t.custom_wbs, cint(t.custom_wbs_depth)) for t in tasks}
+    updates = {
+        name: {"custom_wbs": code, "custom_wbs_depth": depth, "custom_wbs_sort": get_sort_key(code)}
+        for name, (code, depth) in codes.items()
+        if current.get(name) != (code, depth)
+    }
+    if updates:
+        frappe.db.bulk_update("Task", updates, chunk_size=500, update_modified=update_modified)
+    return updates
+
+
+def renumber_children(project, parent_task=None, update_modified=True):
+    """Renumber every task below `parent_task` (or the whole project for roots)"""
+    if not project:
+        return {}
+
+    filters = {"project": project}
+    prefix, depth = None, 0
+    parent = get_parent_wbs(parent_task)
+    if parent_task and not parent:
+        # Parent deleted in the same operation; it renumbers its own branch
+        return {}
+    if parent:
+        prefix, depth, lft, rgt = parent
+        if not prefix:
+            # Parent not numbered yet: number from its own parent down
+            return renumber_children(
+                project, frappe.db.get_value("Task", parent_task, "parent_task"), update_modified
+            )
+        filters.update({"lft": [">", lft], "rgt": ["<", rgt]})
+
+    tasks = frappe.get_all(
+        "Task",
+        filters=filters,
+        fields=["name", "parent_task", "lft", "custom_wbs", "custom_wbs_depth"],
+        limit_page_length=0,
+    )
+    return write_wbs(tasks, compute_wbs(tasks, prefix, cint(depth)), update_modified)
+
+
+def renumber_project(project, update_modified=True):
+    return renumber_children(project, update_modified=update_modified)
+
+
+def assign_wbs(doc):
+    """Number a newly inserted task, which the nested set appends as the last child"""
+
+    prefix, depth = None, 0
+    parent = get_parent_wbs(doc.parent_task)
+    if parent:
+        prefix, depth = parent[0], cint(parent[1])
+        if not prefix:
+            renumber_children(doc.project, doc.parent_task)
+            return
+
+    # The nested set is updated by SQL, so read lft back
+    lft = frappe.db.get_value("Task", doc.name, "lft")
+    position = frappe.db.count(
+        "Task",
+        {"project": doc.project, "parent_task": doc.parent_task or ("is", "not set"), "lft": ["<=", lft]},
+    )
+    code = f"{prefix}.{position}" if prefix else str(position)
+    frappe.db.set_value(
+        "Task",
+        doc.name,
+        {"custom_wbs": code, "custom_wbs_depth": depth + 1, "custom_wbs_sort": get_sort_key(code)},
+        update_modified=False,
+    )
+
+
+@instrumented
+def update_wbs(doc, method=None):
+    """doc_events hook (Task on_update): number new tasks, renumber both branches of moved ones
+
+    Runs after Task.on_update, so the nested set is already up to date.
+    """
+    if doc.is_new() or doc.flags.in_insert:
+        if doc.project:
+            assign_wbs(doc)
+        return
+
+    if not (doc.has_value_changed("parent_task") or doc.has_value_changed("project")):
+        return
+
+    previous = doc.get_doc_before_save()
+    if previous:
+        renumber_children(previous.project, previous.parent_task)
+    renumber_children(doc.project, doc.parent_task)
+
+
+@instrumented
+def remove_wbs(doc, method=None):
+    """doc_events hook (Task after_delete): close the gap among the remaining siblings"""
+    renumber_children(doc.project, doc.parent_task)
@@ -1,7 +1,10 @@
 import frappe
 from frappe.utils import nowdate, getdate
 
+from milestoneksa.instrumentation import instrumented
 
+
+@instrumented
 def create_ssa_on_submit(doc, method=None):
 	"""Create a Salary Structure Assignment (SSA) when a Salary Structure is submitted."""
 	# Validate required inputs
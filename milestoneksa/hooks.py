@@ -51,10 +51,71 @@ doc_events = {
 	},
  	"Salary Structure": {
 		"on_submit": "milestoneksa.events.payroll.payroll.create_ssa_on_submit",
-	}
+	},
+	"Project": {
+		"on_update": [
+			"milestoneksa.api.project_dashboard.invalidate_dashboard_cache",
+			"milestoneksa.milestoneksa.doctype.project_daily_cost.project_daily_cost.update_project_status",
+		],
+	},
+	"Task": {
+		"on_update": [
+			"milestoneksa.api.project_dashboard.invalidate_dashboard_cache",
+			"milestoneksa.api.task_rollup.queue_ancestor_rollup",
+			"milestoneksa.api.task_wbs.update_wbs",
+		],
+		"on_trash": [
+			"milestoneksa.api.project_dashboard.invalidate_dashboard_cache",
+			"milestoneksa.api.task_rollup.queue_ancestor_rollup",
+		],
+		"after_delete": "milestoneksa.api.task_wbs.remove_wbs",
+	},
+	"Timesheet": {
+		"on_update": "milestoneksa.api.project_dashboard.invalidate_dashboard_cache",
+		"on_submit": [
+			"milestoneksa.milestoneksa.doctype.project_daily_cost.project_daily_cost.update_project_daily_cost",
+			"milestoneksa.api.project_dashboard.invalidate_dashboard_cache",
+		],
+		"on_cancel": [
+			"milestoneksa.milestoneksa.doctype.project_daily_cost.project_daily_cost.update_project_daily_cost",
+			"milestoneksa.api.project_dashboard.invalidate_dashboard_cache",
+		],
+		"on_trash": "milestoneksa.api.project_dashboard.invalidate_dashboard_cache",
+	},
+	"Purchase Invoice": {
+		"on_submit": [
+			"milestoneksa.milestoneksa.doctype.project_daily_cost.project_daily_cost.update_project_daily_cost",
+			"milestoneksa.api.project_dashboard.invalidate_dashboard_cache",
+		],
+		"on_cancel": [
+			"milestoneksa.milestoneksa.doctype.project_daily_cost.project_daily_cost.update_project_daily_cost",
+			"milestoneksa.api.project_dashboard.invalidate_dashboard_cache",
+		],
+	},
+	"Expense Claim": {
+		"on_submit": [
+			"milestoneksa.milestoneksa.doctype.project_daily_cost.project_daily_cost.update_project_daily_cost",
+			"milestoneksa.api.project_dashboard.invalidate_dashboard_cache",
+		],
+		"on_cancel": [
+			"milestoneksa.milestoneksa.doctype.project_daily_cost.project_daily_cost.update_project_daily_cost",
+			"milestoneksa.api.project_dashboard.invalidate_dashboard_cache",
+		],
+	},
 }
 boot_session = "milestoneksa.boot.boot_session"
 
+scheduler_events = {
+	"daily": [
+		"milestoneksa.api.project_health.snapshot_project_health",
+		"milestoneksa.api.project_status_report.prerender_project_status_reports",
+	],
+}
+
+# Opt-in endpoint timing (site config `milestoneksa_instrumentation`), see milestoneksa.instrumentation
+before_request = ["milestoneksa.instrumentation.before_request"]
+after_request = ["milestoneksa.instrumentation.after_request"]
+
 # Email
 # ------------------
 # Override email sending to use API instead of SMTP (bypasses DigitalOcean SMTP port blocking)
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Opt-in timing and SQL accounting for milestoneksa endpoints and doc_event handlers.
+
+Enable per site:
+  bench --site <site> set-config milestoneksa_instrumentation 1
+
+While enabled, every `milestoneksa.*` whitelisted call (via the before/after_request
+hooks) and every handler decorated with `@instrumented` pushes one sample
+(wall time, SQL count, SQL time, slowest statements) onto a bounded Redis list.
+The "Endpoint Performance" report aggregates the samples.
+"""
+import json
+import time
+from functools import wraps
+
+import frappe
+from frappe.utils import now_datetime
+
+SAMPLES_KEY = "mksa:instrumentation:samples"
+MAX_SAMPLES = 5000
+SLOWEST_STATEMENTS = 3
+STATEMENT_LENGTH = 300
+
+
+def is_enabled():
+	return bool(frappe.conf.get("milestoneksa_instrumentation"))
+
+
+def get_samples():
+	"""All recorded samples, newest first"""
+	return [json.loads(s) for s in frappe.cache().lrange(SAMPLES_KEY, 0, MAX_SAMPLES - 1) or []]
+
+
+def clear_samples():
+	frappe.cache().delete_value(SAMPLES_KEY)
+
+
+def _install_sql_hook():
+	"""Route frappe.db.sql through a counter feeding every open span; returns False if already installed"""
+	if getattr(frappe.local, "mksa_spans", None) is not None:
+		return False
+
+	frappe.local.mksa_spans = []
+	original = frappe.db.sql
+
+	def sql(query, *args, **kwargs):
+		start = time.perf_counter()
+		try:
+			return original(query, *args, **kwargs)
+		finally:
+			elapsed = (time.perf_counter() - start) * 1000
+			for span in frappe.local.mksa_spans:
+				span["queries"] += 1
+				span["sql_ms"] += elapsed
+				_keep_slowest(span["slowest"], elapsed, query)
+
+	sql.mksa_original = original
+	frappe.db.sql = sql
+	return True
+
+
+def _remove_sql_hook():
+	original = getattr(frappe.db.sql, "mksa_original", None)
+	if original:
+		frappe.db.sql = original
+	frappe.local.mksa_spans = None
+
+
+def _keep_slowest(slowest, elapsed, query):
+	if len(slowest) < SLOWEST_STATEMENTS or elapsed > slowest[-1][0]:
+		slowest.append((elapsed, " ".join(str(query).split())[:STATEMENT_LENGTH]))
+		slowest.sort(key=lambda s: s[0], reverse=True)
+		del slowest[SLOWEST_STATEMENTS:]
+
+
+def start_span(name, kind):
+	owns_hook = _install_sql_hook()
+	span = {
+		"name": name,
+		"kind": kind,
+		"start": time.perf_counter(),
+		"queries": 0,
+		"sql_ms": 0.0,
+		"slowest": [],
+		"owns_hook": owns_hook,
+	}
+	frappe.local.mksa_spans.append(span)
+	return span
+
+
+def finish_span(span):
+	spans = getattr(frappe.local, "mksa_spans", None) or []
+	if span in spans:
+		spans.remove(span)
+	if span["owns_hook"]:
+		_remove_sql_hook()
+
+	sample = {
+		"name": span["name"],
+		"kind": span["kind"],
+		"at": str(now_datetime()),
+		"wall_ms": round((time.perf_counter() - span["start"]) * 1000, 2),
+		"queries": span["queries"],
+		"sql_ms": round(span["sql_ms"], 2),
+		"slowest": [{"ms": round(ms, 2), "sql": sql} for ms, sql in span["slowest"]],
+	}
+	try:
+		cache = frappe.cache()
+		cache.lpush(SAMPLES_KEY, json.dumps(sample))
+		cache.ltrim(SAMPLES_KEY, 0, MAX_SAMPLES - 1)
+	except Exception:
+		# Instrumentation must never break the request it measures
+		pass
+
+
+def instrumented(fn):
+	"""Decorator for doc_event handlers and background jobs"""
+	name = f"{fn.__module__}.{fn.__qualname__}"
+
+	@wraps(fn)
+	def wrapper(*args, **kwargs):
+		if not is_enabled():
+			return fn(*args, **kwargs)
+
+		doc = args[0] if args else None
+		method = kwargs.get("method") or (args[1] if len(args) > 1 else None)
+		label = f"{name} ({doc.doctype}.{method})" if getattr(doc, "doctype", None) and method else name
+
+		span = start_span(label, "doc_event" if method else "function")
+		try:
+			return fn(*args, **kwargs)
+		finally:
+			finish_span(span)
+
+	return wrapper
+
+
+def before_request():
+	"""before_request hook: open a span for milestoneksa.* whitelisted calls"""
+	if not is_enabled():
+		return
+	cmd = _get_cmd()
+	if cmd.startswith("milestoneksa."):
+		frappe.local.mksa_request_span = start_span(cmd, "whitelisted")
+
+
+def _get_cmd():
+	"""Dotted method of the current RPC call (`cmd` or /api/method/<cmd>)"""
+	cmd = (frappe.form_dict or {}).get("cmd")
+	if cmd:
+		return cmd
+	path = getattr(getattr(frappe, "request", None), "path", "") or ""
+	for prefix in ("/api/method/", "/api/v1/method/", "/api/v2/method/"):
+		if path.startswith(prefix):
+			return path[len(prefix):]
+	return ""
+
+
+def after_request(response=None, request=None):
+	"""after_request hook: close the span opened in before_request"""
+	span = getattr(frappe.local, "mksa_request_span", None)
+	if span:
+		frappe.local.mksa_request_span = None
+		finish_span(span)
@@ -0,0 +1,145 @@
+# Copyright (c) 2026, ahmed and contributors
+# For license information, please see license.txt
+
+import hashlib
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, getdate, now_datetime
+
+from milestoneksa.instrumentation import instrumented
+
+
+class ProjectDailyCost(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_unique("Project Daily Cost", ["project", "posting_date", "source"])
+
+
+# Source doctype -> SQL that yields (project, posting_date, amount) per day for
+# submitted documents, optionally limited to one project. The expressions match
+# what ERPNext rolls up into the Project totals.
+SOURCE_QUERIES = {
+	"Purchase Invoice": """
+		SELECT pii.project, pi.posting_date, SUM(pii.base_net_amount) AS amount
+		FROM `tabPurchase Invoice Item` pii
+		INNER JOIN `tabPurchase Invoice` pi ON pi.name = pii.parent
+		WHERE pi.docstatus = 1 AND IFNULL(pii.project, '') != '' {condition}
+		GROUP BY pii.project, pi.posting_date
+	""",
+	"Expense Claim": """
+		SELECT ec.project, ec.posting_date, SUM(ec.total_sanctioned_amount) AS amount
+		FROM `tabExpense Claim` ec
+		WHERE ec.docstatus = 1 AND IFNULL(ec.project, '') != '' {condition}
+		GROUP BY ec.project, ec.posting_date
+	""",
+	"Timesheet": """
+		SELECT tsd.project, DATE(tsd.from_time) AS posting_date, SUM(tsd.costing_amount) AS amount
+		FROM `tabTimesheet Detail` tsd
+		INNER JOIN `tabTimesheet` ts ON ts.name = tsd.parent
+		WHERE ts.docstatus = 1 AND tsd.parenttype = 'Timesheet' AND IFNULL(tsd.project, '') != '' {condition}
+		GROUP BY tsd.project, DATE(tsd.from_time)
+	""",
+}
+
+SOURCE_PROJECT_COLUMN = {
+	"Purchase Invoice": "pii.project",
+	"Expense Claim": "ec.project",
+	"Timesheet": "tsd.project",
+}
+
+
+def get_ledger_name(project, posting_date, source):
+	"""Deterministic row name, so concurrent postings to the same day upsert one row"""
+	key = f"{project}|{getdate(posting_date)}|{source}"
+	return hashlib.md5(key.encode()).hexdigest()[:10]
+
+
+def get_cost_rows(doc):
+	"""(project, posting_date, amount) contributions of a submitted document"""
+	if doc.doctype == "Purchase Invoice":
+		return [(row.project, doc.posting_date, flt(row.base_net_amount)) for row in doc.get("items") or []]
+
+	if doc.doctype == "Expense Claim":
+		return [(doc.project, doc.posting_date, flt(doc.total_sanctioned_amount))]
+
+	if doc.doctype == "Timesheet":
+		return [(row.project, row.from_time, flt(row.costing_amount)) for row in doc.get("time_logs") or []]
+
+	return []
+
+
+def post_amounts(source, amounts):
+	"""Add {(project, posting_date): amount} to the ledger (negative amounts reverse)"""
+	now = now_datetime()
+	user = frappe.session.user
+	for (project, posting_date), amount in amounts.items():
+		if not amount:
+			continue
+		frappe.db.sql("""
+			INSERT INTO `tabProject Daily Cost`
+				(name, creation, modified, modified_by, owner, docstatus, project, project_status, posting_date, source, amount)
+			SELECT
+				%(name)s, %(now)s, %(now)s, %(user)s, %(user)s, 0, %(project)s,
+				(SELECT status FROM `tabProject` WHERE name = %(project)s), %(posting_date)s, %(source)s, %(amount)s
+			ON DUPLICATE KEY UPDATE
+				amount = amount + VALUES(amount),
+				project_status = VALUES(project_status),
+				modified = VALUES(modified),
+				modified_by = VALUES(modified_by)
+		""", {
+			"name": get_ledger_name(project, posting_date, source),
+			"now": now,
+			"user": user,
+			"project": project,
+			"posting_date": posting_date,
+			"source": source,
+			"amount": amount,
+		})
+
+
+@instrumented
+def update_project_daily_cost(doc, method=None):
+	"""doc_events hook (on_submit / on_cancel) keeping the ledger in step with its sources"""
+	sign = -1 if method == "on_cancel" else 1
+
+	amounts = {}
+	for project, posting_date, amount in get_cost_rows(doc):
+		if not project or not posting_date:
+			continue
+		key = (project, getdate(posting_date))
+		amounts[key] = amounts.get(key, 0) + sign * amount
+
+	post_amounts(doc.doctype, amounts)
+
+
+@instrumented
+def update_project_status(doc, method=None):
+	"""Project on_update hook: mirror the status that the cost card and chart filter on"""
+	if doc.has_value_changed("status"):
+		frappe.db.sql(
+			"UPDATE `tabProject Daily Cost` SET project_status = %s WHERE project = %s",
+			(doc.status, doc.name),
+		)
+
+
+def rebuild_project_daily_cost(project=None):
+	"""
+	Rebuild the ledger from the source documents (all projects, or one).
+
+	Run from bench:
+	  bench --site <site> execute milestoneksa.milestoneksa.doctype.project_daily_cost.project_daily_cost.rebuild_project_daily_cost
+	"""
+	if project:
+		frappe.db.delete("Project Daily Cost", {"project": project})
+	else:
+		frappe.db.delete("Project Daily Cost")
+
+	for source, query in SOURCE_QUERIES.items():
+		condition = f"AND {SOURCE_PROJECT_COLUMN[source]} = %(project)s" if project else ""
+		rows = frappe.db.sql(query.format(condition=condition), {"project": project}, as_dict=True)
+		post_amounts(source, {(row.project, row.posting_date): flt(row.amount) for row in rows})
+
+	frappe.db.commit()
@@ -0,0 +1,82 @@
+# Copyright (c) 2026, ahmed and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from milestoneksa.milestoneksa.doctype.project_daily_cost import project_daily_cost
+from milestoneksa.milestoneksa.doctype.project_daily_cost.project_daily_cost import (
+	post_amounts,
+	rebuild_project_daily_cost,
+	update_project_daily_cost,
+)
+
+TEST_PROJECT = "_Test Project Daily Cost"
+
+
+def get_ledger(project=TEST_PROJECT):
+	return {
+		(row.posting_date, row.source): row.amount
+		for row in frappe.get_all(
+			"Project Daily Cost", filters={"project": project}, fields=["posting_date", "source", "amount"]
+		)
+	}
+
+
+class TestProjectDailyCost(FrappeTestCase):
+	def setUp(self):
+		frappe.db.delete("Project Daily Cost", {"project": TEST_PROJECT})
+
+	def test_post_amounts_upserts_one_row_per_day_and_source(self):
+		day = getdate("2026-01-05")
+		post_amounts("Timesheet", {(TEST_PROJECT, day): 10})
+		post_amounts("Timesheet", {(TEST_PROJECT, day): 15.5})
+		post_amounts("Expense Claim", {(TEST_PROJECT, day): 7})
+		# Zero amounts do not create rows
+		post_amounts("Purchase Invoice", {(TEST_PROJECT, day): 0})
+
+		self.assertEqual(get_ledger(), {(day, "Timesheet"): 25.5, (day, "Expense Claim"): 7})
+
+	def test_cancel_reverses_submit(self):
+		claim = frappe._dict(
+			doctype="Expense Claim",
+			project=TEST_PROJECT,
+			posting_date="2026-02-01",
+			total_sanctioned_amount=300,
+		)
+		invoice = frappe._dict(
+			doctype="Purchase Invoice",
+			posting_date="2026-02-01",
+			items=[
+				frappe._dict(project=TEST_PROJECT, base_net_amount=100),
+				frappe._dict(project=TEST_PROJECT, base_net_amount=50),
+				frappe._dict(project=None, base_net_amount=999),
+			],
+		)
+
+		update_project_daily_cost(claim, "on_submit")
+		update_project_daily_cost(invoice, "on_submit")
+		day = getdate("2026-02-01")
+		self.assertEqual(get_ledger(), {(day, "Expense Claim"): 300, (day, "Purchase Invoice"): 150})
+
+		update_project_daily_cost(invoice, "on_cancel")
+		self.assertEqual(get_ledger(), {(day, "Expense Claim"): 300, (day, "Purchase Invoice"): 0})
+
+	def test_rebuild_replaces_the_ledger_from_the_sources(self):
+		post_amounts("Timesheet", {(TEST_PROJECT, getdate("2026-03-01")): 42})
+
+		# One source yielding a fixed day for the project, the others nothing
+		empty = "SELECT NULL AS project, NULL AS posting_date, 0 AS amount FROM DUAL WHERE 1 = 0 {condition}"
+		source_queries = {source: empty for source in project_daily_cost.SOURCE_QUERIES}
+		source_queries["Timesheet"] = (
+			"SELECT %(project)s AS project, '2026-03-02' AS posting_date, 8 AS amount FROM DUAL WHERE 1 = 1 {condition}"
+		)
+		with patch.dict(project_daily_cost.SOURCE_QUERIES, source_queries), patch.dict(
+			project_daily_cost.SOURCE_PROJECT_COLUMN, {source: "%(project)s" for source in source_queries}
+		), patch.object(frappe.db, "commit"):
+			rebuild_project_daily_cost(TEST_PROJECT)
+
+		self.assertEqual(get_ledger(), {(getdate("2026-03-02"), "Timesheet"): 8})
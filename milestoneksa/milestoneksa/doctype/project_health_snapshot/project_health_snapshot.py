@@ -0,0 +1,13 @@
+# Copyright (c) 2026, ahmed and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class ProjectHealthSnapshot(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_unique("Project Health Snapshot", ["project", "snapshot_date"])
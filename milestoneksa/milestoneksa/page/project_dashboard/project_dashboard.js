@@ -51,8 +51,31 @@ frappe.pages['project_dashboard'].on_page_load = function(wrapper) {
             <div id="budget-chart" class="chart-block" style="height:260px;"></div>
             <div id="pending-chart" class="chart-block" style="height:260px;"></div>
         </div>
+
+        <div id="task-feed" style="margin-top: 20px;">
+            <div style="display:flex; gap:8px; margin-bottom:8px;">
+                <select id="task-feed-status" class="form-control input-sm" style="width:auto;">
+                    <option value="">${__('All Statuses')}</option>
+                </select>
+                <select id="task-feed-priority" class="form-control input-sm" style="width:auto;">
+                    <option value="">${__('All Priorities')}</option>
+                </select>
+            </div>
+            <table class="table table-bordered table-sm">
+                <thead><tr>
+                    <th>${__('Task')}</th><th>${__('Status')}</th><th>${__('Priority')}</th>
+                    <th>${__('Start')}</th><th>${__('End')}</th>
+                </tr></thead>
+                <tbody id="task-feed-rows"></tbody>
+            </table>
+            <button id="task-feed-more" class="btn btn-default btn-sm" style="display:none;">${__('Load more')}</button>
+        </div>
     `);
 
+    // --- Task feed filters and paging ---
+    $(page.main).on('change', '#task-feed-status, #task-feed-priority', () => load_task_feed(true));
+    $(page.main).on('click', '#task-feed-more', () => load_task_feed(false));
+
     // --- Switch Gantt View Mode on Dropdown Change ---
     $(page.main).on('change', '#gantt-view-mode', function() {
         const mode = $(this).val();
@@ -65,18 +88,24 @@ frappe.pages['project_dashboard'].on_page_load = function(wrapper) {
 async function load_project_dashboard(project) {
     frappe.dom.freeze('Loading dashboard...');
     try {
-        const r = await frappe.call({
-            method: 'milestoneksa.milestoneksa.page.project_dashboard.project_dashboard.get_project_dashboard_data',
-            args: { project_name: project }
-        });
+        const [r, critical] = await Promise.all([
+            frappe.call({
+                method: 'milestoneksa.milestoneksa.page.project_dashboard.project_dashboard.get_project_dashboard_data',
+                args: { project_name: project }
+            }),
+            load_critical_path(project)
+        ]);
         const data = r.message;
         if (data) {
-            const viewMode = $('#gantt-view-mode').val() || 'Month';
-            renderGanttChart(data.tasks, viewMode);
+            window.ganttState = { project, critical, expanded: new Set(), rows: [], next_offset: 0 };
+            await load_gantt_rows(true);
             renderStatusChart(data.status_counts);
             renderPriorityChart(data.priority_counts);
             renderBudgetChart(data.project);
             renderPendingChart(data.pending_counts);
+            window.taskFeedState = { project, next_cursor: data.next_cursor };
+            renderTaskFeedFilters(data.status_counts, data.priority_counts);
+            renderTaskFeed(data.tasks, true);
         } else {
             frappe.msgprint(__('No data found for project: {0}', [project]));
         }
@@ -86,32 +115,91 @@ async function load_project_dashboard(project) {
 }
 
 /**
- * Render the Gantt chart for the given tasks.
- * @param {Array} tasks
+ * Critical task names of the project (cached server-side per project version).
+ * A failing schedule (e.g. circular dependencies) just means no highlighting.
+ */
+async function load_critical_path(project) {
+    try {
+        const r = await frappe.call({
+            method: 'milestoneksa.api.project_schedule.get_critical_path',
+            args: { project: project }
+        });
+        return new Set(r.message?.critical_path || []);
+    } catch (e) {
+        console.warn('Critical path unavailable', e);
+        return new Set();
+    }
+}
+
+const GANTT_PAGE_LENGTH = 300;
+
+/**
+ * Fetch Gantt rows (compact arrays, see project_tasks.get_gantt_rows) for the
+ * current expansion state: all groups start collapsed, so only the top of the
+ * WBS is loaded until the user expands a group or asks for more rows.
+ * @param {Boolean} reset - reload from the first row (after expand/collapse)
+ */
+async function load_gantt_rows(reset = false) {
+    const state = window.ganttState;
+    if (!state) return;
+
+    const r = await frappe.call({
+        method: 'milestoneksa.api.project_tasks.get_gantt_rows',
+        args: {
+            project: state.project,
+            expanded: Array.from(state.expanded),
+            offset: reset ? 0 : state.next_offset,
+            limit: GANTT_PAGE_LENGTH
+        }
+    });
+    const data = r.message || { columns: [], rows: [], next_offset: null };
+    const col = Object.fromEntries(data.columns.map((c, i) => [c, i]));
+    const rows = data.rows.map(row => Object.fromEntries(Object.entries(col).map(([c, i]) => [c, row[i]])));
+
+    state.rows = reset ? rows : state.rows.concat(rows);
+    state.next_offset = data.next_offset;
+    renderGanttChart(state, $('#gantt-view-mode').val() || 'Month');
+}
+
+/**
+ * Render the Gantt chart for the loaded rows.
+ * @param {Object} state      - window.ganttState (rows, expanded groups, critical task names)
  * @param {String} view_mode  - 'Week' | 'Month' | 'Year'
  */
-function renderGanttChart(tasks, view_mode = 'Month') {
-    // Sort tasks by start date (oldest first)
-    tasks.sort((a, b) => new Date(a.exp_start_date) - new Date(b.exp_start_date));
-
-    const ganttData = tasks.map(t => ({
-        id: t.name,
-        name: t.subject || t.name,
-        start: t.exp_start_date || frappe.datetime.get_today(),
-        end: t.exp_end_date || t.exp_start_date || frappe.datetime.get_today(),
+function renderGanttChart(state, view_mode = 'Month') {
+    const today = frappe.datetime.get_today();
+    const loaded = new Set(state.rows.map(t => t.id));
+
+    const ganttData = state.rows.map(t => ({
+        id: t.id,
+        name: `${t.wbs} ${t.subject || t.id}` + (t.descendants ? ` (+${t.descendants})` : ''),
+        start: t.start || today,
+        end: t.end || t.start || today,
         progress: (t.status === 'Completed' ? 100 : (t.progress || 0)),
-       dependencies: Array.isArray(t.depends_on_tasks)
-        ? t.depends_on_tasks.join(',')
-        : (typeof t.depends_on_tasks === 'string' ? t.depends_on_tasks : '')
+        custom_class: state.critical.has(t.id) ? 'mksa-critical' : '',
+        dependencies: (t.deps || []).filter(d => loaded.has(d)).join(',')
     }));
 
     $('#gantt-container').empty();
+    $('#gantt-load-more').remove();
     if (ganttData.length) {
         window.ganttChart = new Gantt("#gantt-container", ganttData, {
             view_mode: view_mode,
-            date_format: "YYYY-MM-DD"
+            date_format: "YYYY-MM-DD",
+            // Clicking a group bar expands / collapses it
+            on_click: task => {
+                const row = state.rows.find(t => t.id === task.id);
+                if (!row || !row.is_group) return;
+                state.expanded.has(row.id) ? state.expanded.delete(row.id) : state.expanded.add(row.id);
+                load_gantt_rows(true);
+            }
         });
     }
+    if (state.next_offset) {
+        $(`<button id="gantt-load-more" class="btn btn-default btn-sm" style="margin-top:8px;">${__('Load more tasks')}</button>`)
+            .insertAfter('#gantt-container')
+            .on('click', () => load_gantt_rows(false));
+    }
 }
 
 function renderStatusChart(status_counts) {
@@ -161,3 +249,48 @@ function renderPendingChart(pending_counts) {
         height: 250
     });
 }
+
+/**
+ * Fetch one page of the task feed (cursor paged, see get_project_dashboard_tasks).
+ * @param {Boolean} reset - start over, e.g. after a filter change
+ */
+async function load_task_feed(reset = false) {
+    const state = window.taskFeedState;
+    if (!state || (!reset && !state.next_cursor)) return;
+
+    const r = await frappe.call({
+        method: 'milestoneksa.milestoneksa.page.project_dashboard.project_dashboard.get_project_dashboard_tasks',
+        args: {
+            project_name: state.project,
+            status: $('#task-feed-status').val() || null,
+            priority: $('#task-feed-priority').val() || null,
+            cursor: reset ? null : state.next_cursor
+        }
+    });
+    const data = r.message || { tasks: [], next_cursor: null };
+    state.next_cursor = data.next_cursor;
+    renderTaskFeed(data.tasks, reset);
+}
+
+function renderTaskFeedFilters(status_counts, priority_counts) {
+    const options = counts => Object.keys(counts)
+        .map(k => `<option value="${frappe.utils.escape_html(k)}">${__(k)} (${counts[k]})</option>`)
+        .join('');
+    $('#task-feed-status').find('option:not(:first)').remove().end().append(options(status_counts)).val('');
+    $('#task-feed-priority').find('option:not(:first)').remove().end().append(options(priority_counts)).val('');
+}
+
+function renderTaskFeed(tasks, reset) {
+    const $rows = $('#task-feed-rows');
+    if (reset) $rows.empty();
+    $rows.append(tasks.map(t => `
+        <tr>
+            <td><a href="/app/task/${encodeURIComponent(t.name)}">${frappe.utils.escape_html(t.subject || t.name)}</a></td>
+            <td>${__(t.status || '')}</td>
+            <td>${__(t.priority || '')}</td>
+            <td>${t.exp_start_date ? frappe.datetime.str_to_user(t.exp_start_date) : ''}</td>
+            <td>${t.exp_end_date ? frappe.datetime.str_to_user(t.exp_end_date) : ''}</td>
+        </tr>
+    `).join(''));
+    $('#task-feed-more').toggle(!!window.taskFeedState.next_cursor);
+}
@@ -1,56 +1,168 @@
 # File: milestoneksa/milestoneksa/page/project_dashboard/project_dashboard.py
 
+from datetime import date
+
 import frappe
+from frappe.utils import cint, cstr
+
+TASK_FEED_FIELDS = [
+    "name", "subject", "status", "priority",
+    "exp_start_date", "exp_end_date", "depends_on_tasks"
+]
+
+TASK_FEED_PAGE_LENGTH = 50
+
+# Optional doctypes whose open documents are shown as pending items
+PENDING_DOCTYPES = ("Project Decision", "Project Action", "Project Change Request")
+
+# project_info key -> Project fields to read it from, first one set wins
+# (only fields the Project doctype actually has are queried)
+PROJECT_INFO_FIELDS = {
+    "planned_duration": ("expected_duration", "duration"),
+    "estimated_cost": ("estimated_cost", "total_planned_cost"),
+    "actual_cost": ("actual_cost", "total_costing_amount"),
+}
+
+# site -> installed PENDING_DOCTYPES; DocTypes are not created at runtime,
+# so probing once per worker process is enough
+_pending_doctypes = {}
+
 
 @frappe.whitelist()
-def get_project_dashboard_data(project_name):
-    """Fetch all data needed for the project dashboard."""
+def get_project_dashboard_data(project_name, status=None, priority=None, page_length=TASK_FEED_PAGE_LENGTH):
+    """Fetch all data needed for the project dashboard.
+
+    Only the first page of tasks is returned (see get_project_dashboard_tasks
+    for the next ones); the status and priority counts cover every task.
+    """
     # Permission check
     if not frappe.has_permission("Project", doc=project_name, throw=False):
         frappe.throw("Not permitted to view this project dashboard")
 
-    # Fetch project info
-    project = frappe.get_doc("Project", project_name)
-    project_info = {
-        "name": project.name,
-        "status": project.status,
-        "percent_complete": project.percent_complete,
-        "planned_duration": project.get("expected_duration") or project.get("duration"),
-        "estimated_cost": project.get("estimated_cost") or project.get("total_planned_cost"),
-        "actual_cost": project.get("actual_cost") or project.get("total_costing_amount")
+    return {
+        "project": get_project_info(project_name),
+        **get_project_dashboard_tasks(project_name, status, priority, page_length=page_length),
+        **get_task_counts(project_name),
+        "pending_counts": get_pending_counts(project_name),
     }
 
-    # Fetch tasks for this project
-    tasks = frappe.get_all(
-        "Task",
-        filters={"project": project.name},
-        fields=[
-            "name", "subject", "status", "priority",
-            "exp_start_date", "exp_end_date", "depends_on_tasks"
-        ],
-        order_by="exp_start_date asc"      # ← sorts oldest first
-    )
-
-    # Aggregate counts by status & priority
+
+@frappe.whitelist()
+def get_project_dashboard_tasks(project_name, status=None, priority=None, cursor=None, page_length=TASK_FEED_PAGE_LENGTH):
+    """One page of the project's tasks, oldest planned start first.
+
+    Pass the returned `next_cursor` back as `cursor` for the following page;
+    it is None after the last one. The cursor is the (start date, name) of
+    the last row, so with the (project, exp_start_date, name) index a page
+    costs the same wherever it is in the list. Tasks without a start date
+    come first, as NULLs sort first.
+    """
+    if not frappe.has_permission("Project", doc=project_name, throw=False):
+        frappe.throw("Not permitted to view this project dashboard")
+
+    page_length = max(1, min(cint(page_length) or TASK_FEED_PAGE_LENGTH, 500))
+    conditions = ["project = %(project)s"]
+    values = {"project": project_name, "limit": page_length + 1}
+
+    if status:
+        conditions.append("status = %(status)s")
+        values["status"] = status
+    if priority:
+        conditions.append("IFNULL(priority, 'Medium') = %(priority)s")
+        values["priority"] = priority
+    if cursor:
+        start, name = parse_task_cursor(cursor)
+        values.update({"cursor_start": start, "cursor_name": name})
+        # Compare the raw column so the index range scan still applies
+        if start:
+            conditions.append(
+                "(exp_start_date > %(cursor_start)s"
+                " OR (exp_start_date = %(cursor_start)s AND name > %(cursor_name)s))"
+            )
+        else:
+            conditions.append(
+                "(exp_start_date IS NOT NULL"
+                " OR (exp_start_date IS NULL AND name > %(cursor_name)s))"
+            )
+
+    tasks = frappe.db.sql(f"""
+        SELECT {", ".join(TASK_FEED_FIELDS)}
+        FROM `tabTask`
+        WHERE {" AND ".join(conditions)}
+        ORDER BY exp_start_date ASC, name ASC
+        LIMIT %(limit)s
+    """, values, as_dict=True)
+
+    next_cursor = None
+    if len(tasks) > page_length:
+        tasks = tasks[:page_length]
+        last = tasks[-1]
+        next_cursor = f"{last.exp_start_date or ''}|{last.name}"
+
+    return {"tasks": tasks, "next_cursor": next_cursor}
+
+
+def parse_task_cursor(cursor):
+    """(start date or None, name) of a `next_cursor`; anything else is rejected"""
+    start, separator, name = cstr(cursor).partition("|")
+    if not separator or not name:
+        frappe.throw(f"Invalid task cursor: {cursor}")
+    if not start:
+        return None, name
+    try:
+        return date.fromisoformat(start), name
+    except ValueError:
+        frappe.throw(f"Invalid start date in task cursor: {start}")
+
+
+def get_project_info(project_name):
+    meta = frappe.get_meta("Project")
+    fields = ["name", "status", "percent_complete"]
+    fields += [f for options in PROJECT_INFO_FIELDS.values() for f in options if meta.has_field(f)]
+    project = frappe.db.get_value("Project", project_name, fields, as_dict=True)
+
+    project_info = {"name": project.name, "status": project.status, "percent_complete": project.percent_complete}
+    for key, options in PROJECT_INFO_FIELDS.items():
+        project_info[key] = next((project.get(f) for f in options if project.get(f)), None)
+    return project_info
+
+
+def get_task_counts(project_name):
+    """Task counts by status and by priority, from one grouped query"""
+    rows = frappe.db.sql("""
+        SELECT status, IFNULL(priority, 'Medium') AS priority, COUNT(*) AS count
+        FROM `tabTask`
+        WHERE project = %(project)s
+        GROUP BY status, IFNULL(priority, 'Medium')
+    """, {"project": project_name}, as_dict=True)
+
     status_counts = {}
     priority_counts = {}
-    for t in tasks:
-        status_counts[t.status] = status_counts.get(t.status, 0) + 1
-        pr = t.priority or "Medium"
-        priority_counts[pr] = priority_counts.get(pr, 0) + 1
-
-    # Count pending items by custom Doctypes (if they exist)
-    pending_counts = {}
-    for dt in ["Project Decision", "Project Action", "Project Change Request"]:
-        if frappe.db.exists("DocType", dt):
-            pending_counts[dt] = frappe.db.count(
-                dt, {"project": project.name, "status": ("!=", "Closed")}
-            )
+    for row in rows:
+        status_counts[row.status] = status_counts.get(row.status, 0) + row.count
+        priority_counts[row.priority] = priority_counts.get(row.priority, 0) + row.count
 
-    return {
-        "project": project_info,
-        "tasks": tasks,
-        "status_counts": status_counts,
-        "priority_counts": priority_counts,
-        "pending_counts": pending_counts
-    }
+    return {"status_counts": status_counts, "priority_counts": priority_counts}
+
+
+def get_pending_doctypes():
+    site = frappe.local.site
+    if site not in _pending_doctypes:
+        installed = set(frappe.get_all("DocType", filters={"name": ["in", PENDING_DOCTYPES]}, pluck="name"))
+        _pending_doctypes[site] = [dt for dt in PENDING_DOCTYPES if dt in installed]
+    return _pending_doctypes[site]
+
+
+def get_pending_counts(project_name):
+    """Open (not Closed) documents per installed pending doctype, in one query"""
+    doctypes = get_pending_doctypes()
+    if not doctypes:
+        return {}
+
+    rows = frappe.db.sql(" UNION ALL ".join(
+        f"""SELECT %(doctype_{idx})s, COUNT(*) FROM `tab{doctype}`
+            WHERE project = %(project)s AND IFNULL(status, '') != 'Closed'"""
+        for idx, doctype in enumerate(doctypes)
+    ), {"project": project_name, **{f"doctype_{idx}": dt for idx, dt in enumerate(doctypes)}})
+
+    return {doctype: count for doctype, count in rows}
@@ -3,6 +3,8 @@
 import frappe
 from frappe.utils import nowdate, getdate
 
+from milestoneksa.instrumentation import instrumented
+
 
 def _create_tasks(doc):
     """
@@ -99,6 +101,7 @@ def _create_tasks(doc):
         doc.add_comment('Comment', msg)
 
 @frappe.whitelist()
+@instrumented
 def create_payment_tasks(doc, method=None):
     """
     Hook: Purchase Order on_submit
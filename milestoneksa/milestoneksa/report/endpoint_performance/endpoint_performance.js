@@ -0,0 +1,23 @@
+frappe.query_reports["Endpoint Performance"] = {
+    filters: [
+        {
+            fieldname: "kind",
+            label: "Kind",
+            fieldtype: "Select",
+            options: "\nwhitelisted\ndoc_event\nfunction"
+        },
+        {
+            fieldname: "sort_by",
+            label: "Sort By",
+            fieldtype: "Select",
+            options: "p95 Latency\nAvg Queries\nTotal SQL Time",
+            default: "p95 Latency"
+        },
+        {
+            fieldname: "limit",
+            label: "Top",
+            fieldtype: "Int",
+            default: 20
+        }
+    ]
+}
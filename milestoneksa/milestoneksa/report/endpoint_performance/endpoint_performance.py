@@ -0,0 +1,74 @@
+import frappe
+from frappe.utils import cint, flt
+
+from milestoneksa.instrumentation import get_samples
+
+SORT_KEYS = {
+    "p95 Latency": "p95_ms",
+    "Avg Queries": "avg_queries",
+    "Total SQL Time": "total_sql_ms",
+}
+
+
+def execute(filters=None):
+    frappe.only_for("System Manager")
+    filters = filters or {}
+
+    columns = [
+        {"label": "Endpoint", "fieldname": "name", "fieldtype": "Data", "width": 380},
+        {"label": "Kind", "fieldname": "kind", "fieldtype": "Data", "width": 100},
+        {"label": "Calls", "fieldname": "calls", "fieldtype": "Int", "width": 70},
+        {"label": "p50 ms", "fieldname": "p50_ms", "fieldtype": "Float", "precision": 1, "width": 90},
+        {"label": "p95 ms", "fieldname": "p95_ms", "fieldtype": "Float", "precision": 1, "width": 90},
+        {"label": "Max ms", "fieldname": "max_ms", "fieldtype": "Float", "precision": 1, "width": 90},
+        {"label": "Avg Queries", "fieldname": "avg_queries", "fieldtype": "Float", "precision": 1, "width": 100},
+        {"label": "Max Queries", "fieldname": "max_queries", "fieldtype": "Int", "width": 100},
+        {"label": "Avg SQL ms", "fieldname": "avg_sql_ms", "fieldtype": "Float", "precision": 1, "width": 100},
+        {"label": "Total SQL ms", "fieldname": "total_sql_ms", "fieldtype": "Float", "precision": 1, "width": 110},
+        {"label": "Slowest Statement", "fieldname": "slowest_sql", "fieldtype": "Code", "width": 400},
+    ]
+
+    groups = {}
+    for sample in get_samples():
+        if filters.get("kind") and sample["kind"] != filters["kind"]:
+            continue
+        groups.setdefault((sample["name"], sample["kind"]), []).append(sample)
+
+    data = []
+    for (name, kind), samples in groups.items():
+        wall = sorted(s["wall_ms"] for s in samples)
+        queries = [s["queries"] for s in samples]
+        sql_ms = [s["sql_ms"] for s in samples]
+        slowest = max((st for s in samples for st in s["slowest"]), key=lambda st: st["ms"], default=None)
+        data.append({
+            "name": name,
+            "kind": kind,
+            "calls": len(samples),
+            "p50_ms": percentile(wall, 50),
+            "p95_ms": percentile(wall, 95),
+            "max_ms": wall[-1],
+            "avg_queries": flt(sum(queries) / len(samples), 1),
+            "max_queries": max(queries),
+            "avg_sql_ms": flt(sum(sql_ms) / len(samples), 1),
+            "total_sql_ms": flt(sum(sql_ms), 1),
+            "slowest_sql": f"{slowest['ms']} ms: {slowest['sql']}" if slowest else "",
+        })
+
+    sort_key = SORT_KEYS.get(filters.get("sort_by"), "p95_ms")
+    data.sort(key=lambda row: row[sort_key], reverse=True)
+
+    limit = cint(filters.get("limit"))
+    if limit:
+        data = data[:limit]
+
+    if not data:
+        frappe.msgprint(
+            "No samples recorded. Enable with: bench --site &lt;site&gt; set-config milestoneksa_instrumentation 1"
+        )
+
+    return columns, data
+
+
+def percentile(ordered, pct):
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
@@ -0,0 +1,23 @@
+import frappe
+from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
+
+
+def execute():
+    create_custom_fields(
+        {
+            "Task": [
+                {
+                    "fieldname": "custom_import_key",
+                    "label": "Import Key",
+                    "fieldtype": "Data",
+                    "insert_after": "custom_wbs_sort",
+                    "read_only": 1,
+                    "no_copy": 1,
+                    "search_index": 1,
+                    "description": "External id of the row this task was imported from (scripts/import_wbs.py)",
+                },
+            ]
+        },
+        ignore_validate=True,
+    )
+    frappe.clear_cache(doctype="Task")
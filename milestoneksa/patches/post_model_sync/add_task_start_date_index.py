@@ -0,0 +1,6 @@
+import frappe
+
+
+def execute():
+    # Keyset paging of the project dashboard task feed
+    frappe.db.add_index("Task", ["project", "exp_start_date", "name"])
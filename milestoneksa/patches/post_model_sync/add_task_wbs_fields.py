@@ -0,0 +1,46 @@
+import frappe
+from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
+
+from milestoneksa.api.task_wbs import renumber_project
+
+
+def execute():
+    create_custom_fields(
+        {
+            "Task": [
+                {
+                    "fieldname": "custom_wbs",
+                    "label": "WBS",
+                    "fieldtype": "Data",
+                    "insert_after": "parent_task",
+                    "read_only": 1,
+                    "no_copy": 1,
+                    "in_list_view": 1,
+                },
+                {
+                    "fieldname": "custom_wbs_depth",
+                    "label": "WBS Level",
+                    "fieldtype": "Int",
+                    "insert_after": "custom_wbs",
+                    "read_only": 1,
+                    "no_copy": 1,
+                },
+                {
+                    "fieldname": "custom_wbs_sort",
+                    "label": "WBS Sort Key",
+                    "fieldtype": "Data",
+                    "insert_after": "custom_wbs_depth",
+                    "read_only": 1,
+                    "hidden": 1,
+                    "no_copy": 1,
+                },
+            ]
+        },
+        ignore_validate=True,
+    )
+    frappe.db.add_index("Task", ["project", "custom_wbs_sort"])
+    frappe.clear_cache(doctype="Task")
+
+    for project in frappe.get_all("Project", pluck="name"):
+        renumber_project(project, update_modified=False)
+    frappe.db.commit()
@@ -0,0 +1,5 @@
+from milestoneksa.milestoneksa.doctype.project_daily_cost.project_daily_cost import rebuild_project_daily_cost
+
+
+def execute():
+	rebuild_project_daily_cost()
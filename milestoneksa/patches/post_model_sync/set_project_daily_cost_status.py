@@ -0,0 +1,9 @@
+import frappe
+
+
+def execute():
+    frappe.db.sql("""
+        UPDATE `tabProject Daily Cost` pdc
+        INNER JOIN `tabProject` p ON p.name = pdc.project
+        SET pdc.project_status = p.status
+    """)
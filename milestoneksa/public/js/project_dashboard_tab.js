@@ -364,7 +364,7 @@ frappe.ui.form.on("Project", {
 		return filterDiv;
 	},
 
-	load_dashboard_data(frm, from_date = null, to_date = null) {
+	load_dashboard_data(frm, from_date = null, to_date = null, refresh = 0) {
 		console.log("🔍 Dashboard: Loading data...", {project: frm.doc.name, from_date, to_date});
 		
 		const wrapper = frm.fields_dict.custom_dashboard_html.$wrapper;
@@ -373,64 +373,269 @@ frappe.ui.form.on("Project", {
 		
 		loading.show();
 		content.remove();
+		wrapper.find("[data-role='dashboard-error']").remove();
+		frm.events.stop_dashboard_stream(frm);
+		
+		// A forced refresh recomputes everything in one request; normal loads
+		// show the cheap/cached sections first and stream the rest in
+		if (refresh) {
+			frm.events.load_full_dashboard(frm, from_date, to_date, refresh);
+		} else {
+			frm.events.load_progressive_dashboard(frm, from_date, to_date);
+		}
+	},
+
+	load_full_dashboard(frm, from_date, to_date, refresh = 0) {
+		const wrapper = frm.fields_dict.custom_dashboard_html.$wrapper;
 		
 		frappe.call({
 			method: "milestoneksa.api.project_dashboard.get_dashboard_data",
 			args: {
 				project: frm.doc.name,
 				from_date: from_date,
-				to_date: to_date
+				to_date: to_date,
+				refresh: refresh ? 1 : 0,
+				version: refresh ? null : frm.events.get_dashboard_version(frm, from_date, to_date)
 			},
 			callback: (r) => {
+				if (r && r.message && r.message.not_modified) {
+					frm.events.render_unchanged_dashboard(frm);
+					return;
+				}
+				
 				console.log("🔍 Dashboard: API Response received", r);
-				loading.hide();
 				
 				if (!r || !r.message) {
 					console.error("❌ Dashboard: No data in response");
-					wrapper.append(`<div class="alert alert-danger">${__("Failed to load dashboard data")}</div>`);
+					wrapper.find("[data-role='dashboard-loading']").hide();
+					wrapper.append(`<div class="alert alert-danger" data-role="dashboard-error">${__("Failed to load dashboard data")}</div>`);
 					return;
 				}
 				
-				const data = r.message;
-				console.log("✅ Dashboard: Data structure:", {
-					financial: data.financial,
-					timeline: data.timeline,
-					tasks: data.tasks,
-					team: data.team,
-					trends: data.trends
-				});
-				frm.__dashboard_data = data;
-				
-				const contentDiv = $("<div data-role='dashboard-content'></div>");
-				
-				// KPI Cards
-				contentDiv.append(frm.events.render_kpi_cards(frm, data));
-				
-				// Charts
-				contentDiv.append(frm.events.render_charts(frm, data));
+				frm.__dashboard_data = r.message;
+				frm.events.remember_dashboard(frm, from_date, to_date);
+				frm.events.render_dashboard_content(frm);
+			},
+			error: (err) => frm.events.show_dashboard_error(frm, err)
+		});
+	},
+
+	load_progressive_dashboard(frm, from_date, to_date) {
+		const wrapper = frm.fields_dict.custom_dashboard_html.$wrapper;
+		
+		// Subscribe before asking: a fast job can push its section before
+		// start_dashboard_load has answered, so hold those until the reply
+		const early_sections = [];
+		frm.events.subscribe_dashboard_stream(frm, (msg) => early_sections.push(msg));
+		
+		frappe.call({
+			method: "milestoneksa.api.project_dashboard.start_dashboard_load",
+			args: {
+				project: frm.doc.name,
+				from_date: from_date,
+				to_date: to_date,
+				version: frm.events.get_dashboard_version(frm, from_date, to_date)
+			},
+			callback: (r) => {
+				if (r && r.message && r.message.not_modified) {
+					frm.events.stop_dashboard_stream(frm);
+					frm.events.render_unchanged_dashboard(frm);
+					return;
+				}
 				
-				// Tables
-				contentDiv.append(frm.events.render_tables(frm, data));
+				if (!r || !r.message) {
+					frm.events.stop_dashboard_stream(frm);
+					wrapper.find("[data-role='dashboard-loading']").hide();
+					wrapper.append(`<div class="alert alert-danger" data-role="dashboard-error">${__("Failed to load dashboard data")}</div>`);
+					return;
+				}
 				
-				wrapper.append(contentDiv);
+				const data = r.message;
+				frm.__dashboard_data = data;
+				frm.__dashboard_pending = new Set(data.pending || []);
+				frm.events.render_dashboard_content(frm);
 				
-				// Add export button to toolbar
-				frm.events.add_dashboard_toolbar(frm);
+				if (frm.__dashboard_pending.size) {
+					frm.events.start_dashboard_stream(frm, data.window, from_date, to_date, early_sections);
+				} else {
+					frm.events.stop_dashboard_stream(frm);
+					frm.events.remember_dashboard(frm, from_date, to_date);
+				}
 			},
 			error: (err) => {
-				console.error("❌ Dashboard: API Error", err);
-				loading.hide();
-				wrapper.append(`
-					<div class="alert alert-danger">
-						<h5>${__("Error loading dashboard")}</h5>
-						<p>${__("Check browser console (F12) for details.")}</p>
-						<small>${err.message || err.exc || 'Unknown error'}</small>
-					</div>
-				`);
+				frm.events.stop_dashboard_stream(frm);
+				frm.events.show_dashboard_error(frm, err);
 			}
 		});
 	},
 
+	subscribe_dashboard_stream(frm, handler) {
+		if (frm.__dashboard_stream_handler) {
+			frappe.realtime.off("milestoneksa_dashboard_section", frm.__dashboard_stream_handler);
+		}
+		frm.__dashboard_stream_handler = handler;
+		frappe.realtime.on("milestoneksa_dashboard_section", handler);
+	},
+
+	start_dashboard_stream(frm, window_key, from_date, to_date, early_sections = []) {
+		const handler = (msg) => {
+			if (!msg || msg.project !== frm.doc.name || msg.window !== window_key) {
+				return;
+			}
+			if (!frm.__dashboard_pending || !frm.__dashboard_pending.has(msg.section)) {
+				return;
+			}
+			
+			const data = frm.__dashboard_data;
+			data[msg.section] = msg.data;
+			data.cache = Object.assign({}, data.cache, {[msg.section]: msg.cache});
+			if (msg.health) {
+				data.health = msg.health;
+			}
+			frm.__dashboard_pending.delete(msg.section);
+			
+			frm.events.render_dashboard_content(frm);
+			if (!frm.__dashboard_pending.size) {
+				frm.events.stop_dashboard_stream(frm);
+				frm.events.remember_dashboard(frm, from_date, to_date);
+			}
+		};
+		
+		frm.events.subscribe_dashboard_stream(frm, handler);
+		early_sections.forEach(handler);
+		if (!frm.__dashboard_stream_handler) {
+			return;
+		}
+		
+		// If realtime is unavailable, fall back to a single blocking request
+		frm.__dashboard_stream_timeout = setTimeout(() => {
+			if (frm.__dashboard_pending && frm.__dashboard_pending.size) {
+				console.warn("⚠️ Dashboard: realtime sections timed out, loading synchronously");
+				frm.events.stop_dashboard_stream(frm);
+				frm.events.load_full_dashboard(frm, from_date, to_date);
+			}
+		}, 30000);
+	},
+
+	// Only complete payloads are remembered, so a "not modified" answer never
+	// re-renders a dashboard that was still waiting for streamed sections
+	remember_dashboard(frm, from_date, to_date) {
+		frm.__dashboard_snapshot = {
+			project: frm.doc.name,
+			window: JSON.stringify([from_date || null, to_date || null]),
+			version: frm.__dashboard_data.version,
+			data: frm.__dashboard_data
+		};
+	},
+
+	get_dashboard_version(frm, from_date, to_date) {
+		const snapshot = frm.__dashboard_snapshot;
+		if (!snapshot || snapshot.project !== frm.doc.name) {
+			return null;
+		}
+		if (snapshot.window !== JSON.stringify([from_date || null, to_date || null])) {
+			return null;
+		}
+		return snapshot.version || null;
+	},
+
+	render_unchanged_dashboard(frm) {
+		console.log("✅ Dashboard: data not modified, re-using previous payload");
+		frm.__dashboard_data = frm.__dashboard_snapshot.data;
+		frm.__dashboard_pending = null;
+		frm.events.render_dashboard_content(frm);
+	},
+
+	stop_dashboard_stream(frm) {
+		if (frm.__dashboard_stream_handler) {
+			frappe.realtime.off("milestoneksa_dashboard_section", frm.__dashboard_stream_handler);
+			frm.__dashboard_stream_handler = null;
+		}
+		if (frm.__dashboard_stream_timeout) {
+			clearTimeout(frm.__dashboard_stream_timeout);
+			frm.__dashboard_stream_timeout = null;
+		}
+		frm.__dashboard_pending = null;
+	},
+
+	render_dashboard_content(frm) {
+		const wrapper = frm.fields_dict.custom_dashboard_html.$wrapper;
+		wrapper.find("[data-role='dashboard-loading']").hide();
+		wrapper.find("[data-role='dashboard-content']").remove();
+		
+		// Sections still being computed render as empty cards
+		const data = Object.assign({
+			financial: {},
+			timeline: {},
+			tasks: {},
+			team: {},
+			trends: {},
+			health: null
+		}, frm.__dashboard_data);
+		for (const section of ["timeline", "tasks", "team", "trends"]) {
+			data[section] = data[section] || {};
+		}
+		data.health = data.health || {};
+		
+		const contentDiv = $("<div data-role='dashboard-content'></div>");
+		
+		const pending = frm.__dashboard_pending ? frm.__dashboard_pending.size : 0;
+		if (pending) {
+			contentDiv.append(`
+				<div class="text-muted small mb-3" data-role="dashboard-pending-note">
+					<span class="spinner-border spinner-border-sm me-2"></span>
+					${__("Calculating {0} more section(s)...", [pending])}
+				</div>
+			`);
+		}
+		
+		// Snapshot age (sections served from the server-side cache)
+		contentDiv.append(frm.events.render_cache_note(data.cache));
+		
+		// KPI Cards
+		contentDiv.append(frm.events.render_kpi_cards(frm, data));
+		
+		// Charts
+		contentDiv.append(frm.events.render_charts(frm, data));
+		
+		// Tables
+		contentDiv.append(frm.events.render_tables(frm, data));
+		
+		wrapper.append(contentDiv);
+		
+		// Add export button to toolbar
+		frm.events.add_dashboard_toolbar(frm);
+	},
+
+	show_dashboard_error(frm, err) {
+		console.error("❌ Dashboard: API Error", err);
+		const wrapper = frm.fields_dict.custom_dashboard_html.$wrapper;
+		wrapper.find("[data-role='dashboard-loading']").hide();
+		wrapper.append(`
+			<div class="alert alert-danger" data-role="dashboard-error">
+				<h5>${__("Error loading dashboard")}</h5>
+				<p>${__("Check browser console (F12) for details.")}</p>
+				<small>${err.message || err.exc || 'Unknown error'}</small>
+			</div>
+		`);
+	},
+
+	render_cache_note(cache) {
+		const ages = Object.values(cache || {})
+			.filter(info => info && info.cached)
+			.map(info => info.age_seconds || 0);
+		if (!ages.length) {
+			return $("<div data-role='dashboard-cache-note'></div>");
+		}
+		
+		const minutes = Math.round(Math.max(...ages) / 60);
+		return $(`
+			<div class="text-muted small mb-3" data-role="dashboard-cache-note">
+				${__("Some figures were calculated {0} minute(s) ago.", [minutes])}
+			</div>
+		`);
+	},
+
 	render_kpi_cards(frm, data) {
 		console.log("🔍 Dashboard: Rendering KPI cards with data", data);
 		
@@ -1067,18 +1272,56 @@ frappe.ui.form.on("Project", {
 		// Remove previous buttons if any
 		frm.page.remove_inner_button("Export PDF", "Dashboard");
 		frm.page.remove_inner_button("Print Dashboard");
+		frm.page.remove_inner_button("Status Report", "Dashboard");
+		frm.page.remove_inner_button("Refresh Data", "Dashboard");
+		
+		// Recompute every section, bypassing cached snapshots
+		frm.page.add_inner_button(__("Refresh Data"), () => {
+			frm.events.load_dashboard_data(frm, frm.__dashboard_from_date, frm.__dashboard_to_date, 1);
+		}, __("Dashboard"));
 		
 		// Add export PDF button
 		frm.page.add_inner_button(__("Export PDF"), () => {
 			frm.events.export_dashboard_pdf(frm);
 		}, __("Dashboard"));
 		
+		// Server-rendered status report (stored per data version)
+		frm.page.add_inner_button(__("Status Report"), () => {
+			frm.events.download_status_report(frm);
+		}, __("Dashboard"));
+		
 		// Add print button
 		frm.page.add_inner_button(__("Print Dashboard"), () => {
 			window.print();
 		});
 	},
 	
+	download_status_report(frm) {
+		frappe.call({
+			method: "milestoneksa.api.project_status_report.get_project_status_report",
+			args: { project: frm.doc.name },
+		}).then((r) => {
+			if (r.message?.file_url) {
+				window.open(r.message.file_url);
+				return;
+			}
+			if (!frm.__status_report_handler) {
+				frm.__status_report_handler = (data) => {
+					frappe.msgprint({
+						title: __("Status Report Ready"),
+						message: `<a href="${encodeURI(data.file_url)}" target="_blank">${__("Download {0}", [frappe.utils.escape_html(data.project)])}</a>`,
+						indicator: "green"
+					});
+				};
+				frappe.realtime.on("milestoneksa_status_report", frm.__status_report_handler);
+			}
+			frappe.show_alert({
+				message: __("Preparing the status report, you will get a download link when it is ready"),
+				indicator: "blue"
+			});
+		});
+	},
+	
 	export_dashboard_pdf(frm) {
 		const data = frm.__dashboard_data;
 		if (!data) {
@@ -29,9 +29,67 @@ frappe.ui.form.on("Project", {
 					indicator: "green"
 				});
 			});
+			["xlsx", "csv"].forEach((file_format) => {
+				frm.add_custom_button(file_format.toUpperCase(), () => {
+					frm.events.export_project_tasks(frm, file_format);
+				}, __("Export Tasks"));
+			});
 		}
 		
 		frm.events.render_project_task_tab(frm);
+		frm.events.listen_task_rollups(frm);
+	},
+
+	export_project_tasks(frm, file_format) {
+		const args = { project: frm.doc.name, file_format };
+		frappe.call({
+			method: "milestoneksa.api.project_task_export.start_project_task_export",
+			args,
+		}).then((r) => {
+			if (r.message?.inline) {
+				window.open(
+					"/api/method/milestoneksa.api.project_task_export.download_project_tasks?"
+					+ new URLSearchParams(args).toString()
+				);
+				return;
+			}
+			frm.events.listen_task_exports(frm);
+			frappe.show_alert({
+				message: __("Large project: the export is being prepared, you will get a download link when it is ready"),
+				indicator: "blue"
+			});
+		});
+	},
+
+	listen_task_exports(frm) {
+		// Background exports are announced once the file is attached to the Project
+		if (frm.__task_export_handler) {
+			return;
+		}
+		frm.__task_export_handler = (data) => {
+			frappe.msgprint({
+				title: __("Task Export Ready"),
+				message: `<a href="${encodeURI(data.file_url)}" target="_blank">${frappe.utils.escape_html(data.file_name)}</a>`,
+				indicator: "green"
+			});
+			if (data.project === frm.doc.name && !frm.is_dirty()) {
+				frm.reload_doc();
+			}
+		};
+		frappe.realtime.on("milestoneksa_task_export", frm.__task_export_handler);
+	},
+
+	listen_task_rollups(frm) {
+		// Parent rollups run in a background job; pull the delta once it lands
+		if (frm.__task_rollup_handler) {
+			return;
+		}
+		frm.__task_rollup_handler = (data) => {
+			if (data?.project === frm.doc.name && frm.__project_tasks_project === frm.doc.name) {
+				frm.events.load_project_tasks(frm);
+			}
+		};
+		frappe.realtime.on("milestoneksa_task_rollup", frm.__task_rollup_handler);
 	},
 
 	after_save(frm) {
@@ -609,7 +667,7 @@ frappe.ui.form.on("Project", {
 		});
 	},
 
-	load_project_tasks(frm) {
+	load_project_tasks(frm, opts = {}) {
 		const field = frm.fields_dict.custom_project_tasks_html;
 		if (!field) {
 			return;
@@ -629,6 +687,17 @@ frappe.ui.form.on("Project", {
 		emptyState.addClass("d-none");
 		loadingState.removeClass("d-none");
 
+		// After the first load only the changes since the last cursor are fetched
+		if (
+			!opts.full &&
+			frm.__project_tasks_project === frm.doc.name &&
+			frm.__project_tasks_cursor &&
+			frm.__project_tasks_data
+		) {
+			frm.events.sync_project_task_changes(frm, tableBody, emptyState, loadingState);
+			return;
+		}
+
 		console.log("[MKS][TASK TAB] Fetching tasks for project", {
 			project: frm?.doc?.name,
 			version: frm?.events?.__mks_task_tab_version,
@@ -636,9 +705,24 @@ frappe.ui.form.on("Project", {
 		
 		frappe.call({
 			method: "milestoneksa.api.project_tasks.get_project_tasks",
-			args: { project: frm.doc.name },
+			args: {
+				project: frm.doc.name,
+				// Lets the server answer "not modified" instead of the full tree
+				version: frm.__project_tasks_project === frm.doc.name ? frm.__project_tasks_version : null,
+			},
 			callback: (r) => {
 				loadingState.addClass("d-none");
+
+				if (r?.message?.not_modified) {
+					const tasks = frm.__project_tasks_data || [];
+					if (!tasks.length) {
+						emptyState.removeClass("d-none");
+						return;
+					}
+					frm.events.render_task_hierarchy(frm, tasks, tableBody);
+					frm.events.update_select_all_checkbox(frm);
+					return;
+				}
 				console.log("[MKS][TASK TAB] get_project_tasks response", {
 					version: frm?.events?.__mks_task_tab_version,
 					has_message: !!r?.message,
@@ -653,20 +737,23 @@ frappe.ui.form.on("Project", {
 					return;
 				}
 
-				const { tasks = [], currency, status_options = [], priority_options = [] } = r.message;
+				const { tasks = [], currency, status_options = [], priority_options = [], version, cursor } = r.message;
 
 				frm.__project_task_meta = {
 					currency,
 					status_options,
 					priority_options,
 				};
+				frm.__project_tasks_data = tasks;
+				frm.__project_tasks_version = version;
+				frm.__project_tasks_cursor = cursor;
+				frm.__project_tasks_project = frm.doc.name;
 
 				if (!tasks.length) {
 					emptyState.removeClass("d-none");
 					return;
 				}
 
-				frm.__project_tasks_data = tasks;
 				frm.events.render_task_hierarchy(frm, tasks, tableBody);
 				frm.events.update_select_all_checkbox(frm);
 			},
@@ -685,6 +772,82 @@ frappe.ui.form.on("Project", {
 		});
 	},
 
+	sync_project_task_changes(frm, tableBody, emptyState, loadingState) {
+		frappe.call({
+			method: "milestoneksa.api.project_tasks.get_project_task_changes",
+			args: {
+				project: frm.doc.name,
+				since: frm.__project_tasks_cursor,
+			},
+			callback: (r) => {
+				const changes = r?.message;
+				const tasks = changes && frm.events.apply_project_task_changes(frm.__project_tasks_data, changes);
+				if (!tasks) {
+					// Local copy drifted (e.g. a task moved to another project): full reload
+					frm.events.load_project_tasks(frm, { full: true });
+					return;
+				}
+
+				loadingState.addClass("d-none");
+				frm.__project_tasks_data = tasks;
+				frm.__project_tasks_version = changes.version;
+				frm.__project_tasks_cursor = changes.cursor;
+
+				if (!tasks.length) {
+					emptyState.removeClass("d-none");
+					return;
+				}
+
+				frm.events.render_task_hierarchy(frm, tasks, tableBody);
+				frm.events.update_select_all_checkbox(frm);
+			},
+			error: () => frm.events.load_project_tasks(frm, { full: true }),
+		});
+	},
+
+	apply_project_task_changes(tasks, changes) {
+		// Patch the local rows by name and put them in WBS order; returns null
+		// when the result does not match the server's task count
+		const byName = new Map(tasks.map((t) => [t.name, t]));
+		(changes.deleted || []).forEach((name) => byName.delete(name));
+		(changes.changed || []).forEach((t) => byName.set(t.name, t));
+
+		if (byName.size !== changes.task_count) {
+			return null;
+		}
+
+		// Renumbered siblings come back in `changed`, so stored codes are current
+		const rows = Array.from(byName.values());
+		if (rows.every((t) => t.custom_wbs_sort)) {
+			rows.forEach((t) => (t.wbs = t.custom_wbs));
+			return rows.sort((a, b) => (a.custom_wbs_sort < b.custom_wbs_sort ? -1 : a.custom_wbs_sort > b.custom_wbs_sort ? 1 : 0));
+		}
+
+		// Not numbered yet: same ordering as the server's _treeify: siblings by lft, then subject
+		const children = new Map();
+		byName.forEach((t) => {
+			const parent = t.parent_task || null;
+			if (!children.has(parent)) {
+				children.set(parent, []);
+			}
+			children.get(parent).push(t);
+		});
+		children.forEach((bucket) =>
+			bucket.sort((a, b) => (a.lft || 0) - (b.lft || 0) || (a.subject || "").localeCompare(b.subject || ""))
+		);
+
+		const ordered = [];
+		const walk = (parent, prefix) => {
+			(children.get(parent) || []).forEach((t, idx) => {
+				t.wbs = prefix ? `${prefix}.${idx + 1}` : `${idx + 1}`;
+				ordered.push(t);
+				walk(t.name, t.wbs);
+			});
+		};
+		walk(null, null);
+		return ordered;
+	},
+
 	render_task_hierarchy(frm, tasks, tableBody) {
 		// Build parent-child map
 		const taskMap = {};
@@ -1009,17 +1172,55 @@ frappe.ui.form.on("Project", {
 	},
 
 	quick_update_task(frm, taskName, updates) {
+		// Inline edits made in quick succession are sent as one batch
+		frm.__pending_task_updates = frm.__pending_task_updates || [];
+		frm.__pending_task_updates.push({ name: taskName, ...updates });
+
+		clearTimeout(frm.__task_update_timer);
+		frm.__task_update_timer = setTimeout(() => frm.events.flush_task_updates(frm), 400);
+	},
+
+	flush_task_updates(frm) {
+		const updates = frm.__pending_task_updates || [];
+		frm.__pending_task_updates = [];
+		if (!updates.length) {
+			return;
+		}
+
 		frappe.call({
-			method: "milestoneksa.api.project_tasks.update_project_task",
+			method: "milestoneksa.api.project_tasks.bulk_update_project_tasks",
 			args: {
-				task_name: taskName,
+				project: frm.doc.name,
 				updates: updates,
+				version: frm.__project_tasks_version,
 			},
 			freeze: false,
-			callback: () => {
-				frappe.show_alert({ message: __("Task updated"), indicator: "green" });
-				frm.events.load_project_tasks(frm);
+			callback: (r) => {
+				frappe.show_alert({
+					message: updates.length > 1 ? __("{0} task edits saved", [updates.length]) : __("Task updated"),
+					indicator: "green",
+				});
+
+				const tasks = r?.message && frm.events.apply_project_task_changes(frm.__project_tasks_data || [], r.message);
+				if (!tasks) {
+					frm.events.load_project_tasks(frm, { full: true });
+					return;
+				}
+
+				frm.__project_tasks_data = tasks;
+				// Without a cursor other users' edits are still pending: keep the
+				// old version and cursor so the next load fetches them
+				if (r.message.cursor) {
+					frm.__project_tasks_version = r.message.version;
+					frm.__project_tasks_cursor = r.message.cursor;
+				}
+				const tableBody = frm.fields_dict.custom_project_tasks_html.$wrapper.find("tbody");
+				tableBody.empty();
+				frm.__selected_task_names = new Set();
+				frm.events.render_task_hierarchy(frm, tasks, tableBody);
+				frm.events.update_select_all_checkbox(frm);
 			},
+			error: () => frm.events.load_project_tasks(frm),
 		});
 	},
 
@@ -0,0 +1,187 @@
+"""
+Benchmark the project APIs against a (synthetic) project on the local site.
+
+Every endpoint is called `iterations` times; each call records wall time, SQL
+query count, SQL time and peak Python memory. The summary is written as JSON
+(for `compare`) and markdown to sites/<site>/benchmarks/.
+
+Run from bench:
+  bench --site <site> execute milestoneksa.scripts.generate_project_benchmark_data.generate
+  bench --site <site> execute milestoneksa.scripts.benchmark_project_apis.run \
+      --kwargs "{'project': 'BENCH-Project', 'iterations': 5}"
+  bench --site <site> execute milestoneksa.scripts.benchmark_project_apis.compare \
+      --kwargs "{'baseline': '/path/to/old.json', 'current': '/path/to/new.json'}"
+"""
+
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import now_datetime
+
+
+def _endpoints(project):
+	"""(label, callable, setup) for every benchmarked endpoint"""
+	from milestoneksa.api import project_dashboard, project_tasks
+	from milestoneksa.milestoneksa.page.project_dashboard import project_dashboard as dashboard_page
+
+	def clear_cache():
+		project_dashboard.clear_dashboard_cache(project)
+
+	return [
+		("project_dashboard.get_dashboard_data (cold)", lambda: project_dashboard.get_dashboard_data(project), clear_cache),
+		("project_dashboard.get_dashboard_data (warm)", lambda: project_dashboard.get_dashboard_data(project), None),
+		("project_dashboard.get_portfolio_dashboard", lambda: project_dashboard.get_portfolio_dashboard(projects=[project]), None),
+		("project_dashboard.get_historical_trends", lambda: project_dashboard.get_historical_trends(project), None),
+		("project_dashboard.get_team_metrics", lambda: project_dashboard.get_team_metrics(project), None),
+		("project_tasks.get_project_tasks", lambda: project_tasks.get_project_tasks(project), None),
+		("page.project_dashboard.get_project_dashboard_data", lambda: dashboard_page.get_project_dashboard_data(project), None),
+	]
+
+
+@contextmanager
+def _measure_sql(stats):
+	"""Count queries and SQL time by wrapping frappe.db.sql for the duration"""
+	original = frappe.db.sql
+
+	def counted(*args, **kwargs):
+		start = time.perf_counter()
+		try:
+			return original(*args, **kwargs)
+		finally:
+			stats["queries"] += 1
+			stats["sql_ms"] += (time.perf_counter() - start) * 1000
+
+	frappe.db.sql = counted
+	try:
+		yield stats
+	finally:
+		frappe.db.sql = original
+
+
+def _measure(fn, setup=None):
+	if setup:
+		setup()
+	stats = {"queries": 0, "sql_ms": 0.0}
+	tracemalloc.start()
+	start = time.perf_counter()
+	with _measure_sql(stats):
+		result = fn()
+	stats["wall_ms"] = (time.perf_counter() - start) * 1000
+	stats["peak_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+	tracemalloc.stop()
+	stats["payload_kb"] = len(frappe.as_json(result)) / 1024
+	return stats
+
+
+def _percentile(values, pct):
+	ordered = sorted(values)
+	index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+	return ordered[index]
+
+
+def _project_size(project):
+	count = lambda doctype, filters: frappe.db.count(doctype, filters)
+	return {
+		"tasks": count("Task", {"project": project}),
+		"timesheet_details": count("Timesheet Detail", {"project": project}),
+		"purchase_invoice_items": count("Purchase Invoice Item", {"project": project}),
+		"expense_claims": count("Expense Claim", {"project": project}),
+	}
+
+
+def run(project: str = "BENCH-Project", iterations: int = 5, output_dir: str | None = None):
+	"""Benchmark every endpoint and write <timestamp>.json / .md reports; returns the JSON path"""
+	if not frappe.db.exists("Project", project):
+		frappe.throw(f"Project {project} not found; run generate_project_benchmark_data.generate first")
+
+	iterations = max(1, int(iterations))
+	results = []
+	for label, fn, setup in _endpoints(project):
+		fn()  # warm imports / metadata caches
+		samples = [_measure(fn, setup) for _ in range(iterations)]
+		wall = [s["wall_ms"] for s in samples]
+		results.append(
+			{
+				"endpoint": label,
+				"iterations": iterations,
+				"wall_ms_p50": statistics.median(wall),
+				"wall_ms_p95": _percentile(wall, 95),
+				"wall_ms_max": max(wall),
+				"queries": max(s["queries"] for s in samples),
+				"sql_ms_p50": statistics.median(s["sql_ms"] for s in samples),
+				"peak_kb": max(s["peak_kb"] for s in samples),
+				"payload_kb": samples[-1]["payload_kb"],
+			}
+		)
+		# Benchmarks must not leave writes behind (e.g. cache-less reads that log errors)
+		frappe.db.rollback()
+
+	report = {
+		"generated_at": str(now_datetime()),
+		"site": frappe.local.site,
+		"versions": {app: frappe.get_attr(f"{app}.__version__") for app in ("frappe", "milestoneksa")},
+		"project": project,
+		"project_size": _project_size(project),
+		"results": results,
+	}
+
+	output_dir = output_dir or frappe.get_site_path("benchmarks")
+	os.makedirs(output_dir, exist_ok=True)
+	stem = os.path.join(output_dir, now_datetime().strftime("%Y%m%d-%H%M%S"))
+	with open(f"{stem}.json", "w") as f:
+		json.dump(report, f, indent=1)
+	with open(f"{stem}.md", "w") as f:
+		f.write(_to_markdown(report))
+
+	print(_to_markdown(report))
+	return f"{stem}.json"
+
+
+def compare(baseline: str, current: str):
+	"""Print a markdown table of p50 latency / query deltas between two JSON reports"""
+	with open(baseline) as f:
+		old = {r["endpoint"]: r for r in json.load(f)["results"]}
+	with open(current) as f:
+		new = json.load(f)["results"]
+
+	lines = [
+		"| Endpoint | p50 ms (old → new) | Δ% | Queries (old → new) |",
+		"|---|---|---|---|",
+	]
+	for row in new:
+		before = old.get(row["endpoint"])
+		if not before:
+			lines.append(f"| {row['endpoint']} | – → {row['wall_ms_p50']:.1f} | new | – → {row['queries']} |")
+			continue
+		delta = (row["wall_ms_p50"] - before["wall_ms_p50"]) / before["wall_ms_p50"] * 100 if before["wall_ms_p50"] else 0
+		lines.append(
+			f"| {row['endpoint']} | {before['wall_ms_p50']:.1f} → {row['wall_ms_p50']:.1f} | {delta:+.1f}% "
+			f"| {before['queries']} → {row['queries']} |"
+		)
+
+	table = "\n".join(lines)
+	print(table)
+	return table
+
+
+def _to_markdown(report):
+	size = ", ".join(f"{k}: {v}" for k, v in report["project_size"].items())
+	lines = [
+		f"# Project API benchmark — {report['generated_at']}",
+		"",
+		f"Site `{report['site']}`, project `{report['project']}` ({size})",
+		"",
+		"| Endpoint | p50 ms | p95 ms | max ms | Queries | SQL p50 ms | Peak KB | Payload KB |",
+		"|---|---|---|---|---|---|---|---|",
+	]
+	for r in report["results"]:
+		lines.append(
+			f"| {r['endpoint']} | {r['wall_ms_p50']:.1f} | {r['wall_ms_p95']:.1f} | {r['wall_ms_max']:.1f} "
+			f"| {r['queries']} | {r['sql_ms_p50']:.1f} | {r['peak_kb']:.0f} | {r['payload_kb']:.0f} |"
+		)
+	return "\n".join(lines) + "\n"
@@ -0,0 +1,336 @@
+"""
+Generate a synthetic project of configurable size for benchmarking the project APIs.
+
+Rows are written with bulk inserts (nested set values are computed up front), so
+a 10k-task / 200k-timesheet-row project takes seconds to create. Everything the
+generator writes is named with the BENCH- prefix and removed again by `cleanup`.
+
+Only run this against a local development site.
+
+Run from bench:
+  bench --site <site> execute milestoneksa.scripts.generate_project_benchmark_data.generate \
+      --kwargs "{'tasks': 10000, 'timesheet_details': 200000, 'invoice_items': 20000}"
+  bench --site <site> execute milestoneksa.scripts.generate_project_benchmark_data.cleanup
+"""
+
+import math
+import random
+from collections import deque
+from datetime import timedelta
+
+import frappe
+from frappe.utils import add_days, flt, get_datetime, getdate, now_datetime
+
+PREFIX = "BENCH-"
+ACTIVITIES = ["Execution", "Supervision", "Design", "Procurement", "Planning"]
+STATUSES = ["Open", "Working", "Pending Review", "Overdue", "Completed", "Cancelled"]
+PRIORITIES = ["Low", "Medium", "High", "Urgent"]
+
+
+def generate(
+	name: str = "Project",
+	tasks: int = 10000,
+	depth: int = 6,
+	dependency_chains: int = 50,
+	chain_length: int = 40,
+	timesheet_details: int = 200000,
+	details_per_timesheet: int = 50,
+	invoice_items: int = 20000,
+	items_per_invoice: int = 20,
+	expense_claims: int = 500,
+	users: int = 40,
+	milestones: int = 30,
+	seed: int = 42,
+):
+	"""Create one synthetic project and return its name"""
+	rng = random.Random(seed)
+	project = f"{PREFIX}{name}"
+	if frappe.db.exists("Project", project):
+		frappe.throw(f"Project {project} already exists; run cleanup first")
+
+	company = frappe.defaults.get_global_default("company") or frappe.db.get_value("Company", {}, "name")
+	start = add_days(getdate(), -365)
+	user_pool = [f"bench-user-{i}@example.com" for i in range(users)]
+
+	_insert_project(project, company, start, user_pool)
+	task_rows = _insert_tasks(project, tasks, depth, milestones, start, rng)
+	leaves = [t for t in task_rows if not t["is_group"]]
+	_insert_dependencies(leaves, dependency_chains, chain_length, rng)
+	_insert_timesheets(project, company, leaves, timesheet_details, details_per_timesheet, user_pool, rng)
+	_insert_purchase_invoices(project, company, start, invoice_items, items_per_invoice, rng)
+	_insert_expense_claims(project, company, start, expense_claims, rng)
+
+	from milestoneksa.milestoneksa.doctype.project_daily_cost.project_daily_cost import rebuild_project_daily_cost
+
+	from milestoneksa.api.task_wbs import renumber_project
+
+	rebuild_project_daily_cost(project)
+	renumber_project(project)
+	frappe.db.commit()
+	return project
+
+
+def cleanup():
+	"""Delete every row created by `generate`"""
+	like = f"{PREFIX}%"
+	frappe.db.sql("DELETE FROM `tabTask Depends On` WHERE parent LIKE %s", like)
+	frappe.db.sql("DELETE FROM `tabTimesheet Detail` WHERE parent LIKE %s", like)
+	frappe.db.sql("DELETE FROM `tabPurchase Invoice Item` WHERE parent LIKE %s", like)
+	for doctype in ("Task", "Timesheet", "Purchase Invoice", "Expense Claim"):
+		frappe.db.sql(f"DELETE FROM `tab{doctype}` WHERE name LIKE %s", like)
+	frappe.db.sql("DELETE FROM `tabProject User` WHERE parent LIKE %s", like)
+	frappe.db.sql("DELETE FROM `tabProject Daily Cost` WHERE project LIKE %s", like)
+	frappe.db.sql("DELETE FROM `tabProject` WHERE name LIKE %s", like)
+	frappe.db.commit()
+
+
+def _base(name, owner="Administrator"):
+	now = now_datetime()
+	return {"name": name, "creation": now, "modified": now, "owner": owner, "modified_by": owner}
+
+
+def _bulk_insert(doctype, rows):
+	if not rows:
+		return
+	fields = list(rows[0].keys())
+	frappe.db.bulk_insert(doctype, fields, [[row[f] for f in fields] for row in rows], chunk_size=5000)
+
+
+def _insert_project(project, company, start, user_pool):
+	_bulk_insert(
+		"Project",
+		[
+			{
+				**_base(project),
+				"project_name": project,
+				"status": "Open",
+				"company": company,
+				"expected_start_date": start,
+				"expected_end_date": add_days(start, 540),
+				"estimated_costing": 5_000_000,
+			}
+		],
+	)
+	_bulk_insert(
+		"Project User",
+		[
+			{
+				**_base(f"{PREFIX}{frappe.generate_hash(length=10)}"),
+				"parent": project,
+				"parenttype": "Project",
+				"parentfield": "users",
+				"idx": idx,
+				"user": user,
+			}
+			for idx, user in enumerate(user_pool, start=1)
+		],
+	)
+
+
+def _insert_tasks(project, count, depth, milestones, start, rng):
+	"""Breadth-first WBS with `depth` levels, nested set and group dates precomputed"""
+	branching = max(2, math.ceil(count ** (1 / max(depth, 1))))
+	rows = []
+	children = {}
+	queue = deque([None])
+	while queue and len(rows) < count:
+		parent = queue.popleft()
+		for _ in range(branching):
+			if len(rows) >= count:
+				break
+			name = f"{PREFIX}{project[len(PREFIX):]}-{len(rows) + 1:06d}"
+			rows.append({"name": name, "parent_task": parent, "is_group": 0})
+			children.setdefault(parent, []).append(rows[-1])
+			queue.append(name)
+
+	by_name = {row["name"]: row for row in rows}
+	for parent in children:
+		if parent:
+			by_name[parent]["is_group"] = 1
+
+	# Nested set + date rollup in one depth-first pass; the Task tree is shared
+	# by all projects, so the new intervals start after the existing ones
+	counter = [frappe.db.sql("SELECT IFNULL(MAX(rgt), 0) FROM `tabTask`")[0][0]]
+
+	def walk(row):
+		counter[0] += 1
+		row["lft"] = counter[0]
+		kids = children.get(row["name"], [])
+		if kids:
+			for kid in kids:
+				walk(kid)
+			row["exp_start_date"] = min(k["exp_start_date"] for k in kids)
+			row["exp_end_date"] = max(k["exp_end_date"] for k in kids)
+			row["expected_time"] = sum(k["expected_time"] for k in kids)
+		else:
+			row["exp_start_date"] = add_days(start, rng.randint(0, 480))
+			row["exp_end_date"] = add_days(row["exp_start_date"], rng.randint(0, 30))
+			row["expected_time"] = rng.choice([4, 8, 16, 24, 40])
+		counter[0] += 1
+		row["rgt"] = counter[0]
+
+	for root in children.get(None, []):
+		walk(root)
+
+	leaves = [row for row in rows if not row["is_group"]]
+	milestone_names = {row["name"] for row in rng.sample(leaves, min(milestones, len(leaves)))}
+
+	today = getdate()
+	task_rows = []
+	for row in rows:
+		status = "Open" if row["is_group"] else rng.choice(STATUSES)
+		task_rows.append(
+			{
+				**_base(row["name"]),
+				"subject": f"Synthetic task {row['name'][-6:]}",
+				"project": project,
+				"status": status,
+				"priority": rng.choice(PRIORITIES),
+				"parent_task": row["parent_task"],
+				"is_group": row["is_group"],
+				"is_milestone": 1 if row["name"] in milestone_names else 0,
+				"exp_start_date": row["exp_start_date"],
+				"exp_end_date": row["exp_end_date"],
+				"expected_time": row["expected_time"],
+				"progress": 100 if status == "Completed" else rng.randint(0, 90),
+				"completed_on": min(row["exp_end_date"], today) if status == "Completed" else None,
+				"description": "<p>" + "Synthetic description. " * rng.randint(1, 20) + "</p>",
+				"lft": row["lft"],
+				"rgt": row["rgt"],
+				"old_parent": row["parent_task"],
+			}
+		)
+
+	_bulk_insert("Task", task_rows)
+	return task_rows
+
+
+def _insert_dependencies(leaves, chains, chain_length, rng):
+	"""Chains of finish-to-start dependencies between leaf tasks, in date order"""
+	rows = []
+	for _ in range(chains):
+		chain = sorted(rng.sample(leaves, min(chain_length, len(leaves))), key=lambda t: t["exp_start_date"])
+		for idx, (prev, task) in enumerate(zip(chain, chain[1:]), start=1):
+			rows.append(
+				{
+					**_base(f"{PREFIX}{frappe.generate_hash(length=10)}"),
+					"parent": task["name"],
+					"parenttype": "Task",
+					"parentfield": "depends_on",
+					"idx": idx,
+					"task": prev["name"],
+				}
+			)
+	_bulk_insert("Task Depends On", rows)
+
+
+def _insert_timesheets(project, company, leaves, count, per_sheet, user_pool, rng):
+	sheets, details = [], []
+	for sheet_no in range(math.ceil(count / per_sheet)):
+		sheet = f"{PREFIX}TS-{sheet_no + 1:06d}"
+		owner = rng.choice(user_pool)
+		day = get_datetime(add_days(getdate(), -rng.randint(0, 360)))
+		total = 0
+		for idx in range(1, min(per_sheet, count - sheet_no * per_sheet) + 1):
+			hours = rng.choice([1, 2, 4, 8])
+			from_time = day + timedelta(hours=rng.randint(7, 14))
+			total += hours
+			details.append(
+				{
+					**_base(f"{PREFIX}{frappe.generate_hash(length=12)}", owner),
+					"parent": sheet,
+					"parenttype": "Timesheet",
+					"parentfield": "time_logs",
+					"idx": idx,
+					"project": project,
+					"task": rng.choice(leaves)["name"],
+					"activity_type": rng.choice(ACTIVITIES),
+					"hours": hours,
+					"from_time": from_time,
+					"to_time": from_time + timedelta(hours=hours),
+					"costing_rate": 75,
+					"costing_amount": hours * 75,
+				}
+			)
+		sheets.append(
+			{
+				**_base(sheet, owner),
+				"docstatus": 1,
+				"status": "Submitted",
+				"company": company,
+				"parent_project": project,
+				"start_date": getdate(day),
+				"end_date": getdate(day),
+				"total_hours": total,
+				"total_costing_amount": total * 75,
+			}
+		)
+	_bulk_insert("Timesheet", sheets)
+	_bulk_insert("Timesheet Detail", details)
+
+
+def _insert_purchase_invoices(project, company, start, count, per_invoice, rng):
+	invoices, items = [], []
+	for invoice_no in range(math.ceil(count / per_invoice)):
+		invoice = f"{PREFIX}PI-{invoice_no + 1:06d}"
+		posting_date = add_days(start, rng.randint(0, 365))
+		total = 0
+		for idx in range(1, min(per_invoice, count - invoice_no * per_invoice) + 1):
+			qty = rng.randint(1, 50)
+			rate = flt(rng.uniform(10, 2000), 2)
+			amount = flt(qty * rate, 2)
+			total += amount
+			items.append(
+				{
+					**_base(f"{PREFIX}{frappe.generate_hash(length=12)}"),
+					"parent": invoice,
+					"parenttype": "Purchase Invoice",
+					"parentfield": "items",
+					"idx": idx,
+					"docstatus": 1,
+					"project": project,
+					"item_code": f"{PREFIX}ITEM",
+					"item_name": "Synthetic item",
+					"qty": qty,
+					"rate": rate,
+					"amount": amount,
+					"base_amount": amount,
+					"net_amount": amount,
+					"base_net_amount": amount,
+				}
+			)
+		invoices.append(
+			{
+				**_base(invoice),
+				"docstatus": 1,
+				"status": "Unpaid",
+				"company": company,
+				"project": project,
+				"posting_date": posting_date,
+				"supplier": f"{PREFIX}Supplier",
+				"grand_total": total,
+				"base_grand_total": total,
+			}
+		)
+	_bulk_insert("Purchase Invoice", invoices)
+	_bulk_insert("Purchase Invoice Item", items)
+
+
+def _insert_expense_claims(project, company, start, count, rng):
+	claims = []
+	for claim_no in range(count):
+		amount = flt(rng.uniform(50, 5000), 2)
+		claims.append(
+			{
+				**_base(f"{PREFIX}EC-{claim_no + 1:06d}"),
+				"docstatus": 1,
+				"status": "Paid",
+				"approval_status": "Approved",
+				"company": company,
+				"project": project,
+				"posting_date": add_days(start, rng.randint(0, 365)),
+				"total_claimed_amount": amount,
+				"total_sanctioned_amount": amount,
+			}
+		)
+	_bulk_insert("Expense Claim", claims)
@@ -0,0 +1,503 @@
+"""
+Import a WBS schedule (CSV or XLSX) into a project's Tasks.
+
+Generic, file-driven version of load_m103_tasks. Expected columns (header
+row, case-insensitive):
+
+  key            external id of the row, unique within the file (required)
+  subject        task subject (required)
+  parent_key     key of the parent row (empty for top-level tasks)
+  start_date     planned start (exp_start_date)
+  end_date       planned end (exp_end_date)
+  hours          planned hours (expected_time)
+  depends_on     keys of predecessor rows, separated by "," or ";"
+  is_group       1 for group tasks (rows with children are groups anyway)
+  description    optional
+
+Rows are upserted by `key`, stored on Task.custom_import_key, so re-running
+an edited file only touches what changed. New tasks are bulk inserted in
+parent-before-child order; the nested set is rebuilt once for the project
+at the end, then WBS codes, the Project totals and parent rollups are
+refreshed. Files with parent_key or depends_on loops are rejected. A diff
+report (<timestamp>.csv) is written to sites/<site>/wbs_imports/.
+
+Run from bench:
+  bench --site <site> execute milestoneksa.scripts.import_wbs.run \
+      --kwargs "{'project': 'PROJ-0001', 'file_path': '/path/to/schedule.xlsx'}"
+  (add 'dry_run': 1 to only write the report)
+"""
+
+import csv
+import os
+import re
+from collections import defaultdict, deque
+
+import frappe
+from frappe.utils import cint, cstr, flt, getdate, now_datetime
+
+COLUMNS = ("key", "subject", "parent_key", "start_date", "end_date", "hours", "depends_on", "is_group", "description")
+
+# Task field each importable column maps to
+FIELD_MAP = {
+	"subject": "subject",
+	"start_date": "exp_start_date",
+	"end_date": "exp_end_date",
+	"hours": "expected_time",
+	"is_group": "is_group",
+	"description": "description",
+}
+
+
+def run(project: str, file_path: str, dry_run: int = 0, date_format: str | None = None):
+	"""Import `file_path` into `project`; returns the summary and the report path"""
+	if not frappe.db.exists("Project", project):
+		frappe.throw(f"Project {project} not found")
+
+	rows, errors = _read_rows(file_path, date_format)
+	existing = {
+		t.custom_import_key: t
+		for t in frappe.get_all(
+			"Task",
+			filters={"project": project, "custom_import_key": ["is", "set"]},
+			fields=["name", "custom_import_key", "parent_task", "depends_on_tasks", *FIELD_MAP.values()],
+			limit_page_length=0,
+		)
+	}
+
+	order = _topological_order(rows, errors)
+	if not errors:
+		_check_dependency_cycles(rows, errors)
+	report = []
+	if not errors:
+		report = _diff(rows, order, existing)
+
+	summary = {
+		"project": project,
+		"rows": len(rows),
+		"created": sum(1 for r in report if r["action"] == "created"),
+		"updated": sum(1 for r in report if r["action"] == "updated"),
+		"unchanged": sum(1 for r in report if r["action"] == "unchanged"),
+		"not_in_file": sorted(set(existing) - set(rows)),
+		"errors": errors,
+		"dry_run": bool(cint(dry_run)),
+	}
+	summary["report"] = _write_report(report, errors)
+
+	if errors:
+		frappe.throw(f"{len(errors)} rows could not be imported, see {summary['report']}")
+	if not cint(dry_run):
+		_apply(project, rows, report, existing)
+
+	print(summary)
+	return summary
+
+
+def _iter_file(file_path):
+	"""Yield one dict per data row, keyed by lower-cased header, without loading the whole file"""
+	if file_path.lower().endswith(".xlsx"):
+		from openpyxl import load_workbook
+
+		workbook = load_workbook(file_path, read_only=True, data_only=True)
+		try:
+			values = workbook.active.iter_rows(values_only=True)
+			header = [cstr(h).strip().lower() for h in next(values, ())]
+			for line in values:
+				yield dict(zip(header, line))
+		finally:
+			workbook.close()
+		return
+
+	with open(file_path, newline="", encoding="utf-8-sig") as f:
+		reader = csv.reader(f)
+		header = [h.strip().lower() for h in next(reader, [])]
+		for line in reader:
+			yield dict(zip(header, line))
+
+
+def _parse_date(value, date_format):
+	if not value:
+		return None
+	if date_format and isinstance(value, str):
+		from datetime import datetime
+
+		return getdate(datetime.strptime(value.strip(), date_format))
+	return getdate(value)
+
+
+def _read_rows(file_path, date_format):
+	"""Validated rows keyed by `key`, plus a list of error strings"""
+	rows, errors = {}, []
+	for line_no, raw in enumerate(_iter_file(file_path), start=2):
+		key = cstr(raw.get("key")).strip()
+		if not key and not any(raw.values()):
+			continue
+		if not key:
+			errors.append(f"line {line_no}: key is required")
+			continue
+		if key in rows:
+			errors.append(f"line {line_no}: duplicate key {key}")
+			continue
+
+		try:
+			row = frappe._dict(
+				key=key,
+				line=line_no,
+				subject=cstr(raw.get("subject")).strip(),
+				parent_key=cstr(raw.get("parent_key")).strip() or None,
+				start_date=_parse_date(raw.get("start_date"), date_format),
+				end_date=_parse_date(raw.get("end_date"), date_format),
+				hours=flt(raw.get("hours")),
+				depends_on=[k for k in re.split(r"[,;]", cstr(raw.get("depends_on"))) if k.strip()],
+				is_group=cint(raw.get("is_group")),
+				description=cstr(raw.get("description")) or None,
+			)
+		except Exception as e:
+			errors.append(f"line {line_no} ({key}): {e}")
+			continue
+
+		row.depends_on = [k.strip() for k in row.depends_on]
+		if not row.subject:
+			errors.append(f"line {line_no} ({key}): subject is required")
+		if row.start_date and row.end_date and row.start_date > row.end_date:
+			errors.append(f"line {line_no} ({key}): start date is after end date")
+		rows[key] = row
+
+	for row in rows.values():
+		if row.parent_key and row.parent_key not in rows:
+			errors.append(f"line {row.line} ({row.key}): unknown parent_key {row.parent_key}")
+		for dep in row.depends_on:
+			if dep not in rows:
+				errors.append(f"line {row.line} ({row.key}): unknown depends_on key {dep}")
+
+	return rows, errors
+
+
+def _topological_order(rows, errors):
+	"""Keys with every parent before its children (breadth-first from the roots)"""
+	children = defaultdict(list)
+	for row in rows.values():
+		if row.parent_key in rows:
+			children[row.parent_key].append(row.key)
+			rows[row.parent_key].is_group = 1
+
+	order = []
+	queue = deque(key for key, row in rows.items() if not row.parent_key or row.parent_key not in rows)
+	while queue:
+		key = queue.popleft()
+		order.append(key)
+		queue.extend(children[key])
+
+	if len(order) < len(rows):
+		placed = set(order)
+		for key in rows:
+			if key not in placed:
+				errors.append(f"line {rows[key].line} ({key}): parent_key loop")
+	return order
+
+
+def _check_dependency_cycles(rows, errors):
+	"""Reject files whose depends_on links form a loop, by the critical path's rules
+
+	(a dependency on or from a group applies to every leaf below it).
+	"""
+	from milestoneksa.api.project_schedule import ScheduleGraph
+
+	tasks = [
+		frappe._dict(name=key, parent_task=row.parent_key, exp_start_date=row.start_date, exp_end_date=row.end_date)
+		for key, row in rows.items()
+	]
+	edges = [(dep, key) for key, row in rows.items() for dep in row.depends_on]
+	try:
+		ScheduleGraph(tasks, edges)
+	except frappe.ValidationError as e:
+		errors.append(f"depends_on loop: {e}")
+
+
+def _diff(rows, order, existing):
+	"""created / updated / unchanged per row, with old → new values of changed fields"""
+	report = []
+	key_of = {t.name: k for k, t in existing.items()}
+	for key in order:
+		row = rows[key]
+		task = existing.get(key)
+		values = {field: row[column] for column, field in FIELD_MAP.items()}
+		if not task:
+			report.append({"key": key, "action": "created", "task": None, "changes": values})
+			continue
+
+		changes = {}
+		for field, value in values.items():
+			current = task.get(field)
+			if field == "expected_time":
+				changed = flt(current) != flt(value)
+			elif field == "is_group":
+				changed = cint(current) != cint(value)
+			else:
+				changed = (current or None) != (value or None)
+			if changed:
+				changes[field] = (current, value)
+
+		parent = existing.get(row.parent_key)
+		if row.parent_key and (not parent or task.parent_task != parent.name):
+			changes["parent_task"] = (task.parent_task, row.parent_key)
+		elif not row.parent_key and task.parent_task:
+			changes["parent_task"] = (task.parent_task, None)
+
+		depends_on = ",".join(row.depends_on)
+		current_depends_on = _depends_on_keys(task, key_of)
+		if depends_on != current_depends_on:
+			changes["depends_on"] = (current_depends_on, depends_on)
+
+		report.append({"key": key, "action": "updated" if changes else "unchanged", "task": task.name, "changes": changes})
+	return report
+
+
+def _depends_on_keys(task, key_of):
+	"""The task's current predecessors as import keys (comparable with the file)"""
+	names = [n.strip() for n in cstr(task.depends_on_tasks).split(",") if n.strip()]
+	return ",".join(key_of.get(n, n) for n in names)
+
+
+def _write_report(report, errors):
+	output_dir = frappe.get_site_path("wbs_imports")
+	os.makedirs(output_dir, exist_ok=True)
+	path = os.path.join(output_dir, now_datetime().strftime("%Y%m%d-%H%M%S") + ".csv")
+	with open(path, "w", newline="", encoding="utf-8") as f:
+		writer = csv.writer(f)
+		writer.writerow(["key", "action", "task", "field", "old", "new"])
+		for error in errors:
+			writer.writerow(["", "error", "", "", "", error])
+		for entry in report:
+			if entry["action"] == "unchanged":
+				writer.writerow([entry["key"], "unchanged", entry["task"], "", "", ""])
+			elif entry["action"] == "created":
+				writer.writerow([entry["key"], "created", "", "", "", ""])
+			else:
+				for field, (old, new) in entry["changes"].items():
+					writer.writerow([entry["key"], "updated", entry["task"], field, old, new])
+	return path
+
+
+def _get_task_naming_series():
+	"""The naming series Task names are made from (its autoname, or the default naming_series)"""
+	meta = frappe.get_meta("Task")
+	series = meta.autoname or ""
+	if series.startswith("naming_series:"):
+		field = meta.get_field("naming_series")
+		options = [o for o in cstr(field and field.options).split("\n") if o]
+		series = (field and field.default) or (options[0] if options else "")
+	if "#" not in series or ":" in series:
+		frappe.throw(f"Task naming ({meta.autoname}) is not a naming series; tasks cannot be imported in bulk")
+	return series
+
+
+def _reserve_task_names(count):
+	"""Take `count` names from the Task naming series in one update, as `count` getseries calls would"""
+	from frappe.model.naming import parse_naming_series
+
+	counter = {}
+
+	def reserve(key, digits):
+		counter.update(key=key, digits=digits)
+		return "\0"
+
+	# Resolves the date and field parts once; "\0" marks where the number goes
+	template = parse_naming_series(_get_task_naming_series(), doctype="Task", number_generator=reserve)
+	key = counter["key"]
+
+	current = frappe.db.sql("SELECT `current` FROM `tabSeries` WHERE name = %s FOR UPDATE", key)
+	if current:
+		start = cint(current[0][0])
+		frappe.db.sql("UPDATE `tabSeries` SET `current` = `current` + %s WHERE name = %s", (count, key))
+	else:
+		start = 0
+		frappe.db.sql("INSERT INTO `tabSeries` (`name`, `current`) VALUES (%s, %s)", (key, count))
+	return [template.replace("\0", str(n).zfill(counter["digits"])) for n in range(start + 1, start + count + 1)]
+
+
+def _apply(project, rows, report, existing):
+	now = now_datetime()
+	user = frappe.session.user
+	company = frappe.db.get_value("Project", project, "company")
+
+	created = [entry["key"] for entry in report if entry["action"] == "created"]
+	name_of = {key: task.name for key, task in existing.items()}
+	if created:
+		name_of.update(zip(created, _reserve_task_names(len(created))))
+
+	# New rows in topological order, nested set left for the rebuild below
+	frappe.db.bulk_insert(
+		"Task",
+		[
+			"name", "creation", "modified", "owner", "modified_by", "project", "company", "status", "priority",
+			"subject", "parent_task", "old_parent", "is_group", "exp_start_date", "exp_end_date",
+			"expected_time", "description", "custom_import_key", "lft", "rgt",
+		],
+		[
+			[
+				name_of[key], now, now, user, user, project, company, "Open", "Medium",
+				rows[key].subject, name_of.get(rows[key].parent_key), name_of.get(rows[key].parent_key),
+				rows[key].is_group, rows[key].start_date, rows[key].end_date,
+				rows[key].hours, rows[key].description, key, 0, 0,
+			]
+			for key in created
+		],
+		chunk_size=5000,
+	)
+
+	updates = {}
+	for entry in report:
+		if entry["action"] != "updated":
+			continue
+		row = rows[entry["key"]]
+		values = {field: new for field, (old, new) in entry["changes"].items() if field in FIELD_MAP.values()}
+		if "parent_task" in entry["changes"]:
+			values["parent_task"] = values["old_parent"] = name_of.get(row.parent_key)
+		if values:
+			updates[entry["task"]] = values
+	if updates:
+		frappe.db.bulk_update("Task", updates, chunk_size=500)
+
+	_write_dependencies(rows, report, name_of, now, user)
+	# Imported siblings keep the order of the file
+	_rebuild_project_tree(project, {name_of[key]: idx for idx, key in enumerate(rows)})
+
+	from milestoneksa.api.project_dashboard import DASHBOARD_INVALIDATION, clear_dashboard_cache
+	from milestoneksa.api.task_rollup import rollup_project
+	from milestoneksa.api.task_wbs import renumber_project
+
+	renumber_project(project)
+	clear_dashboard_cache(project, DASHBOARD_INVALIDATION["Task"])
+	# Task.on_update is bypassed: refresh the Project's percent complete and totals
+	frappe.get_doc("Project", project).update_project()
+	# Commits the whole import
+	rollup_project(project)
+
+
+def _write_dependencies(rows, report, name_of, now, user):
+	"""Replace Task Depends On rows of the tasks whose dependencies changed"""
+	changed = [
+		entry["key"]
+		for entry in report
+		if entry["action"] == "created" and rows[entry["key"]].depends_on
+		or entry["action"] == "updated" and "depends_on" in entry["changes"]
+	]
+	if not changed:
+		return
+
+	parents = [name_of[key] for key in changed]
+	for start in range(0, len(parents), 500):
+		frappe.db.delete("Task Depends On", {"parenttype": "Task", "parent": ["in", parents[start:start + 500]]})
+
+	values = []
+	for key in changed:
+		for idx, dep in enumerate(rows[key].depends_on, start=1):
+			values.append(
+				[frappe.generate_hash(length=10), now, now, user, user, name_of[key], "Task", "depends_on", idx, name_of[dep]]
+			)
+	frappe.db.bulk_insert(
+		"Task Depends On",
+		["name", "creation", "modified", "owner", "modified_by", "parent", "parenttype", "parentfield", "idx", "task"],
+		values,
+		chunk_size=5000,
+	)
+
+	# Same format as Task.update_depends_on
+	depends_on_tasks = {
+		name_of[key]: {"depends_on_tasks": "".join(f"{name_of[dep]}," for dep in dict.fromkeys(rows[key].depends_on))}
+		for key in changed
+	}
+	frappe.db.bulk_update("Task", depends_on_tasks, chunk_size=500, update_modified=False)
+
+
+def _get_project_forest(project):
+	"""The project's tasks plus the tasks of other projects hanging below them, by name"""
+	tasks = {
+		t.name: t
+		for t in frappe.get_all(
+			"Task", filters={"project": project}, fields=["name", "parent_task", "lft", "rgt"], limit_page_length=0
+		)
+	}
+	parents = list(tasks)
+	while parents:
+		found = []
+		for start in range(0, len(parents), 1000):
+			found += frappe.get_all(
+				"Task",
+				filters={"parent_task": ["in", parents[start:start + 1000]]},
+				fields=["name", "parent_task", "lft", "rgt"],
+				limit_page_length=0,
+			)
+		parents = []
+		for t in found:
+			if t.name not in tasks:
+				tasks[t.name] = t
+				parents.append(t.name)
+	return tasks
+
+
+def _rebuild_project_tree(project, positions):
+	"""Renumber the project's nested set in place, without touching other projects' trees.
+
+	The project's tasks (and any task of another project below them) are laid
+	out contiguously from the project's first lft. Other trees that sat
+	between the project's roots move right after it, and everything to the
+	right shifts by the change in width, in one statement. If the project
+	itself hangs under another project's task, fall back to frappe's full
+	rebuild. Siblings are ordered by `positions` (file order); tasks that
+	were not imported keep their lft order after them.
+	"""
+	tasks = _get_project_forest(project)
+	if any(t.parent_task and t.parent_task not in tasks for t in tasks.values()):
+		from frappe.utils.nestedset import rebuild_tree
+
+		rebuild_tree("Task")
+		return
+
+	children = defaultdict(list)
+	roots = []
+	for t in sorted(tasks.values(), key=lambda t: (t.name not in positions, positions.get(t.name, 0), t.lft or 0, t.name)):
+		(children[t.parent_task] if t.parent_task else roots).append(t.name)
+
+	placed = [t for t in tasks.values() if cint(t.lft) > 0 and cint(t.rgt) > cint(t.lft)]
+	if placed:
+		first = min(cint(t.lft) for t in placed)
+		last = max(cint(t.rgt) for t in placed)
+	else:
+		first = cint(frappe.db.sql("SELECT IFNULL(MAX(rgt), 0) FROM `tabTask`")[0][0]) + 1
+		last = first - 1
+
+	# Trees of other projects between this project's roots (never inside them:
+	# every descendant of a project task is part of `tasks`)
+	others = [
+		row
+		for row in frappe.db.sql(
+			"SELECT name, lft, rgt FROM `tabTask` WHERE lft BETWEEN %s AND %s", (first, last), as_dict=True
+		)
+		if row.name not in tasks
+	]
+
+	width = 2 * len(tasks) + 2 * len(others)
+	shift = width - (last - first + 1)
+	if shift:
+		frappe.db.sql("UPDATE `tabTask` SET lft = lft + %(shift)s, rgt = rgt + %(shift)s WHERE lft > %(last)s", {"shift": shift, "last": last})
+
+	intervals = {}
+	counter = first - 1
+	stack = [(name, False) for name in reversed(roots)]
+	while stack:
+		name, done = stack.pop()
+		counter += 1
+		if done:
+			intervals[name]["rgt"] = counter
+			continue
+		intervals[name] = {"lft": counter}
+		stack.append((name, True))
+		stack.extend((child, False) for child in reversed(children[name]))
+
+	# The other trees keep their relative layout, compacted after the project
+	position = {value: counter + idx for idx, value in enumerate(sorted(v for row in others for v in (row.lft, row.rgt)), start=1)}
+	for row in others:
+		intervals[row.name] = {"lft": position[row.lft], "rgt": position[row.rgt]}
+
+	frappe.db.bulk_update("Task", intervals, chunk_size=500, update_modified=False)
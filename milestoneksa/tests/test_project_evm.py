@@ -0,0 +1,85 @@
+# Copyright (c) 2026, ahmed and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+from frappe.tests.utils import FrappeTestCase
+
+from milestoneksa.api.project_evm import compute_evm
+
+# Day offsets are relative to AS_OF (2026-01-10)
+AS_OF = "2026-01-10"
+
+# (project, start, end, hours, progress, completed, completed_on, actual_start)
+TASKS = [
+	# Jan 1-10, completed on Jan 9
+	("P", -9, 0, 10, 0, 1, -1, -9),
+	# Jan 11-20, not started
+	("P", 1, 10, 10, 0, 0, None, None),
+	# Project without a budget: Jan 1-4 done on Jan 4, Jan 5-8 half done
+	("U", -9, -6, 0, 0, 1, -6, -9),
+	("U", -5, -2, 0, 50, 0, None, -5),
+]
+
+# (project, day, amount)
+COSTS = [("P", -5, 100), ("P", -1, 200), ("U", -3, 50)]
+
+
+def run_evm(budgets):
+	with patch("milestoneksa.api.project_evm.load_task_intervals", return_value=TASKS), patch(
+		"milestoneksa.api.project_evm.load_daily_costs", return_value=COSTS
+	):
+		return compute_evm(budgets, AS_OF, "daily", "2026-01-01", "2026-01-12")
+
+
+class TestProjectEVM(FrappeTestCase):
+	def test_periods(self):
+		result = run_evm({"P": 1000, "U": 0})
+
+		self.assertEqual(result["as_of"], AS_OF)
+		self.assertEqual(result["periods"][0], "2026-01-01")
+		self.assertEqual(result["periods"][-1], "2026-01-12")
+		self.assertEqual(len(result["periods"]), 12)
+
+	def test_project_series(self):
+		p = run_evm({"P": 1000, "U": 0})["projects"]["P"]
+		# Index of Jan <day> in the daily periods
+		jan = {day: day - 1 for day in range(1, 13)}
+
+		self.assertEqual(p["bac"], 1000)
+		# Planned linearly: half the budget per task, 50 per day
+		self.assertEqual(p["pv"][jan[5]], 250)
+		self.assertEqual(p["pv"][jan[10]], 500)
+		self.assertEqual(p["pv"][jan[12]], 600)
+		# Earned on the completion day
+		self.assertEqual(p["ev"][jan[8]], 0)
+		self.assertEqual(p["ev"][jan[9]], 500)
+		self.assertEqual(p["ac"][jan[5]], 100)
+		self.assertEqual(p["ac"][jan[10]], 300)
+
+		self.assertEqual(p["spi"][jan[9]], 1.111)
+		self.assertEqual(p["spi"][jan[10]], 1)
+		self.assertEqual(p["cpi"][jan[10]], 1.667)
+		self.assertEqual(p["eac"][jan[10]], 600)
+
+		# Nothing is earned or spent after the as-of date
+		self.assertIsNone(p["ev"][jan[11]])
+		self.assertIsNone(p["ac"][jan[11]])
+		self.assertIsNone(p["spi"][jan[11]])
+
+	def test_project_without_budget(self):
+		u = run_evm({"P": 1000, "U": 0})["projects"]["U"]
+
+		self.assertEqual(u["bac"], 0)
+		self.assertIsNone(u["pv"][-1])
+		self.assertIsNone(u["cpi"][9])
+		# Weights by planned days: 4 of 8 planned days done, plus half of the other 4
+		self.assertEqual(u["spi"][9], 0.75)
+
+	def test_portfolio_only_counts_budgeted_projects(self):
+		result = run_evm({"P": 1000, "U": 0})
+		portfolio, p = result["portfolio"], result["projects"]["P"]
+
+		self.assertEqual(portfolio["bac"], 1000)
+		for series in ("pv", "ev", "ac", "spi", "cpi", "eac"):
+			self.assertEqual(portfolio[series], p[series])
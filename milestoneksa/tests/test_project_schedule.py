@@ -0,0 +1,156 @@
+# Copyright (c) 2026, ahmed and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from milestoneksa.api.project_schedule import (
+	ScheduleGraph,
+	compute_critical_path,
+	get_shift_overrides,
+	simulate_schedule_shift,
+)
+
+
+def make_task(name, start=None, end=None, parent_task=None):
+	return frappe._dict(name=name, parent_task=parent_task, exp_start_date=start, exp_end_date=end)
+
+
+class TestScheduleGraph(FrappeTestCase):
+	def setUp(self):
+		# A (3d) -> B (2d) -> D (1d); A -> C (1d) -> D
+		self.tasks = [
+			make_task("A", "2026-01-01", "2026-01-03"),
+			make_task("B", "2026-01-01", "2026-01-02"),
+			make_task("C", "2026-01-01", "2026-01-01"),
+			make_task("D", "2026-01-01", "2026-01-01"),
+		]
+		self.edges = [("A", "B"), ("A", "C"), ("B", "D"), ("C", "D")]
+
+	def test_forward_pass(self):
+		graph = ScheduleGraph(self.tasks, self.edges)
+		early_start, early_finish = graph.forward_pass()
+
+		self.assertEqual(early_start, {"A": 0, "B": 3, "C": 3, "D": 5})
+		self.assertEqual(early_finish, {"A": 3, "B": 5, "C": 4, "D": 6})
+
+	def test_forward_pass_keeps_later_planned_start(self):
+		self.tasks[2] = make_task("C", "2026-01-10", "2026-01-10")
+		graph = ScheduleGraph(self.tasks, self.edges)
+		early_start, _early_finish = graph.forward_pass()
+
+		self.assertEqual(early_start["C"], 9)
+		self.assertEqual(early_start["D"], 10)
+
+	def test_forward_pass_overrides(self):
+		graph = ScheduleGraph(self.tasks, self.edges)
+		early_start, _early_finish = graph.forward_pass(duration={"C": 4})
+
+		self.assertEqual(early_start["D"], 7)
+
+	def test_backward_pass_and_float(self):
+		graph = ScheduleGraph(self.tasks, self.edges)
+		_early_start, early_finish = graph.forward_pass()
+		late_start, late_finish = graph.backward_pass(early_finish)
+
+		self.assertEqual(late_finish, {"A": 3, "B": 5, "C": 5, "D": 6})
+		self.assertEqual(late_start, {"A": 0, "B": 3, "C": 4, "D": 5})
+
+	def test_critical_path(self):
+		result = compute_critical_path(ScheduleGraph(self.tasks, self.edges))
+
+		self.assertEqual(result["critical_path"], ["A", "B", "D"])
+		self.assertEqual(result["tasks"]["C"]["total_float"], 1)
+		self.assertEqual(result["project_start"], "2026-01-01")
+		self.assertEqual(result["project_finish"], "2026-01-06")
+
+	def test_group_dependencies_apply_to_leaves(self):
+		tasks = [
+			make_task("G"),
+			make_task("G1", "2026-01-01", "2026-01-02", "G"),
+			make_task("G2", "2026-01-01", "2026-01-04", "G"),
+			make_task("E", "2026-01-01", "2026-01-01"),
+		]
+		graph = ScheduleGraph(tasks, [("G", "E")])
+		early_start, early_finish = graph.forward_pass()
+
+		self.assertEqual(graph.preds["E"], {"G1", "G2"})
+		self.assertEqual(early_start["E"], 4)
+
+		start, finish = graph.rollup(early_start, early_finish)
+		self.assertEqual((start["G"], finish["G"]), (0, 4))
+
+	def test_cycle_is_detected(self):
+		with self.assertRaises(frappe.ValidationError) as context:
+			ScheduleGraph(self.tasks, self.edges + [("D", "A")])
+		self.assertIn("cycle", str(context.exception))
+
+	def test_find_cycle(self):
+		graph = ScheduleGraph(self.tasks, self.edges)
+		graph.preds["A"].add("D")
+
+		cycle = graph.find_cycle({"A", "B", "D"})
+		self.assertEqual(cycle[0], cycle[-1])
+		self.assertEqual(set(cycle), {"A", "B", "D"})
+
+
+class TestScheduleShift(FrappeTestCase):
+	def setUp(self):
+		# Same network as TestScheduleGraph: A -> B -> D is critical, C has one day of float
+		self.graph = ScheduleGraph(
+			[
+				make_task("A", "2026-01-01", "2026-01-03"),
+				make_task("B", "2026-01-01", "2026-01-02"),
+				make_task("C", "2026-01-01", "2026-01-01"),
+				make_task("D", "2026-01-01", "2026-01-01"),
+			],
+			[("A", "B"), ("A", "C"), ("B", "D"), ("C", "D")],
+		)
+
+	def simulate(self, changes):
+		with (
+			patch("milestoneksa.api.project_schedule.load_schedule_graph", return_value=self.graph),
+			patch.object(frappe, "has_permission", return_value=True),
+		):
+			return simulate_schedule_shift("_Test Project", changes)
+
+	def test_shift_pushes_successors(self):
+		result = self.simulate([{"task": "A", "shift_days": 2}])
+
+		impacted = {row["task"]: row for row in result["impacted"]}
+		self.assertEqual(set(impacted), {"A", "B", "C", "D"})
+		self.assertEqual(impacted["D"]["start_before"], "2026-01-06")
+		self.assertEqual(impacted["D"]["start_after"], "2026-01-08")
+		self.assertEqual(result["project_finish"], {"before": "2026-01-06", "after": "2026-01-08", "shift_days": 2})
+
+	def test_shift_within_float_keeps_the_finish(self):
+		# C can start as late as day 4 without delaying D
+		result = self.simulate([{"task": "C", "shift_days": 4}])
+
+		self.assertEqual([row["task"] for row in result["impacted"]], ["C"])
+		self.assertEqual(result["project_finish"]["shift_days"], 0)
+
+	def test_date_and_duration_overrides(self):
+		start, duration = get_shift_overrides(
+			self.graph,
+			[{"task": "B", "exp_start_date": "2026-01-05"}, {"task": "C", "exp_end_date": "2026-01-06"}],
+		)
+
+		self.assertEqual(start, {"B": 4})
+		self.assertEqual(duration, {"C": 6})
+
+	def test_unknown_task_is_rejected(self):
+		with self.assertRaises(frappe.ValidationError):
+			self.simulate([{"task": "Z", "shift_days": 1}])
+
+	def test_bad_date_is_rejected(self):
+		with self.assertRaises(frappe.ValidationError):
+			get_shift_overrides(self.graph, [{"task": "B", "exp_start_date": "not a date"}])
+
+	def test_group_task_can_only_be_shifted(self):
+		graph = ScheduleGraph([make_task("G"), make_task("G1", "2026-01-01", "2026-01-02", "G")], [])
+
+		with self.assertRaises(frappe.ValidationError):
+			get_shift_overrides(graph, [{"task": "G", "duration": 3}])
@@ -0,0 +1,60 @@
+# Copyright (c) 2026, ahmed and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from milestoneksa.api.project_tasks import _get_connected_tasks, delete_project_tasks
+
+
+def make_task(subject, project=None, parent_task=None, is_group=0, depends_on=()):
+	return frappe.get_doc({
+		"doctype": "Task",
+		"subject": subject,
+		"project": project,
+		"parent_task": parent_task,
+		"is_group": is_group,
+		"depends_on": [{"task": task} for task in depends_on],
+	}).insert()
+
+
+class TestConnectedTasks(FrappeTestCase):
+	def setUp(self):
+		self.project = (
+			frappe.db.get_value("Project", {"project_name": "_Test Connected Tasks"})
+			or frappe.get_doc({"doctype": "Project", "project_name": "_Test Connected Tasks"}).insert().name
+		)
+
+		# A project-less root whose child (and grandchild) belong to a project
+		self.root = make_task("_Test Root", is_group=1).name
+		self.child = make_task("_Test Child", self.project, self.root, is_group=1).name
+		self.grandchild = make_task("_Test Grandchild", self.project, self.child).name
+		# Depends on the root, in the root's (empty) project: connected
+		self.dependent = make_task("_Test Dependent", depends_on=[self.root]).name
+		# Depends on the child, but outside the root's project: not followed
+		self.other_dependent = make_task("_Test Other Dependent", self.project, depends_on=[self.child]).name
+		self.unrelated = make_task("_Test Unrelated", self.project).name
+
+	def test_descendants_are_followed_across_projects(self):
+		closure, tasks = _get_connected_tasks([self.root])
+
+		self.assertEqual(closure, {self.root, self.child, self.grandchild, self.dependent})
+		self.assertEqual(tasks[self.child].project, self.project)
+
+	def test_forced_delete_keeps_the_nested_set_whole(self):
+		with patch.object(frappe.db, "commit"):
+			result = delete_project_tasks([self.root], force=1, delete_connected=1)
+
+		self.assertEqual(result["deleted_count"], 4)
+		for name in (self.root, self.child, self.grandchild, self.dependent):
+			self.assertFalse(frappe.db.exists("Task", name))
+
+		# No surviving task is left inside a removed interval or without one
+		for task in frappe.get_all("Task", fields=["name", "lft", "rgt", "parent_task"]):
+			self.assertLess(task.lft, task.rgt)
+			self.assertNotIn(task.parent_task, (self.root, self.child))
+		self.assertFalse(frappe.get_all("Task Depends On", filters={"task": ["in", [self.root, self.child]]}))
+		self.assertTrue(frappe.db.exists("Task", self.other_dependent))
+		self.assertTrue(frappe.db.exists("Task", self.unrelated))
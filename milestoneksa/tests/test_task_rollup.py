@@ -0,0 +1,117 @@
+# Copyright (c) 2026, ahmed and Contributors
+# See license.txt
+
+from datetime import date
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from milestoneksa.api.task_rollup import compute_rollup, get_post_order, rollup_tasks
+
+
+def make_task(name, parent_task=None, **values):
+	return frappe._dict(
+		{
+			"name": name,
+			"parent_task": parent_task,
+			"exp_start_date": None,
+			"exp_end_date": None,
+			"expected_time": 0,
+			"custom_actual_start_date": None,
+			"custom_actual_end_date": None,
+			"status": "Open",
+			**values,
+		}
+	)
+
+
+class TestTaskRollup(FrappeTestCase):
+	def test_compute_rollup_dates_and_hours(self):
+		values = compute_rollup(
+			[
+				make_task("A", exp_start_date=date(2026, 1, 5), exp_end_date=date(2026, 1, 9), expected_time=8),
+				make_task("B", exp_start_date=date(2026, 1, 2), exp_end_date=date(2026, 1, 7), expected_time=4.5),
+				make_task("C", custom_actual_start_date=date(2026, 1, 3), custom_actual_end_date=date(2026, 1, 20)),
+			]
+		)
+
+		self.assertEqual(values["exp_start_date"], date(2026, 1, 2))
+		self.assertEqual(values["exp_end_date"], date(2026, 1, 9))
+		self.assertEqual(values["expected_time"], 12.5)
+		self.assertEqual(values["custom_actual_start_date"], date(2026, 1, 3))
+		self.assertEqual(values["custom_actual_end_date"], date(2026, 1, 20))
+		self.assertNotIn("status", values)
+
+	def test_compute_rollup_status(self):
+		completed = [make_task("A", status="Completed"), make_task("B", status="Completed")]
+		self.assertEqual(compute_rollup(completed)["status"], "Completed")
+
+		working = [make_task("A", status="Completed"), make_task("B", status="Working")]
+		self.assertEqual(compute_rollup(working)["status"], "Working")
+
+		mixed = [make_task("A", status="Completed"), make_task("B", status="Open")]
+		self.assertNotIn("status", compute_rollup(mixed))
+
+		self.assertEqual(compute_rollup([])["expected_time"], 0)
+		self.assertNotIn("status", compute_rollup([]))
+
+	def test_post_order_puts_children_first(self):
+		tasks = [make_task("R"), make_task("G", "R"), make_task("L1", "G"), make_task("L2", "R")]
+		children = {}
+		for task in tasks:
+			if task.parent_task:
+				children.setdefault(task.parent_task, []).append(task)
+
+		order = get_post_order(children, ["R"])
+		self.assertEqual(order, ["G", "R"])
+
+	def test_rollup_tasks_is_bottom_up(self):
+		tasks = [
+			make_task("R", status="Open"),
+			make_task("G", "R", status="Open"),
+			make_task("L1", "G", exp_start_date=date(2026, 3, 1), exp_end_date=date(2026, 3, 4), expected_time=6, status="Completed"),
+			make_task("L2", "G", exp_start_date=date(2026, 3, 2), exp_end_date=date(2026, 3, 10), expected_time=2, status="Completed"),
+			make_task("L3", "R", exp_start_date=date(2026, 2, 20), exp_end_date=date(2026, 2, 25), expected_time=1, status="Working"),
+		]
+
+		changes = rollup_tasks(tasks)
+
+		self.assertEqual(
+			changes["G"],
+			{
+				"exp_start_date": date(2026, 3, 1),
+				"exp_end_date": date(2026, 3, 10),
+				"expected_time": 8,
+				"status": "Completed",
+			},
+		)
+		# R reads G's rolled-up values, not the stale ones
+		self.assertEqual(changes["R"]["exp_start_date"], date(2026, 2, 20))
+		self.assertEqual(changes["R"]["exp_end_date"], date(2026, 3, 10))
+		self.assertEqual(changes["R"]["expected_time"], 9)
+		self.assertEqual(changes["R"]["status"], "Working")
+		self.assertNotIn("L1", changes)
+
+	def test_rollup_tasks_only_returns_changes(self):
+		tasks = [
+			make_task("G", exp_start_date=date(2026, 3, 1), exp_end_date=date(2026, 3, 4), expected_time=6),
+			make_task("L1", "G", exp_start_date=date(2026, 3, 1), exp_end_date=date(2026, 3, 4), expected_time=6),
+		]
+		self.assertEqual(rollup_tasks(tasks), {})
+
+	def test_rollup_tasks_limited_to_parents(self):
+		tasks = [
+			make_task("A"),
+			make_task("A1", "A", expected_time=3),
+			make_task("B"),
+			make_task("B1", "B", expected_time=5),
+		]
+
+		changes = rollup_tasks(tasks, parents={"B"})
+		self.assertEqual(list(changes), ["B"])
+		self.assertEqual(changes["B"]["expected_time"], 5)
+
+	def test_rollup_tasks_parent_outside_tasks(self):
+		# A subtree whose root's parent belongs to another load
+		tasks = [make_task("G", "ELSEWHERE"), make_task("L1", "G", expected_time=2)]
+		self.assertEqual(rollup_tasks(tasks)["G"]["expected_time"], 2)
@@ -0,0 +1,60 @@
+# Copyright (c) 2026, ahmed and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from milestoneksa.api.task_wbs import MAX_WBS_DEPTH, compute_wbs, get_sort_key
+
+
+def make_task(name, lft, parent_task=None):
+	return frappe._dict(name=name, lft=lft, parent_task=parent_task)
+
+
+class TestTaskWBS(FrappeTestCase):
+	def test_compute_wbs_numbers_siblings_in_lft_order(self):
+		tasks = [
+			make_task("B", 7),
+			make_task("A", 1),
+			make_task("A2", 4, "A"),
+			make_task("A1", 2, "A"),
+			make_task("A2a", 5, "A2"),
+		]
+
+		self.assertEqual(
+			compute_wbs(tasks),
+			{
+				"A": ("1", 1),
+				"A1": ("1.1", 2),
+				"A2": ("1.2", 2),
+				"A2a": ("1.2.1", 3),
+				"B": ("2", 1),
+			},
+		)
+
+	def test_compute_wbs_under_prefix(self):
+		# A branch renumbered below parent 3.4 (depth 2)
+		tasks = [make_task("X", 10, "P"), make_task("Y", 12, "P"), make_task("Y1", 13, "Y")]
+
+		self.assertEqual(
+			compute_wbs(tasks, "3.4", 2),
+			{"X": ("3.4.1", 3), "Y": ("3.4.2", 3), "Y1": ("3.4.2.1", 4)},
+		)
+
+	def test_compute_wbs_deep_tree(self):
+		tasks = [make_task(f"T{depth}", depth + 1, f"T{depth - 1}" if depth else None) for depth in range(3000)]
+
+		codes = compute_wbs(tasks)
+		self.assertEqual(codes["T2999"], (".".join(["1"] * 3000), 3000))
+
+	def test_sort_key_orders_numerically(self):
+		codes = ["1.10", "1.2", "10", "2", "1.2.1"]
+
+		self.assertEqual(sorted(codes, key=get_sort_key), ["1.2", "1.2.1", "1.10", "2", "10"])
+
+	def test_sort_key_fits_the_column(self):
+		code = ".".join(["99999"] * MAX_WBS_DEPTH)
+		self.assertLessEqual(len(get_sort_key(code)), 140)
+
+		with self.assertRaises(frappe.ValidationError):
+			get_sort_key(code + ".1")